@@ -1,17 +1,39 @@
+import os
 import sys
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 
 import streamlit as st
+import streamlit.components.v1 as components
 from streamlit_ace import st_ace
 
 # Add project root to sys.path so we can import from utils without issues
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
+from utils.artifact_store import ArtifactStore
+from utils.config import DEFAULT_CACHE_DIR
+from utils.fit_pages import fit_to_pages
 from utils.markdown_processor import (
-    convert_md_to_latex,
+    EXPORT_FORMATS,
+    convert_md_to_html,
     convert_md_to_pdf,
     preprocess_markdown,
+    render_exports,
 )
+from utils.pandoc_server import PandocServerPool
+from utils.pdf_postprocess import optimize_pdf, page_previews
+from utils.profiling import profile_build
+from utils.render_cache import DirectoryBackend, RenderCache
+from utils.render_queue import RenderQueue
+from utils.render_service import (
+    RenderServiceBusy,
+    RenderServiceClient,
+    RenderServiceUnavailable,
+)
+from utils.template_store import TemplateStore
+from utils.validation import ValidationError, validate_build
+from utils.workspaces import WorkspacePool
 
 # -----------------------------------------------------------------------------
 # Constants and Paths
@@ -32,6 +54,15 @@ LUA_FILTER_PATHS = {
 # Path to default CV markdown
 default_cv_path = Path("examples/default.md")
 
+# LaTeX engine for PDF builds ("auto" picks the fastest installed one)
+PDF_ENGINE = os.environ.get("CV_BUILDER_ENGINE", "xelatex")
+
+# Render the LaTeX in process instead of running Pandoc where the CV allows it
+NATIVE_LATEX = os.environ.get("CV_BUILDER_NATIVE_LATEX") == "1"
+
+# Linearize and compress PDFs for the browser (needs qpdf)
+OPTIMIZE_PDF = os.environ.get("CV_BUILDER_OPTIMIZE_PDF") == "1"
+
 # -----------------------------------------------------------------------------
 # Streamlit App Setup
 # -----------------------------------------------------------------------------
@@ -44,27 +75,49 @@ st.caption(
 st.divider()
 
 # -----------------------------------------------------------------------------
-# File Existence Check
+# Static Assets
 # -----------------------------------------------------------------------------
 
+
+@st.cache_resource(ttl=30)
+def find_missing_files() -> list[str]:
+    # Checked at most every 30 seconds rather than on every rerun, so restored
+    # files are picked up without a server restart
+    return [
+        f"{desc} not found at {path}."
+        for path, desc in [
+            (TEMPLATE_PATHS["Modern"], "Modern template"),
+            (TEMPLATE_PATHS["Harvard"], "Harvard template"),
+            (LUA_FILTER_PATHS["inline_dates"], "Inline lua filter"),
+            (LUA_FILTER_PATHS["columns"], "Columns lua filter"),
+            (default_cv_path, "Default CV markdown"),
+        ]
+        if not path.exists()
+    ]
+
+
+@st.cache_resource(max_entries=32)
+def _load_text_asset(path: str, mtime_ns: int) -> str:
+    # The modification time is part of the cache key, so edited files are reloaded
+    return Path(path).read_text(encoding="utf-8")
+
+
+def read_text_asset(path: Path) -> str:
+    return _load_text_asset(str(path), path.stat().st_mtime_ns)
+
+
 # Ensure required files exist
-for path, desc in [
-    (TEMPLATE_PATHS["Modern"], "Modern template"),
-    (TEMPLATE_PATHS["Harvard"], "Harvard template"),
-    (LUA_FILTER_PATHS["inline_dates"], "Inline lua filter"),
-    (LUA_FILTER_PATHS["columns"], "Columns lua filter"),
-    (default_cv_path, "Default CV markdown"),
-]:
-    if not path.exists():
-        st.error(f"{desc} not found at {path}.")
-        st.stop()
+missing_files = find_missing_files()
+if missing_files:
+    st.error(missing_files[0])
+    st.stop()
 
 # -----------------------------------------------------------------------------
 # Session State Initialization
 # -----------------------------------------------------------------------------
 
 if "md_text" not in st.session_state:
-    st.session_state.md_text = default_cv_path.read_text(encoding="utf-8")
+    st.session_state.md_text = read_text_asset(default_cv_path)
 
 if "template_name" not in st.session_state:
     st.session_state.template_name = st.session_state.get(
@@ -85,13 +138,112 @@ if "lua_filters" not in st.session_state:
 
 if "pdf_generated" not in st.session_state:
     st.session_state.pdf_generated = False
-    st.session_state.pdf_bytes = None
+    st.session_state.pdf_key = None  # the PDF itself lives in the artifact store
+    st.session_state.build_profile = None
+    st.session_state.fit_summary = None
+
+if "session_key" not in st.session_state:
+    # Identifies this session's slot in the shared background render queue
+    st.session_state.session_key = uuid.uuid4().hex
+    st.session_state.live_seq = 0
+
+if "exports" not in st.session_state:
+    st.session_state.exports = None  # format -> artifact key
+    st.session_state.exports_inputs = None
 
 # -----------------------------------------------------------------------------
 # Utility Functions
 # -----------------------------------------------------------------------------
 
 
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    # Shared by all sessions of this server process
+    return RenderCache(DirectoryBackend(DEFAULT_CACHE_DIR / "renders"))
+
+
+@st.cache_resource
+def get_artifact_store() -> ArtifactStore:
+    # PDFs and exports of all sessions, on disk within a size budget;
+    # identical builds share one file
+    return ArtifactStore(DEFAULT_CACHE_DIR / "artifacts")
+
+
+@st.cache_resource
+def get_workspaces() -> WorkspacePool:
+    # Build directories per session and template, keeping .aux files between builds
+    return WorkspacePool(DEFAULT_CACHE_DIR / "workspaces")
+
+
+@st.cache_resource
+def get_template_store() -> TemplateStore:
+    # Custom templates of all sessions, stored once per distinct content
+    return TemplateStore()
+
+
+@st.cache_resource
+def get_render_queue() -> RenderQueue:
+    # Background renders for live preview, debounced per session
+    return RenderQueue(artifacts=get_artifact_store())
+
+
+@st.cache_resource
+def get_pandoc_server() -> PandocServerPool | None:
+    # Persistent Pandoc processes; conversions fall back to a subprocess if
+    # the server cannot be used. Set CV_BUILDER_PANDOC_SERVER=0 to disable.
+    if os.environ.get("CV_BUILDER_PANDOC_SERVER") == "0":
+        return None
+    return PandocServerPool()
+
+
+@st.cache_resource
+def get_render_service() -> RenderServiceClient | None:
+    # Builds go to the shared render service (python -m cli.serve) when
+    # CV_BUILDER_RENDER_SERVICE is set, which bounds concurrent engine runs
+    url = os.environ.get("CV_BUILDER_RENDER_SERVICE")
+    return RenderServiceClient(url) if url else None
+
+
+def set_pdf(pdf_bytes: bytes):
+    """Make `pdf_bytes` the session's PDF; the session only keeps its key."""
+    st.session_state.pdf_key = get_artifact_store().put(pdf_bytes)
+    st.session_state.pdf_generated = True
+
+
+def current_pdf_path() -> Path | None:
+    """File of the session's PDF, or None if there is none (or it was evicted)."""
+    if st.session_state.pdf_key is None:
+        return None
+    return get_artifact_store().path(st.session_state.pdf_key)
+
+
+def artifact_download(key: str):
+    """Deferred download data: the artifact is only read when the button is clicked."""
+    store = get_artifact_store()
+
+    def data() -> bytes:
+        view = store.get(key)
+        return view.tobytes() if view is not None else b""
+
+    return data
+
+
+def show_pdf(viewer_key: str):
+    """
+    Show the session's PDF as page images (cached per PDF), which load much
+    faster than the document; the PDF itself is only sent to the browser when
+    the interactive viewer is switched on, or when pdftoppm is not installed.
+    """
+    view = get_artifact_store().get(st.session_state.pdf_key)
+    if view is None:
+        return
+    images = page_previews(view, cache=get_render_cache())
+    if images and not st.toggle("Interactive PDF viewer", key=viewer_key):
+        st.image(images, use_container_width=True)
+    else:
+        st.pdf(current_pdf_path(), height=600)
+
+
 def get_template_options():
     options = list(TEMPLATE_PATHS.keys())
     if st.session_state.custom_template_tex is not None:
@@ -99,13 +251,20 @@ def get_template_options():
     return options
 
 
-def get_active_template_path():
+@contextmanager
+def active_template_path():
+    """Yield the active template's path; custom templates stay pinned until exit."""
     if st.session_state.active_template == "Custom":
-        temp_path = Path("temp_custom_template.tex")
-        temp_path.write_text(st.session_state.custom_template_tex, encoding="utf-8")
-        return temp_path
+        with get_template_store().lease(st.session_state.custom_template_tex) as path:
+            yield path
     else:
-        return TEMPLATE_PATHS[st.session_state.active_template]
+        yield TEMPLATE_PATHS[st.session_state.active_template]
+
+
+def get_active_template_text() -> str:
+    if st.session_state.active_template == "Custom":
+        return st.session_state.custom_template_tex
+    return read_text_asset(TEMPLATE_PATHS[st.session_state.active_template])
 
 
 def get_active_lua_filters():
@@ -141,38 +300,296 @@ def generate_pdf(
         None: Updates the state in st.session_state and triggers a rerun to display the PDF preview.
     """
     try:
-        # Prepare Markdown
-        md_for_pandoc = preprocess_markdown(md_text)
+        # Reject broken inputs before spending seconds in Pandoc and XeLaTeX
+        validate_build(
+            md_text, template_path.read_text(encoding="utf-8"), lua_filter_paths
+        )
 
-        # Generate PDF
-        pdf_bytes = convert_md_to_pdf(md_for_pandoc, template_path, lua_filter_paths)
+        with profile_build() as profile:
+            # Prepare Markdown
+            md_for_pandoc = preprocess_markdown(md_text)
+
+            # Generate PDF, on the render service if one is configured
+            pdf_bytes = None
+            fit_summary = None
+            service = get_render_service()
+            if st.session_state.get("fit_pages"):
+                fit = fit_to_pages(
+                    md_for_pandoc,
+                    template_path,
+                    lua_filter_paths,
+                    st.session_state.fit_pages,
+                    cache=get_render_cache(),
+                    pandoc_server=get_pandoc_server(),
+                    engine=PDF_ENGINE,
+                    workspaces=get_workspaces(),
+                    session=st.session_state.session_key,
+                    native=NATIVE_LATEX,
+                )
+                pdf_bytes = fit.pdf
+                fit_summary = (
+                    f"{'Fits' if fit.fits else 'Does not fit'} on "
+                    f"{st.session_state.fit_pages} page(s) · {fit.layout.describe()} · "
+                    f"{fit.probes} compiles"
+                )
+            elif service is not None:
+                try:
+                    pdf_bytes = service.render(
+                        md_for_pandoc, template_path, lua_filter_paths
+                    )
+                except RenderServiceUnavailable:
+                    pass  # build in-process instead
+            if pdf_bytes is None:
+                pdf_bytes = convert_md_to_pdf(
+                    md_for_pandoc,
+                    template_path,
+                    lua_filter_paths,
+                    cache=get_render_cache(),
+                    pandoc_server=get_pandoc_server(),
+                    engine=PDF_ENGINE,
+                    workspaces=get_workspaces(),
+                    session=st.session_state.session_key,
+                    native=NATIVE_LATEX,
+                )
+            if OPTIMIZE_PDF:
+                pdf_bytes = optimize_pdf(pdf_bytes, cache=get_render_cache())
 
         # Update session state
-        st.session_state.pdf_generated = True
-        st.session_state.pdf_bytes = pdf_bytes
+        set_pdf(pdf_bytes)
+        st.session_state.build_profile = profile.as_dict()
+        st.session_state.fit_summary = fit_summary
 
         # Trigger a rerun to display the PDF preview
         if rerun:
             st.rerun()
+    except RenderServiceBusy:
+        st.warning("Many CVs are being built right now. Please try again in a moment.")
+    except ValidationError as e:
+        st.error("The CV cannot be built, please fix:")
+        st.markdown("\n".join(f"- {issue}" for issue in e.issues))
     except Exception as e:
         st.error("Failed to generate PDF")
         st.code(str(e))
 
 
+def show_build_profile(profile: dict):
+    """Display the stage timings of the last build."""
+    st.dataframe(
+        [
+            {
+                "Stage": s["name"],
+                "Wall (ms)": round(s["wall"] * 1000, 1),
+                "Subprocess CPU (ms)": round(s["children_cpu"] * 1000, 1),
+                "Processes": s["subprocesses"],
+            }
+            for s in profile["stages"]
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+    cache = ", ".join(f"{c['kind']}: {c['outcome']}" for c in profile["cache"])
+    st.caption(
+        f"Total {profile['wall'] * 1000:.0f} ms · "
+        f"{profile['subprocesses']} processes · "
+        f"cache {cache or 'n/a'} · "
+        f"peak RSS {profile['peak_child_rss_kb'] / 1024:.0f} MiB (largest subprocess)"
+    )
+
+
+def build_exports(
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path],
+    formats: tuple[str, ...] = EXPORT_FORMATS,
+) -> dict[str, str]:
+    """
+    Exports (LaTeX, PDF, HTML, DOCX by default) from a single parse, kept in
+    the artifact store. Repeated requests are served by the render cache.
+
+    Returns:
+        Mapping of format to artifact key.
+    """
+    validate_build(md_text, template_path.read_text(encoding="utf-8"), lua_filter_paths)
+    exports = render_exports(
+        md_text=preprocess_markdown(md_text),
+        template_path=template_path,
+        lua_filter_paths=lua_filter_paths,
+        formats=formats,
+        cache=get_render_cache(),  # shares both stages of the PDF build
+        pandoc_server=get_pandoc_server(),
+        engine=PDF_ENGINE,
+        workspaces=get_workspaces(),
+        session=st.session_state.session_key,
+        optimize=OPTIMIZE_PDF,
+    )
+    store = get_artifact_store()
+    return {fmt: store.put(data) for fmt, data in exports.items()}
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_draft_preview(
+    md_text: str,
+    template_text: str,
+    lua_filter_names: tuple[str, ...],
+    _template_path: Path,
+    _lua_filter_paths: list[Path],
+) -> str:
+    """
+    Memoized HTML draft of the CV, keyed on markdown, template contents and filters.
+    Underscore arguments are excluded from the memoization key.
+    """
+    return convert_md_to_html(
+        preprocess_markdown(md_text),
+        _template_path,
+        _lua_filter_paths,
+        cache=get_render_cache(),
+        pandoc_server=get_pandoc_server(),
+    )
+
+
+def draft_preview_panel():
+    """Show the HTML draft and build the PDF only on request."""
+    lua_filter_paths = get_active_lua_filters()
+    try:
+        with active_template_path() as template_path:
+            html = build_draft_preview(
+                st.session_state.md_text,
+                get_active_template_text(),
+                tuple(str(lf) for lf in lua_filter_paths),
+                template_path,
+                lua_filter_paths,
+            )
+        components.html(html, height=600, scrolling=True)
+    except Exception as e:
+        st.error("Failed to render draft preview")
+        st.code(str(e))
+
+    st.caption("Draft layout: the PDF may differ in line and page breaks.")
+    if st.button("🚀 Build PDF", type="primary", use_container_width=True):
+        with active_template_path() as template_path:
+            generate_pdf(st.session_state.md_text, template_path, lua_filter_paths)
+
+
+def submit_live_render():
+    """
+    Queue a debounced background render of the current editor state.
+    Resubmitting unchanged inputs is a no-op; newer inputs cancel older renders.
+    """
+    md_text = st.session_state.md_text
+    template_name = st.session_state.active_template
+    custom_template_tex = (
+        st.session_state.custom_template_tex if template_name == "Custom" else None
+    )
+    lua_filter_paths = get_active_lua_filters()
+
+    # Resolved here: the render runs outside the Streamlit script thread
+    cache = get_render_cache()
+    template_store = get_template_store()
+    pandoc_server = get_pandoc_server()
+    workspaces = get_workspaces()
+    session = st.session_state.session_key
+    fit_pages = st.session_state.get("fit_pages") or None
+
+    def build(md_for_pandoc: str, template_path: Path, cancel) -> bytes:
+        if fit_pages is None:
+            return convert_md_to_pdf(
+                md_for_pandoc,
+                template_path,
+                lua_filter_paths,
+                cache=cache,
+                cancel=cancel,
+                pandoc_server=pandoc_server,
+                engine=PDF_ENGINE,
+                workspaces=workspaces,
+                session=session,
+                native=NATIVE_LATEX,
+                optimize=OPTIMIZE_PDF,
+            )
+        pdf_bytes = fit_to_pages(
+            md_for_pandoc,
+            template_path,
+            lua_filter_paths,
+            fit_pages,
+            cache=cache,
+            pandoc_server=pandoc_server,
+            engine=PDF_ENGINE,
+            cancel=cancel,
+            workspaces=workspaces,
+            session=session,
+            native=NATIVE_LATEX,
+        ).pdf
+        return optimize_pdf(pdf_bytes, cache=cache) if OPTIMIZE_PDF else pdf_bytes
+
+    def render(cancel):
+        validate_build(
+            md_text,
+            custom_template_tex or TEMPLATE_PATHS[template_name].read_text("utf-8"),
+            lua_filter_paths,
+        )
+        md_for_pandoc = preprocess_markdown(md_text)
+        if custom_template_tex is None:
+            return build(md_for_pandoc, TEMPLATE_PATHS[template_name], cancel)
+        with template_store.lease(custom_template_tex) as template_path:
+            return build(md_for_pandoc, template_path, cancel)
+
+    key = (
+        md_text,
+        template_name,
+        custom_template_tex,
+        tuple(map(str, lua_filter_paths)),
+        fit_pages,
+    )
+    get_render_queue().submit(st.session_state.session_key, key, render)
+
+
+@st.fragment(run_every=0.5)
+def live_preview_panel():
+    """Poll the render queue and show the newest finished render."""
+    queue = get_render_queue()
+    result = queue.latest(st.session_state.session_key)
+
+    if result is not None and result.seq != st.session_state.live_seq:
+        st.session_state.live_seq = result.seq
+        if result.error is None:
+            st.session_state.pdf_generated = True
+            st.session_state.pdf_key = result.pdf_key
+            # Both describe the last manual build, not this PDF
+            st.session_state.build_profile = None
+            st.session_state.fit_summary = None
+
+    if queue.pending(st.session_state.session_key):
+        st.caption("⏳ Rendering latest changes…")
+    elif result is not None and result.error is None:
+        st.caption(f"Rendered in {result.build_time:.2f}s")
+
+    if result is not None and result.error is not None:
+        st.error("Failed to generate PDF")
+        st.code(result.error)
+
+    if current_pdf_path() is not None:
+        show_pdf("live_pdf_viewer")
+
+
 def on_template_change():
     st.session_state.active_template = st.session_state.template_name
-    generate_pdf(
-        st.session_state.md_text,
-        get_active_template_path(),
-        get_active_lua_filters(),
-        rerun=False,
-    )
+    with active_template_path() as template_path:
+        generate_pdf(
+            st.session_state.md_text,
+            template_path,
+            get_active_lua_filters(),
+            rerun=False,
+        )
 
 
 # -----------------------------------------------------------------------------
 # Markdown Editor and PDF Preview
 # -----------------------------------------------------------------------------
 
+if st.session_state.pdf_generated and current_pdf_path() is None:
+    # Evicted from the artifact store (size budget): build it again on request
+    st.session_state.pdf_generated = False
+    st.session_state.pdf_key = None
+
 editor_col, preview_col = st.columns([1, 1], gap="medium")
 
 # Left column: Markdown editor
@@ -210,32 +627,57 @@ with editor_col:
 with preview_col:
     st.subheader("PDF Preview")
 
-    if not st.session_state.pdf_generated:
+    draft_preview = st.toggle(
+        "Draft preview",
+        key="draft_preview",
+        help="Fast HTML rendering while you type; the PDF is built when you ask for it",
+    )
+    live_preview = not draft_preview and st.toggle(
+        "Live preview",
+        key="live_preview",
+        help="Re-render automatically in the background while you type",
+    )
+
+    if draft_preview:
+        draft_preview_panel()
+    elif live_preview:
+        submit_live_render()
+        live_preview_panel()
+    elif not st.session_state.pdf_generated:
         # Generate PDF button
         if st.button("🚀 Generate PDF", type="primary", use_container_width=True):
-            generate_pdf(
-                st.session_state.md_text,
-                get_active_template_path(),
-                get_active_lua_filters(),
-            )
+            with active_template_path() as template_path:
+                generate_pdf(
+                    st.session_state.md_text,
+                    template_path,
+                    get_active_lua_filters(),
+                )
     else:
         # Display PDF preview
-        st.pdf(st.session_state.pdf_bytes, height=600)
+        show_pdf("pdf_viewer")
 
         st.success("PDF generated successfully.")
+        if st.session_state.fit_summary:
+            st.caption(f"📐 {st.session_state.fit_summary}")
+
+        if st.session_state.build_profile and st.toggle(
+            "Show build timings", key="show_build_timings"
+        ):
+            show_build_profile(st.session_state.build_profile)
 
         # Regenerate PDF button
         if st.button("🚀 Regenerate PDF", type="primary", use_container_width=True):
-            generate_pdf(
-                st.session_state.md_text,
-                get_active_template_path(),
-                get_active_lua_filters(),
-            )
+            with active_template_path() as template_path:
+                generate_pdf(
+                    st.session_state.md_text,
+                    template_path,
+                    get_active_lua_filters(),
+                )
 
         # Download button for PDF
         st.download_button(
             label="⬇️ Download CV PDF",
-            data=st.session_state.pdf_bytes,
+            data=artifact_download(st.session_state.pdf_key),
             file_name="cv.pdf",
             mime="application/pdf",
             use_container_width=True,
@@ -259,9 +701,21 @@ with template_col:
         on_change=on_template_change,
     )
 
+# Build settings
+with settings_col:
+    st.number_input(
+        "Fit to pages",
+        min_value=0,
+        max_value=10,
+        step=1,
+        key="fit_pages",
+        help="Tighten font size, line spacing, margins and list spacing until the "
+        "CV fits on this many pages (0: use the template as is)",
+    )
+
 # Template editor
 with st.expander("Edit template", expanded=False):
-    template_code = get_active_template_path().read_text(encoding="utf-8")
+    template_code = get_active_template_text()
 
     if st.session_state.active_template == "Custom":
         # Editable text area for custom template
@@ -338,7 +792,11 @@ with export_col1:
     st.download_button(
         label="⬇️ Download PDF",
         type="primary",
-        data=st.session_state.pdf_bytes if st.session_state.pdf_generated else b"",
+        data=(
+            artifact_download(st.session_state.pdf_key)
+            if st.session_state.pdf_generated
+            else b""
+        ),
         file_name="cv.pdf",
         mime="application/pdf",
         use_container_width=True,
@@ -347,18 +805,63 @@ with export_col1:
 
 
 with export_col2:
-    st.download_button(
-        label="⬇️ Download LaTeX (for Overleaf)",
-        data=convert_md_to_latex(
-            md_text=st.session_state.md_text,
-            template_path=get_active_template_path(),
-            lua_filter_paths=get_active_lua_filters(),
-        ).encode("utf-8"),
-        file_name="cv.tex",
-        mime="text/x-tex",
-        use_container_width=True,
+    # Only compared on rerun; Pandoc runs when the user asks for the exports
+    export_inputs = (
+        st.session_state.md_text,
+        get_active_template_text(),
+        tuple(str(lf) for lf in get_active_lua_filters()),
     )
 
+    store = get_artifact_store()
+    if st.session_state.exports_inputs == export_inputs and all(
+        store.path(key) is not None for key in st.session_state.exports.values()
+    ):
+        exports = st.session_state.exports
+        st.download_button(
+            label="⬇️ Download LaTeX (for Overleaf)",
+            data=artifact_download(exports["latex"]),
+            file_name="cv.tex",
+            mime="text/x-tex",
+            use_container_width=True,
+        )
+        st.download_button(
+            label="⬇️ Download HTML",
+            data=artifact_download(exports["html"]),
+            file_name="cv.html",
+            mime="text/html",
+            use_container_width=True,
+        )
+        st.download_button(
+            label="⬇️ Download Word (DOCX)",
+            data=artifact_download(exports["docx"]),
+            file_name="cv.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            use_container_width=True,
+        )
+    elif st.button("⚙️ Prepare exports (LaTeX, HTML, Word)", use_container_width=True):
+        try:
+            # A PDF fitted to pages is kept; the exports' PDF is not fitted
+            fitted = bool(st.session_state.get("fit_pages"))
+            with active_template_path() as template_path:
+                exports = build_exports(
+                    st.session_state.md_text,
+                    template_path,
+                    get_active_lua_filters(),
+                    formats=("latex", "html", "docx") if fitted else EXPORT_FORMATS,
+                )
+            st.session_state.exports = exports
+            st.session_state.exports_inputs = export_inputs
+            if "pdf" in exports:
+                # The PDF comes from the same parse
+                st.session_state.pdf_generated = True
+                st.session_state.pdf_key = exports["pdf"]
+                st.session_state.build_profile = None
+                st.session_state.fit_summary = None
+            st.rerun()
+        except Exception as e:
+            st.error("Failed to generate exports")
+            st.code(str(e))
+
 
 with export_col3:
     st.download_button(
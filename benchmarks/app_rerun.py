@@ -0,0 +1,72 @@
+"""
+Benchmark: Streamlit rerun latency of `app/app.py` under typing load.
+
+Simulates a user typing into the Markdown editor (one rerun per keystroke)
+using Streamlit's headless AppTest runner and checks the rerun path against
+the target documented in the README:
+
+    p95 rerun latency <= 100 ms and no subprocess spawned while typing.
+
+Usage:
+    python -m benchmarks.app_rerun [--keystrokes 50] [--target-ms 100]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app" / "app.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keystrokes", type=int, default=50)
+    parser.add_argument("--target-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    # Count every process the app starts; the script runs in this process
+    spawned = []
+    original_init = subprocess.Popen.__init__
+
+    def counting_init(self, cmd, *a, **kw):
+        spawned.append(cmd)
+        original_init(self, cmd, *a, **kw)
+
+    subprocess.Popen.__init__ = counting_init
+
+    app = AppTest.from_file(APP_PATH, default_timeout=30)
+    app.run()  # warm-up: imports, cached resources
+    editor = app.text_area(key="cv_editor")
+    text = editor.value
+    spawned.clear()
+
+    timings = []
+    for i in range(args.keystrokes):
+        text += "abcdefghij"[i % 10]
+        start = time.perf_counter()
+        app.text_area(key="cv_editor").set_value(text).run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if app.exception:
+            print(app.exception)
+            sys.exit(1)
+
+    p50 = statistics.median(timings)
+    p95 = statistics.quantiles(timings, n=20, method="inclusive")[-1]
+    print(
+        f"{args.keystrokes} reruns · p50 {p50:.1f} ms · p95 {p95:.1f} ms · "
+        f"max {max(timings):.1f} ms · subprocesses {len(spawned)}"
+    )
+
+    if p95 > args.target_ms or spawned:
+        print(f"❌ target missed (p95 <= {args.target_ms:.0f} ms, 0 subprocesses)")
+        sys.exit(1)
+    print("✅ target met")
+
+
+if __name__ == "__main__":
+    main()
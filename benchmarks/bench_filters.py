@@ -0,0 +1,61 @@
+"""
+Benchmark: built-in Lua filters applied one after another vs. the fused
+single-pass filter (filters/cv.lua).
+
+Generates CVs with large multi-column skill tables and long experience
+sections, converts them to LaTeX both ways and checks the output is identical.
+
+Usage:
+    python -m benchmarks.bench_filters [--runs 3]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.run import timed
+from benchmarks.synthetic import experience_cv, skills_cv
+from utils.markdown_processor import convert_md_to_latex, preprocess_markdown
+
+TEMPLATE = Path("templates/modern.tex")
+FILTERS = [Path("filters/inline_dates.lua"), Path("filters/columns.lua")]
+
+
+CASES = {
+    "skills 4x50": skills_cv(4, 50),
+    "skills 6x500": skills_cv(6, 500),
+    "experience 50x5": experience_cv(50, 5),
+    "experience 500x8": experience_cv(500, 8),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    identical = True
+    for name, md_text in CASES.items():
+        md_text = preprocess_markdown(md_text)
+        separate_ms, separate = timed(
+            lambda: convert_md_to_latex(md_text, TEMPLATE, FILTERS, fuse_filters=False),
+            args.runs,
+        )
+        fused_ms, fused = timed(
+            lambda: convert_md_to_latex(md_text, TEMPLATE, FILTERS, fuse_filters=True),
+            args.runs,
+        )
+        same = separate == fused
+        identical &= same
+        print(
+            f"{name:<18} separate {separate_ms:8.1f} ms · fused {fused_ms:8.1f} ms · "
+            f"speedup {separate_ms / fused_ms:4.2f}x · "
+            f"output {'identical' if same else 'DIFFERENT'}"
+        )
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: XeLaTeX compile time with and without a precompiled preamble format.
+
+Renders each template once through Pandoc, then compiles the resulting LaTeX
+repeatedly from scratch and from the cached format, and checks that both
+variants produce the same PDF (ignoring timestamps and document IDs).
+
+Usage:
+    python -m benchmarks.bench_format [--runs 5] [--input examples/default.md]
+"""
+
+import argparse
+import os
+import re
+import sys
+from functools import partial
+from pathlib import Path
+
+from benchmarks.run import timed
+from utils.markdown_processor import (
+    compile_latex_to_pdf,
+    convert_md_to_latex,
+    preprocess_markdown,
+)
+
+TEMPLATES = [Path("templates/modern.tex"), Path("templates/harvard.tex")]
+FILTERS = [Path("filters/inline_dates.lua"), Path("filters/columns.lua")]
+
+_VOLATILE = re.compile(rb"/(CreationDate|ModDate|ID)\s*(\(.*?\)|\[.*?\])", re.DOTALL)
+
+
+def normalize_pdf(pdf: bytes) -> bytes:
+    return _VOLATILE.sub(b"", pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--input", type=Path, default=Path("examples/default.md"))
+    args = parser.parse_args()
+
+    # Reproducible PDFs so outputs can be compared byte for byte
+    os.environ.setdefault("SOURCE_DATE_EPOCH", "0")
+    md_text = preprocess_markdown(args.input.read_text(encoding="utf-8"))
+
+    identical = True
+    for template in TEMPLATES:
+        template_text = template.read_text(encoding="utf-8")
+        latex = convert_md_to_latex(md_text, template, FILTERS)
+
+        # First call dumps the format; not part of the measurement
+        compile_latex_to_pdf(latex, template_text=template_text)
+
+        compile_pdf = partial(compile_latex_to_pdf, latex, template_text=template_text)
+        cold_ms, cold_pdf = timed(
+            partial(compile_pdf, precompiled_format=False), args.runs
+        )
+        warm_ms, warm_pdf = timed(
+            partial(compile_pdf, precompiled_format=True), args.runs
+        )
+
+        same = normalize_pdf(cold_pdf) == normalize_pdf(warm_pdf)
+        identical &= same
+        print(
+            f"{template.name:<12} from scratch {cold_ms:7.0f} ms · "
+            f"precompiled format {warm_ms:7.0f} ms · "
+            f"speedup {cold_ms / warm_ms:4.1f}x · "
+            f"output {'identical' if same else 'DIFFERENT'}"
+        )
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark and golden test: in-process LaTeX renderer vs. Pandoc.
+
+Renders the example CV and synthetic CVs with every template and built-in
+filter combination both ways, checks the native output is byte-identical to
+Pandoc's and reports the time saved. Documents outside the supported subset
+are listed as falling back to Pandoc.
+
+Usage:
+    python -m benchmarks.bench_native_latex [--runs 3]
+"""
+
+import argparse
+import difflib
+import sys
+from pathlib import Path
+
+from benchmarks.run import TEMPLATES, filter_combinations, timed
+from benchmarks.synthetic import experience_cv, skills_cv, synthetic_cv
+from utils.markdown_processor import (
+    FUSED_FILTER_FLAGS,
+    convert_md_to_latex,
+    fuse_lua_filters,
+    preprocess_markdown,
+)
+from utils.native_latex import render_latex
+
+
+def cases() -> dict[str, str]:
+    return {
+        "examples/default.md": Path("examples/default.md").read_text("utf-8"),
+        # Its summary line uses markdown the native renderer leaves to Pandoc
+        "synthetic small": synthetic_cv("small"),
+        "skills 6x500": skills_cv(6, 500),
+        "experience 500x8": experience_cv(500, 8),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for name, md_text in cases().items():
+        md_text = preprocess_markdown(md_text)
+        for template_name, template in TEMPLATES.items():
+            template_text = template.read_text(encoding="utf-8")
+            for combo, filters in filter_combinations().items():
+                label = f"{name} · {template_name} · {combo}"
+                _, extra_args = fuse_lua_filters(filters)
+                flags = {
+                    flag: f"--metadata={flag}=true" in extra_args
+                    for flag in FUSED_FILTER_FLAGS.values()
+                }
+                native = render_latex(
+                    md_text,
+                    template_text,
+                    inline_dates=flags["cv-inline-dates"],
+                    columns=flags["cv-columns"],
+                )
+                pandoc_ms, expected = timed(
+                    lambda: convert_md_to_latex(md_text, template, filters), args.runs
+                )
+                if native is None:
+                    print(f"{label:<58} falls back to Pandoc ({pandoc_ms:7.1f} ms)")
+                    continue
+                native_ms, _ = timed(
+                    lambda: convert_md_to_latex(
+                        md_text, template, filters, native=True
+                    ),
+                    args.runs,
+                )
+                same = native == expected
+                mismatches += not same
+                print(
+                    f"{label:<58} pandoc {pandoc_ms:7.1f} ms · native "
+                    f"{native_ms:7.2f} ms · speedup {pandoc_ms / native_ms:6.0f}x · "
+                    f"output {'identical' if same else 'DIFFERENT'}"
+                )
+                if not same:
+                    sys.stdout.writelines(
+                        difflib.unified_diff(
+                            expected.splitlines(True),
+                            native.splitlines(True),
+                            "pandoc",
+                            "native",
+                            n=1,
+                        )
+                    )
+
+    if mismatches:
+        print(f"{mismatches} native render(s) differ from Pandoc")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
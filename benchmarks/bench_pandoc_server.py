@@ -0,0 +1,61 @@
+"""
+Benchmark: Markdown → LaTeX through a Pandoc subprocess vs. the persistent
+`pandoc server` pool (with the built-in filters applied in Python).
+
+Converts synthetic CVs both ways for both templates and checks the LaTeX is
+identical, so the Python filter port stays in sync with filters/cv.lua.
+
+Usage:
+    python -m benchmarks.bench_pandoc_server [--runs 5]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.run import timed
+from benchmarks.synthetic import SIZES, synthetic_cv
+from utils.markdown_processor import convert_md_to_latex, preprocess_markdown
+from utils.pandoc_server import PandocServerPool
+
+TEMPLATES = [Path("templates/modern.tex"), Path("templates/harvard.tex")]
+FILTERS = [Path("filters/inline_dates.lua"), Path("filters/columns.lua")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    pool = PandocServerPool(size=1)
+    pool.convert("warm up", "markdown", "json")  # raises if the server is unavailable
+
+    identical = True
+    for template in TEMPLATES:
+        for size in SIZES:
+            md_text = preprocess_markdown(synthetic_cv(size))
+            process_ms, expected = timed(
+                lambda: convert_md_to_latex(md_text, template, FILTERS), args.runs
+            )
+            server_ms, latex = timed(
+                lambda: convert_md_to_latex(
+                    md_text, template, FILTERS, pandoc_server=pool
+                ),
+                args.runs,
+            )
+            same = latex == expected
+            identical &= same
+            print(
+                f"{template.stem:<8} {size:<7} subprocess {process_ms:8.1f} ms · "
+                f"server {server_ms:8.1f} ms · "
+                f"speedup {process_ms / server_ms:4.2f}x · "
+                f"output {'identical' if same else 'DIFFERENT'}"
+            )
+
+    pool.close()
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: PDF post-processing against the engine's output.
+
+Builds the example CV and synthetic CVs (or takes existing PDFs with
+`--pdf`) and measures, per document:
+
+- size of the PDF as written by the engine vs. linearized with compressed
+  object streams (qpdf), and the time the optimization takes;
+- time to rasterize the page previews (pdftoppm) cold and from the cache,
+  and what the browser loads first: the first page image vs. the PDF.
+
+Usage:
+    python -m benchmarks.bench_pdf_output [--runs 3] [--pdf FILE ...]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.run import timed
+from benchmarks.synthetic import synthetic_cv
+from utils.markdown_processor import convert_md_to_pdf, preprocess_markdown
+from utils.pdf_postprocess import is_linearized, optimize_pdf, page_previews
+from utils.pdf_tools import pdf_page_count
+from utils.render_cache import RenderCache
+from utils.tools import tool_path
+
+TEMPLATE = Path("templates/modern.tex")
+FILTERS = [Path("filters/inline_dates.lua"), Path("filters/columns.lua")]
+
+
+def documents(pdf_paths: list[Path]) -> dict[str, bytes]:
+    if pdf_paths:
+        return {path.name: path.read_bytes() for path in pdf_paths}
+    sources = {"examples/default.md": Path("examples/default.md").read_text("utf-8")}
+    for size in ("small", "medium", "large"):
+        sources[f"synthetic {size}"] = synthetic_cv(size)
+    return {
+        name: convert_md_to_pdf(preprocess_markdown(md_text), TEMPLATE, FILTERS)
+        for name, md_text in sources.items()
+    }
+
+
+def kib(n: int) -> str:
+    return f"{n / 1024:7.1f} KiB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--pdf", type=Path, nargs="+", default=[], help="measure these PDFs instead"
+    )
+    args = parser.parse_args()
+
+    missing = [tool for tool in ("qpdf", "pdftoppm") if tool_path(tool) is None]
+    if len(missing) == 2:
+        print("Neither qpdf nor pdftoppm is installed; nothing to measure.")
+        sys.exit(1)
+    for tool in missing:
+        print(f"{tool} is not installed; skipping its measurements.")
+
+    for name, raw in documents(args.pdf).items():
+        pages = pdf_page_count(raw)
+        print(f"{name} ({'?' if pages is None else pages} pages)")
+        served = raw
+        if tool_path("qpdf") is not None:
+            optimize_ms, optimized = timed(lambda: optimize_pdf(raw), args.runs)
+            served = optimized
+            print(
+                f"  engine output {kib(len(raw))} · optimized {kib(len(optimized))} "
+                f"({len(optimized) / len(raw):4.0%}) in {optimize_ms:6.1f} ms · "
+                f"linearized {is_linearized(raw)} → {is_linearized(optimized)}"
+            )
+        if tool_path("pdftoppm") is not None:
+            cold_ms, images = timed(lambda: page_previews(served), args.runs)
+            cache = RenderCache()
+            page_previews(served, cache=cache)
+            warm_ms, _ = timed(lambda: page_previews(served, cache=cache), args.runs)
+            print(
+                f"  previews: {len(images)} pages, {kib(sum(map(len, images)))} · "
+                f"cold {cold_ms:6.1f} ms · cached {warm_ms:6.2f} ms · "
+                f"first paint {kib(len(images[0]) if images else 0)} "
+                f"vs. PDF {kib(len(served))}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Check: the live-preview render queue keeps idle sessions' results.
+
+Fills a `RenderQueue` with sessions below, at and above `max_slots` and
+verifies that a submit only drops the least recently used idle slots above
+the limit, never a session's result while the queue has room, and never a
+slot whose render is still waiting or running. Runs in process with dummy
+jobs; exits with status 1 on the first violation.
+
+Usage:
+    python -m benchmarks.check_render_queue [--max-slots 10]
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from utils.render_queue import RenderQueue
+
+
+def job(cancel: threading.Event) -> bytes:
+    return b"%PDF-1.4\n"
+
+
+def settle(queue: RenderQueue, slot_ids: list[str]) -> None:
+    deadline = time.monotonic() + 10
+    while any(queue.pending(s) for s in slot_ids):
+        if time.monotonic() > deadline:
+            raise TimeoutError("renders did not finish")
+        time.sleep(0.01)
+
+
+def check(max_slots: int) -> list[str]:
+    failures = []
+    queue = RenderQueue(max_workers=2, debounce=0.01, max_slots=max_slots)
+
+    # Up to the limit: every session keeps its result
+    sessions = []
+    for n in range(max_slots):
+        sessions.append(f"s{n}")
+        queue.submit(sessions[-1], sessions[-1], job)
+        settle(queue, sessions)
+        lost = [s for s in sessions if queue.latest(s) is None]
+        if lost:
+            failures.append(f"at {n + 1} of {max_slots} slots, lost {lost}")
+            break
+
+    # Above the limit: only the least recently used idle slot goes
+    queue.submit("extra", "extra", job)
+    settle(queue, ["extra"])
+    lost = [s for s in sessions[1:] + ["extra"] if queue.latest(s) is None]
+    if lost or queue.latest(sessions[0]) is not None:
+        failures.append(
+            f"above the limit, expected only {sessions[0]} dropped, lost {lost}"
+        )
+
+    # Slots with a render still waiting are kept even above the limit
+    busy = RenderQueue(max_workers=1, debounce=60, max_slots=max_slots)
+    waiting = [f"w{n}" for n in range(max_slots + 2)]
+    for slot_id in waiting:
+        busy.submit(slot_id, slot_id, job)
+    dropped = [s for s in waiting if not busy.pending(s)]
+    if dropped:
+        failures.append(f"dropped slots with a pending render: {dropped}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-slots", type=int, nargs="+", default=[1, 2, 10, 64])
+    args = parser.parse_args()
+
+    failed = False
+    for max_slots in args.max_slots:
+        failures = check(max_slots)
+        print(f"max_slots={max_slots:<4} {'ok' if not failures else 'FAILED'}")
+        for failure in failures:
+            print(f"      ❌ {failure}")
+        failed |= bool(failures)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
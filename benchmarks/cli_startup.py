@@ -0,0 +1,158 @@
+"""
+Benchmark: startup cost of `python -m cli.main` for runs that end before a build.
+
+Batch scripts call the CLI thousands of times, so `--help` and input
+validation must not import the build stack, and repeated runs must not
+re-probe Pandoc and the TeX engine. Checks the target documented in the
+README: none of the heavy modules imported, and no `--version` probe once
+the tool cache is warm.
+
+Startup time is reported above a bare interpreter, next to the floor every
+argparse CLI started with `-m` pays (argparse, pathlib, runpy). Absolute
+timings depend on the machine, so a time budget is only enforced when
+given with `--target-ms`.
+
+Usage:
+    python -m benchmarks.cli_startup [--runs 20] [--target-ms 50]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Modules only a build needs; importing any of them before validation fails
+HEAVY_MODULES = (
+    "utils.markdown_processor",
+    "utils.render_service",
+    "cli.batch",
+    "concurrent.futures",
+    "http.client",
+    "urllib.request",
+    "webbrowser",
+)
+
+# What any argparse CLI run with `python -m` imports before its own code
+FLOOR = "import argparse, pathlib, runpy"
+
+# Runs the CLI in-process and reports which heavy modules it imported
+IMPORT_PROBE = """
+import sys
+from cli.main import main
+sys.argv = ["cli.main", *sys.argv[1:]]
+try:
+    main()
+except SystemExit:
+    pass
+print("heavy:" + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+# Reads tool versions and reports the processes that took
+PROBE_COUNT = """
+import subprocess
+spawned = []
+original_init = subprocess.Popen.__init__
+
+def counting_init(self, cmd, *a, **kw):
+    spawned.append(cmd)
+    original_init(self, cmd, *a, **kw)
+
+subprocess.Popen.__init__ = counting_init
+from utils.latex_format import tex_installation_stamp
+from utils.tools import tool_version
+tool_version("pandoc")
+tex_installation_stamp("xelatex")
+print(len(spawned))
+"""
+
+
+def run_ms(cmd: list[str], env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, capture_output=True, env=env, check=False)
+    return (time.perf_counter() - start) * 1000
+
+
+def overhead(cmd: list[str], runs: int, env: dict) -> tuple[float, float]:
+    """
+    Median and interquartile range of `cmd`'s startup above a bare interpreter.
+
+    Runs alternate with bare interpreter runs and each pair is compared, so
+    load that changes while the benchmark runs affects both sides alike.
+    """
+    bare = [sys.executable, "-c", "pass"]
+    run_ms(cmd, env)  # writes bytecode caches, warms the file system cache
+    deltas = [run_ms(cmd, env) - run_ms(bare, env) for _ in range(runs)]
+    quartiles = statistics.quantiles(deltas, n=4, method="inclusive")
+    return statistics.median(deltas), quartiles[2] - quartiles[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--target-ms", type=float, help="fail if a median startup exceeds this"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {**os.environ, "CV_BUILDER_CACHE_DIR": cache_dir}
+        bare = statistics.median(
+            run_ms([sys.executable, "-c", "pass"], env) for _ in range(args.runs)
+        )
+        floor, _ = overhead([sys.executable, "-c", FLOOR], args.runs, env)
+        print(
+            f"bare interpreter: {bare:.1f} ms · argparse/pathlib floor: +{floor:.1f} ms"
+        )
+
+        cases = {
+            "--help": ["--help"],
+            "missing input": ["does-not-exist.md", "--no-cache"],
+        }
+        for name, cli_args in cases.items():
+            cmd = [sys.executable, "-m", "cli.main", *cli_args]
+            median, spread = overhead(cmd, args.runs, env)
+            output = subprocess.run(
+                [sys.executable, "-c", IMPORT_PROBE.format(heavy=HEAVY_MODULES)]
+                + cli_args,
+                capture_output=True,
+                text=True,
+                env=env,
+                check=False,
+            ).stdout
+            imported = output.rpartition("heavy:")[2].strip()
+            print(
+                f"{name:>14}: +{median:.1f} ms (IQR {spread:.1f} ms) · "
+                f"heavy imports: {imported or 'none'}"
+            )
+            failed |= bool(imported)
+            if args.target_ms is not None:
+                failed |= median > args.target_ms
+
+        probes = []
+        for _ in range(2):  # cold, then warm tool cache
+            result = subprocess.run(
+                [sys.executable, "-c", PROBE_COUNT],
+                capture_output=True,
+                text=True,
+                env=env,
+                check=True,
+            )
+            probes.append(int(result.stdout.split()[-1]))
+        print(f"tool probes: {probes[0]} cold · {probes[1]} warm")
+        failed |= probes[1] > 0
+
+    target = "no heavy imports, 0 warm probes"
+    if args.target_ms is not None:
+        target = f"+{args.target_ms:.0f} ms, {target}"
+    if failed:
+        print(f"❌ target missed ({target})")
+        sys.exit(1)
+    print(f"✅ target met ({target})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Load test: concurrent editing sessions against one instance of `app/app.py`.
+
+Every simulated user is a headless Streamlit session (AppTest) in its own
+thread of this process, so the sessions share the app's cached resources
+(render cache, artifact store, Pandoc server pool, render queue) the way
+browser tabs share one Streamlit server. Each user runs a random mix of
+actions with think time in between:
+
+    type      one keystroke in the Markdown editor (a script rerun)
+    generate  "Generate PDF" / "Regenerate PDF"
+    template  switch the template (runs `on_template_change`)
+    export    "Prepare exports" (LaTeX, HTML, Word and PDF)
+
+For each concurrency level the run reports p50/p95/p99 latency per action,
+throughput, peak RSS of this process plus its child processes, and the
+number of processes spawned. With `--stub`, Pandoc and the LaTeX engine are
+replaced by in-process stand-ins with fixed delays, so results do not depend
+on the TeX installation. Everything runs offline; RSS sampling needs Linux.
+
+Usage:
+    python -m benchmarks.load_test [--users 1 2 4 8] [--actions 40] [--stub]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app" / "app.py")
+
+# Relative frequency of each action
+ACTION_WEIGHTS = {"type": 70, "generate": 15, "template": 10, "export": 5}
+KEYS = "abcdefghijklmnopqrstuvwxyz "
+
+
+def _stub_pdf(tag: str) -> bytes:
+    """A valid one-page PDF whose content depends on `tag`."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>",
+    ]
+    out = b"%PDF-1.4\n%" + tag.encode() + b"\n"
+    offsets = []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    return out + b"startxref\n%d\n%%%%EOF\n" % xref
+
+
+class Stubs:
+    """Stand-ins for Pandoc and the engine: deterministic output, fixed delays."""
+
+    def __init__(self, pandoc_ms: float, engine_ms: float):
+        self.pandoc_s = pandoc_ms / 1000
+        self.engine_s = engine_ms / 1000
+        self.calls = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def convert_text(self, source: str, to: str, format: str, **kwargs) -> str:
+        self._count("pandoc")
+        time.sleep(self.pandoc_s)
+        digest = hashlib.sha256(f"{format}>{to}:{source}".encode()).hexdigest()[:16]
+        if to == "json":
+            output = json.dumps(
+                {
+                    "pandoc-api-version": [1, 23, 1],
+                    "meta": {},
+                    "blocks": [{"t": "Para", "c": [{"t": "Str", "c": digest}]}],
+                }
+            )
+        elif to == "latex":
+            output = (
+                "\\documentclass{article}\n\\begin{document}\n"
+                f"{digest}\n\\end{{document}}\n"
+            )
+        else:
+            output = f"{to} {digest}\n"
+        if kwargs.get("outputfile"):
+            Path(kwargs["outputfile"]).write_text(output, encoding="utf-8")
+            return ""
+        return output
+
+    def run_engine(self, cmd, cwd, env, cancel=None) -> int:
+        from utils.markdown_processor import BuildCancelled
+
+        self._count("engine")
+        deadline = time.monotonic() + self.engine_s
+        while time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                raise BuildCancelled("Build cancelled")
+            time.sleep(min(0.01, max(0.0, deadline - time.monotonic())))
+        latex = (Path(cwd) / "cv.tex").read_bytes()
+        (Path(cwd) / "cv.pdf").write_bytes(
+            _stub_pdf(hashlib.sha256(latex).hexdigest()[:16])
+        )
+        return 0
+
+    def install(self):
+        import utils.markdown_processor as mp
+
+        mp._convert_text = self.convert_text
+        mp._run_engine = self.run_engine
+        mp.prepare_for_format = lambda latex, template_text, executable: (latex, None)
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _descendants(pid: int) -> list[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children + [d for child in children for d in _descendants(child)]
+
+
+class RssSampler:
+    """Peak RSS of this process plus all its descendants, sampled in a thread."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        pid = os.getpid()
+        while not self._stop.is_set():
+            total = _rss_kb(pid) + sum(_rss_kb(p) for p in _descendants(pid))
+            self.peak_kb = max(self.peak_kb, total)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if sys.platform.startswith("linux"):
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+class ProcessCounter:
+    """Counts processes started through `subprocess.Popen` (incl. `run`)."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._original = subprocess.Popen.__init__
+
+    def install(self):
+        counter = self
+
+        def counting_init(self, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            counter._original(self, *args, **kwargs)
+
+        subprocess.Popen.__init__ = counting_init
+
+
+def _button(app, *labels: str):
+    return next(
+        (b for b in app.button if any(label in b.label for label in labels)), None
+    )
+
+
+def run_user(user: int, actions: int, think_ms: float, seed: int) -> dict:
+    """
+    One editing session; returns latencies (ms) per action and errors.
+
+    Actions that are not available in the current state (e.g. exports that
+    are already prepared) are replaced by a keystroke.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + user)
+    timings = defaultdict(list)
+    errors = []
+
+    app = AppTest.from_file(APP_PATH, default_timeout=300)
+    start = time.perf_counter()
+    app.run()
+    timings["load"].append((time.perf_counter() - start) * 1000)
+    text = app.text_area(key="cv_editor").value + f"\n\nSession {user}: "
+
+    kinds = list(ACTION_WEIGHTS)
+    weights = list(ACTION_WEIGHTS.values())
+    for _ in range(actions):
+        time.sleep(rng.expovariate(1000 / think_ms) if think_ms > 0 else 0)
+        kind = rng.choices(kinds, weights)[0]
+        target = None
+        if kind == "generate":
+            target = _button(app, "Generate PDF", "Regenerate PDF")
+        elif kind == "export":
+            target = _button(app, "Prepare exports")
+        elif kind == "template":
+            select = app.selectbox(key="template_name")
+            options = [o for o in select.options if o not in (select.value, "Custom")]
+            target = select.set_value(rng.choice(options)) if options else None
+        if target is None:
+            kind = "type"
+            text += rng.choice(KEYS)
+            target = app.text_area(key="cv_editor").set_value(text)
+        elif kind in ("generate", "export"):
+            target = target.click()
+
+        start = time.perf_counter()
+        target.run()
+        timings[kind].append((time.perf_counter() - start) * 1000)
+        if app.exception:
+            errors.append(f"user {user} ({kind}): {app.exception[0].message}")
+        errors += [f"user {user} ({kind}): {e.value}" for e in app.error]
+    return {"timings": timings, "errors": errors}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0..100)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_level(users: int, actions: int, think_ms: float, seed: int) -> dict:
+    with RssSampler() as rss, ThreadPoolExecutor(max_workers=users) as executor:
+        start = time.perf_counter()
+        futures = [
+            executor.submit(run_user, user, actions, think_ms, seed)
+            for user in range(users)
+        ]
+        results = [future.result() for future in futures]
+        wall = time.perf_counter() - start
+
+    timings = defaultdict(list)
+    for result in results:
+        for kind, values in result["timings"].items():
+            timings[kind] += values
+    done = sum(len(v) for kind, v in timings.items() if kind != "load")
+    return {
+        "users": users,
+        "wall": wall,
+        "throughput": done / wall,
+        "timings": timings,
+        "errors": [e for result in results for e in result["errors"]],
+        "peak_rss_kb": rss.peak_kb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--users", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrency levels"
+    )
+    parser.add_argument("--actions", type=int, default=40, help="actions per user")
+    parser.add_argument(
+        "--think-ms", type=float, default=200.0, help="mean pause between actions"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--stub", action="store_true", help="replace Pandoc and the engine by stubs"
+    )
+    parser.add_argument("--stub-pandoc-ms", type=float, default=50.0)
+    parser.add_argument("--stub-engine-ms", type=float, default=400.0)
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="render cache and workspaces (default: a fresh temporary directory)",
+    )
+    args = parser.parse_args()
+
+    # Before the app's modules are imported: they read these on import
+    scratch = tempfile.TemporaryDirectory()
+    os.environ["CV_BUILDER_CACHE_DIR"] = str(args.cache_dir or scratch.name)
+    stubs = None
+    if args.stub:
+        os.environ["CV_BUILDER_PANDOC_SERVER"] = "0"  # every conversion via the stub
+        stubs = Stubs(args.stub_pandoc_ms, args.stub_engine_ms)
+        stubs.install()
+    processes = ProcessCounter()
+    processes.install()
+
+    failed = False
+    for users in args.users:
+        spawned = processes.count
+        stubbed = dict(stubs.calls) if stubs else {}
+        level = run_level(users, args.actions, args.think_ms, args.seed)
+
+        timings = level["timings"]
+        every = [
+            v for kind, values in timings.items() if kind != "load" for v in values
+        ]
+        print(
+            f"{users:>3} users · {level['throughput']:6.2f} actions/s · "
+            f"p50 {statistics.median(every):7.1f} ms · "
+            f"p95 {percentile(every, 95):7.1f} ms · "
+            f"p99 {percentile(every, 99):7.1f} ms · "
+            f"peak RSS {level['peak_rss_kb'] / 1024:7.1f} MiB · "
+            f"processes {processes.count - spawned}"
+            + (
+                " · stubbed "
+                + ", ".join(
+                    f"{kind} {count - stubbed.get(kind, 0)}"
+                    for kind, count in sorted(stubs.calls.items())
+                )
+                if stubs
+                else ""
+            )
+        )
+        for kind in ["load", *ACTION_WEIGHTS]:
+            values = timings.get(kind)
+            if values:
+                print(
+                    f"      {kind:<9} n={len(values):<4} "
+                    f"p50 {statistics.median(values):7.1f} ms · "
+                    f"p95 {percentile(values, 95):7.1f} ms · "
+                    f"p99 {percentile(values, 99):7.1f} ms"
+                )
+        for error in level["errors"][:5]:
+            print(f"      ❌ {error}")
+        failed |= bool(level["errors"])
+
+    scratch.cleanup()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
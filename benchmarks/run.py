@@ -0,0 +1,208 @@
+"""
+Benchmark suite: time each build stage over synthetic CVs of increasing size.
+
+Measures `preprocess_markdown`, `convert_md_to_latex` and `convert_md_to_pdf`
+separately, for both templates and every combination of the built-in Lua
+filters (renders are uncached). Results can be saved as a JSON baseline and
+compared against an earlier one to catch slowdowns before deploying.
+
+Usage:
+    python -m benchmarks.run --save benchmarks/baselines/main.json
+    python -m benchmarks.run --compare benchmarks/baselines/main.json
+    python -m benchmarks.run --stages preprocess latex --sizes small medium
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.synthetic import SIZES, synthetic_cv
+from utils.markdown_processor import (
+    convert_md_to_latex,
+    convert_md_to_pdf,
+    preprocess_markdown,
+)
+from utils.tools import tool_version
+
+TEMPLATES = {
+    "modern": Path("templates/modern.tex"),
+    "harvard": Path("templates/harvard.tex"),
+}
+FILTERS = {
+    "inline_dates": Path("filters/inline_dates.lua"),
+    "columns": Path("filters/columns.lua"),
+}
+STAGES = ["preprocess", "latex", "pdf"]
+
+
+def filter_combinations() -> dict[str, list[Path]]:
+    """Every subset of the built-in filters, keyed e.g. "inline_dates+columns"."""
+    combos = {}
+    for n in range(len(FILTERS) + 1):
+        for names in itertools.combinations(FILTERS, n):
+            combos["+".join(names) or "none"] = [FILTERS[name] for name in names]
+    return combos
+
+
+def timed(fn, runs: int):
+    """Median wall time of `runs` calls of `fn` in ms, and its last result."""
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+
+def measure(fn, runs: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "runs": runs,
+    }
+
+
+def run_suite(stages, sizes, templates, runs: int, warmup: int) -> dict:
+    """
+    Run the selected benchmarks.
+
+    Returns:
+        Mapping of "stage/template/filters/size" (or "preprocess/size") to
+        timing statistics in milliseconds.
+    """
+    results = {}
+
+    def record(name: str, fn):
+        results[name] = stats = measure(fn, runs, warmup)
+        print(
+            f"{name:<44} median {stats['median_ms']:9.1f} ms · "
+            f"min {stats['min_ms']:9.1f} ms"
+        )
+
+    for size in sizes:
+        raw = synthetic_cv(size)
+        md_text = preprocess_markdown(raw)
+
+        if "preprocess" in stages:
+            record(f"preprocess/{size}", lambda: preprocess_markdown(raw))
+
+        for template, (filters_name, filters) in itertools.product(
+            templates, filter_combinations().items()
+        ):
+            template_path = TEMPLATES[template]
+            if "latex" in stages:
+                record(
+                    f"latex/{template}/{filters_name}/{size}",
+                    lambda: convert_md_to_latex(md_text, template_path, filters),
+                )
+            if "pdf" in stages:
+                record(
+                    f"pdf/{template}/{filters_name}/{size}",
+                    lambda: convert_md_to_pdf(md_text, template_path, filters),
+                )
+    return results
+
+
+def environment() -> dict:
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandoc": tool_version("pandoc"),
+        "xelatex": tool_version("xelatex"),
+    }
+
+
+def compare(baseline: dict, results: dict, threshold: float, min_delta_ms: float):
+    """
+    Print current vs. baseline medians.
+
+    A benchmark counts as a regression when it is more than `threshold`
+    (relative) and more than `min_delta_ms` (absolute) slower, so noise on
+    sub-millisecond stages does not fail the comparison.
+
+    Returns:
+        Names of the regressed benchmarks.
+    """
+    regressions = []
+    for name, stats in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<44} (new)")
+            continue
+        old, new = before["median_ms"], stats["median_ms"]
+        change = (new - old) / old if old else 0.0
+        regressed = change > threshold and new - old > min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<44} {old:9.1f} → {new:9.1f} ms  {change:+7.1%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument(
+        "--templates", nargs="+", choices=list(TEMPLATES), default=list(TEMPLATES)
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--save", type=Path, help="Write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Relative slowdown counted as a regression (default: 0.15)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=5.0,
+        help="Ignore slowdowns smaller than this many milliseconds (default: 5)",
+    )
+    args = parser.parse_args()
+
+    results = run_suite(args.stages, args.sizes, args.templates, args.runs, args.warmup)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        baseline = {
+            "environment": environment(),
+            "stages": args.stages,
+            "results": results,
+        }
+        args.save.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print(f"\nCompared with {args.compare} ({baseline['environment']['date']}):")
+        regressions = compare(baseline, results, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
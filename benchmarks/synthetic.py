@@ -0,0 +1,63 @@
+"""
+Synthetic CV markdown for benchmarks.
+
+The generated documents use the same structure as examples/default.md
+(headings with blockquote notes, HR-separated skill columns, bullet lists)
+and are sprinkled with LaTeX special characters, so every rewrite in the
+filters and every escape in the templates gets exercised.
+"""
+
+# Characters LaTeX treats specially; the filters have to escape all of them
+SPECIALS = "& % $ # _ { } ~ ^ \\"
+
+# name -> (experience entries, bullets per role, skill columns, skill rows)
+SIZES = {
+    "small": (3, 4, 3, 6),
+    "medium": (15, 6, 4, 20),
+    "large": (60, 8, 6, 80),
+    "xlarge": (250, 12, 8, 300),
+}
+
+
+def skills_cv(columns: int, rows: int) -> str:
+    blocks = []
+    for c in range(columns):
+        blocks.append("\n".join(f"- Skill {c}.{r} & C++_{r} 100%" for r in range(rows)))
+    return "# Skills\n\n" + "\n\n---\n\n".join(blocks) + "\n"
+
+
+def experience_cv(entries: int, bullets: int) -> str:
+    parts = ["# Experience\n"]
+    for e in range(entries):
+        parts.append(f"## Company #{e}\n> Jan 20{e % 100:02d} – Dec 20{e % 100:02d}\n")
+        parts.append(f"### Role {e} & Team_{e}\n> City {e}\n")
+        parts.extend(f"- Achievement {b} with 50% impact\n" for b in range(bullets))
+    return "\n".join(parts)
+
+
+def synthetic_cv(size: str) -> str:
+    """
+    Build a complete CV of the given size.
+
+    Args:
+        size: One of the keys of SIZES.
+
+    Returns:
+        CV markdown, deterministic for a given size.
+    """
+    entries, bullets, columns, rows = SIZES[size]
+    header = (
+        "---\n"
+        'name: "Jane Doe"\n'
+        'email: "jane@example.com"\n'
+        "---\n\n"
+        "# Summary\n\n"
+        f"Engineer who ships & measures: 99% uptime, $1M saved, C# and R_lang. {SPECIALS}\n"
+    )
+    long_list = "# Publications\n\n" + "".join(
+        f"- Paper {p}: {{fast}} ~linear^{p % 3} builds at 100% & more\n"
+        for p in range(bullets * 4)
+    )
+    return "\n".join(
+        [header, experience_cv(entries, bullets), skills_cv(columns, rows), long_list]
+    )
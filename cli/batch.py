@@ -0,0 +1,203 @@
+"""
+Batch rendering: build many Markdown CVs in parallel on a process pool.
+"""
+
+import glob
+import os
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.fit_pages import fit_to_pages
+from utils.markdown_processor import convert_md_to_pdf, preprocess_markdown
+from utils.pdf_postprocess import optimize_pdf
+from utils.render_cache import DirectoryBackend, RenderCache
+from utils.validation import validate_build
+
+MARKDOWN_SUFFIXES = {".md", ".markdown"}
+
+
+@dataclass
+class BatchJob:
+    input_md: Path
+    output_pdf: Path
+    template: Path
+    lua_filters: list[Path]
+    do_preprocess: bool = True
+    cache_dir: Path | None = None
+    engine: str = "xelatex"
+    native: bool = False
+    fit_pages: int | None = None
+    optimize: bool = False
+
+
+@dataclass
+class BatchResult:
+    input_md: Path
+    output_pdf: Path
+    ok: bool
+    build_time: float
+    error: str = ""
+    note: str = ""
+
+
+def _expand(pattern: str, base: Path) -> list[Path]:
+    """Expand one input spec (file, directory or glob) relative to `base`."""
+    path = Path(pattern)
+    if not path.is_absolute():
+        path = base / path
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.suffix in MARKDOWN_SUFFIXES)
+    if glob.has_magic(str(path)):
+        return sorted(Path(p) for p in glob.glob(str(path), recursive=True))
+    return [path]
+
+
+def collect_inputs(patterns: list[str], manifest: Path | None = None) -> list[Path]:
+    """
+    Resolve globs, directories and an optional manifest file into input paths.
+
+    The manifest lists one file, directory or glob per line; blank lines and
+    lines starting with '#' are ignored, relative entries are resolved
+    against the manifest's directory. Duplicates are dropped, order is kept.
+
+    Args:
+        patterns: Input specs given on the command line.
+        manifest: Optional path to a manifest file.
+
+    Returns:
+        De-duplicated list of markdown paths in a stable order.
+    """
+    inputs: list[Path] = []
+    for pattern in patterns:
+        inputs.extend(_expand(pattern, Path.cwd()))
+
+    if manifest is not None:
+        for line in manifest.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                inputs.extend(_expand(line, manifest.parent))
+
+    seen = set()
+    unique = []
+    for path in inputs:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+_worker_caches: dict[Path, RenderCache] = {}
+
+
+def _get_worker_cache(cache_dir: Path | None) -> RenderCache | None:
+    # One cache per worker process; the disk tier is shared between workers
+    if cache_dir is None:
+        return None
+    if cache_dir not in _worker_caches:
+        _worker_caches[cache_dir] = RenderCache(DirectoryBackend(cache_dir))
+    return _worker_caches[cache_dir]
+
+
+def render_job(job: BatchJob) -> BatchResult:
+    """Render a single job inside its own scratch directory. Never raises."""
+    start = time.perf_counter()
+    saved_tmpdir = os.environ.get("TMPDIR")
+    try:
+        with tempfile.TemporaryDirectory(prefix="cv-batch-") as scratch:
+            # Pandoc, XeLaTeX and tempfile all honour TMPDIR
+            os.environ["TMPDIR"] = scratch
+            tempfile.tempdir = scratch
+            try:
+                md_text = job.input_md.read_text(encoding="utf-8")
+                validate_build(
+                    md_text, job.template.read_text(encoding="utf-8"), job.lua_filters
+                )
+                if job.do_preprocess:
+                    md_text = preprocess_markdown(md_text)
+                note = ""
+                if job.fit_pages is not None:
+                    fit = fit_to_pages(
+                        md_text,
+                        job.template,
+                        job.lua_filters,
+                        job.fit_pages,
+                        cache=_get_worker_cache(job.cache_dir),
+                        engine=job.engine,
+                        native=job.native,
+                    )
+                    pdf_bytes, note = fit.pdf, fit.describe()
+                else:
+                    pdf_bytes = convert_md_to_pdf(
+                        md_text,
+                        job.template,
+                        job.lua_filters,
+                        cache=_get_worker_cache(job.cache_dir),
+                        engine=job.engine,
+                        native=job.native,
+                    )
+                if job.optimize:
+                    pdf_bytes = optimize_pdf(
+                        pdf_bytes, cache=_get_worker_cache(job.cache_dir)
+                    )
+            finally:
+                tempfile.tempdir = None
+                if saved_tmpdir is None:
+                    os.environ.pop("TMPDIR", None)
+                else:
+                    os.environ["TMPDIR"] = saved_tmpdir
+
+        job.output_pdf.parent.mkdir(parents=True, exist_ok=True)
+        job.output_pdf.write_bytes(pdf_bytes)
+    except Exception as e:
+        error = str(e) or traceback.format_exc(limit=1)
+        return BatchResult(
+            job.input_md, job.output_pdf, False, time.perf_counter() - start, error
+        )
+    return BatchResult(
+        job.input_md, job.output_pdf, True, time.perf_counter() - start, note=note
+    )
+
+
+def render_batch(
+    jobs: list[BatchJob], max_workers: int | None = None
+) -> list[BatchResult]:
+    """
+    Render all jobs on a process pool.
+
+    Args:
+        jobs: Jobs to render.
+        max_workers: Pool size (default: number of CPU cores).
+
+    Returns:
+        One result per job, in the same order as `jobs`.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(jobs) <= 1:
+        return [render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        return list(pool.map(render_job, jobs))
+
+
+def print_summary(results: list[BatchResult], wall_time: float) -> None:
+    """Print per-file status and build time, followed by totals."""
+    for result in results:
+        if result.ok:
+            print(
+                f"✅ {result.input_md} → {result.output_pdf} ({result.build_time:.2f}s)"
+                + (f" · {result.note}" if result.note else "")
+            )
+        else:
+            print(f"❌ {result.input_md} ({result.build_time:.2f}s): {result.error}")
+
+    failed = sum(not r.ok for r in results)
+    build_total = sum(r.build_time for r in results)
+    print(
+        f"\n{len(results) - failed}/{len(results)} succeeded, {failed} failed · "
+        f"wall time {wall_time:.2f}s · summed build time {build_total:.2f}s"
+    )
@@ -1,18 +1,27 @@
 """
 CLI tool to generate a PDF CV from Markdown using Pandoc and Lua filters.
+
+Batch scripts call this thousands of times, so only argparse and the shared
+defaults are imported up front; the build stack (Pandoc bindings, engines,
+HTTP client) is imported by the code path that needs it, after the input has
+been validated, which `python -m benchmarks.cli_startup` checks.
 """
 
+from __future__ import annotations
+
 import argparse
-import base64
 import os
-import subprocess
 import sys
-import tempfile
-import webbrowser
 from pathlib import Path
 
-# Import the markdown processing functions
-from utils.markdown_processor import convert_md_to_pdf, preprocess_markdown
+from utils.config import DEFAULT_CACHE_DIR, DEFAULT_SERVICE_URL
+
+# Same as typing.TYPE_CHECKING, which type checkers also accept in this form;
+# importing typing costs several milliseconds per run
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from utils.render_cache import RenderCache
+    from utils.render_service import RenderServiceClient
 
 
 def generate_pdf(
@@ -22,29 +31,219 @@ def generate_pdf(
     lua_filters: list[Path],
     do_preprocess: bool = True,
     preview: bool = False,
+    cache: RenderCache | None = None,
+    service: RenderServiceClient | None = None,
+    engine: str = "xelatex",
+    fit_pages: int | None = None,
+    native: bool = False,
+    optimize: bool = False,
 ):
     """
     Generate PDF from Markdown file using Pandoc.
+    With `service`, the build runs on the render service if it is reachable.
+    With `fit_pages`, the layout is tightened until the CV fits on that many
+    pages (always built locally). With `native`, local builds render the LaTeX
+    in process when the document allows it. With `optimize`, the PDF is
+    linearized and compressed for the web.
     """
     if not input_md.exists():
         print(f"Error: Markdown file '{input_md}' does not exist.")
         sys.exit(1)
+    if fit_pages is not None and fit_pages < 1:
+        print("Error: --fit-pages must be at least 1.")
+        sys.exit(1)
+
+    from utils.markdown_processor import convert_md_to_pdf, preprocess_markdown
+    from utils.render_service import RenderServiceBusy, RenderServiceUnavailable
+    from utils.validation import ValidationError, validate_build
 
     md_text = input_md.read_text(encoding="utf-8")
+    try:
+        validate_build(md_text, template.read_text(encoding="utf-8"), lua_filters)
+    except ValidationError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     md_to_use = preprocess_markdown(md_text) if do_preprocess else md_text
 
-    pdf_bytes = convert_md_to_pdf(md_to_use, template, lua_filters)
+    pdf_bytes = None
+    if fit_pages is not None:
+        from utils.fit_pages import fit_to_pages
+
+        try:
+            fit = fit_to_pages(
+                md_to_use,
+                template,
+                lua_filters,
+                fit_pages,
+                cache=cache,
+                engine=engine,
+                native=native,
+            )
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        pdf_bytes = fit.pdf
+        if fit.fits:
+            print(
+                f"📐 Fits on {fit.pages} page(s) after {fit.probes} compile(s): "
+                f"{fit.layout.describe()}"
+            )
+        else:
+            print(
+                f"⚠️ Still {fit.pages} pages with the tightest layout "
+                f"({fit.layout.describe()})"
+            )
+    elif service is not None:
+        try:
+            pdf_bytes = service.render(md_to_use, template, lua_filters)
+        except RenderServiceBusy as e:
+            print(f"Error: render service is busy ({e}), try again shortly.")
+            sys.exit(1)
+        except RenderServiceUnavailable as e:
+            print(f"⚠️ {e}; building locally instead.")
+    if pdf_bytes is None:
+        pdf_bytes = convert_md_to_pdf(
+            md_to_use, template, lua_filters, cache=cache, engine=engine, native=native
+        )
+    if optimize:
+        from utils.pdf_postprocess import optimize_pdf
+
+        pdf_bytes = optimize_pdf(pdf_bytes, cache=cache)
     output_pdf.parent.mkdir(parents=True, exist_ok=True)
     output_pdf.write_bytes(pdf_bytes)
-    print(f"✅ PDF generated at {output_pdf}")
+    if cache is not None and cache.stats.hits and not cache.stats.misses:
+        print(f"✅ PDF restored from cache at {output_pdf}")
+    else:
+        print(f"✅ PDF generated at {output_pdf}")
 
     if preview:
+        import webbrowser
+
         try:
             webbrowser.open(output_pdf.resolve().as_uri())
         except Exception as e:
             print(f"⚠️ Failed to open PDF preview: {e}")
 
 
+def generate_batch(
+    patterns: list[str],
+    manifest: Path | None,
+    output_dir: Path,
+    template: Path,
+    lua_filters: list[Path],
+    do_preprocess: bool = True,
+    cache_dir: Path | None = None,
+    jobs: int | None = None,
+    engine: str = "xelatex",
+    native: bool = False,
+    fit_pages: int | None = None,
+    optimize: bool = False,
+):
+    """
+    Generate one PDF per Markdown input on a process pool.
+    Exits with status 1 if any render failed.
+    """
+    import time
+
+    from cli.batch import BatchJob, collect_inputs, print_summary, render_batch
+
+    inputs = collect_inputs(patterns, manifest)
+    if not inputs:
+        print("Error: no Markdown inputs found for batch mode.")
+        sys.exit(1)
+
+    outputs = {}
+    for input_md in inputs:
+        output_pdf = output_dir / f"{input_md.stem}.pdf"
+        if output_pdf in outputs:
+            print(
+                f"Error: '{input_md}' and '{outputs[output_pdf]}' would both be "
+                f"written to '{output_pdf}'."
+            )
+            sys.exit(1)
+        outputs[output_pdf] = input_md
+
+    batch = [
+        BatchJob(
+            input_md,
+            output_pdf,
+            template,
+            lua_filters,
+            do_preprocess,
+            cache_dir,
+            engine,
+            native,
+            fit_pages,
+            optimize,
+        )
+        for output_pdf, input_md in outputs.items()
+    ]
+
+    start = time.perf_counter()
+    results = render_batch(batch, max_workers=jobs)
+    print_summary(results, time.perf_counter() - start)
+
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+def generate_variants(
+    input_md: Path,
+    manifest: Path | None,
+    output_dir: Path,
+    template: Path,
+    lua_filters: list[Path],
+    do_preprocess: bool = True,
+    cache: RenderCache | None = None,
+    jobs: int | None = None,
+    engine: str = "xelatex",
+    optimize: bool = False,
+):
+    """
+    Generate one PDF per variant of a master CV into `output_dir`.
+    Without `manifest`, the variants come from the `variants` front matter field.
+    With `optimize`, each PDF is linearized and compressed for the web.
+    """
+    from utils.markdown_processor import preprocess_markdown
+    from utils.pdf_postprocess import optimize_pdf
+    from utils.validation import ValidationError, validate_build
+    from utils.variants import load_manifest, parse_manifest, render_variants
+
+    md_text = input_md.read_text(encoding="utf-8")
+    try:
+        metadata = validate_build(
+            md_text, template.read_text(encoding="utf-8"), lua_filters
+        )
+        if manifest is not None:
+            variants = load_manifest(manifest)
+        else:
+            variants = parse_manifest(metadata, f"front matter of {input_md}")
+    except (ValidationError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    results = render_variants(
+        preprocess_markdown(md_text) if do_preprocess else md_text,
+        variants,
+        template,
+        lua_filters,
+        cache=cache,
+        engine=engine,
+        max_workers=jobs,
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for result in results:
+        output_pdf = output_dir / f"{result.name}.pdf"
+        pdf_bytes = optimize_pdf(result.pdf, cache=cache) if optimize else result.pdf
+        output_pdf.write_bytes(pdf_bytes)
+        if result.duplicate_of is None:
+            print(f"✅ {result.name}: {output_pdf}")
+        else:
+            print(
+                f"♻️  {result.name}: {output_pdf} (same content as {result.duplicate_of})"
+            )
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Generate PDF CV from Markdown")
     parser.add_argument(
@@ -82,24 +281,201 @@ def parse_args():
         dest="do_preprocess",
         help="Disable automatic markdown preprocessing",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR / "renders",
+        help=f"Directory for cached renders (default: {DEFAULT_CACHE_DIR / 'renders'})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_false",
+        dest="use_cache",
+        help="Always rebuild the PDF instead of reusing cached renders",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="INPUT",
+        help="Batch mode: render many files, directories or glob patterns in parallel",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="Batch mode: file listing one input (file, directory or glob) per line",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("output"),
+        help="Batch and variant mode: directory for the generated PDFs (default: output)",
+    )
+    parser.add_argument(
+        "--variants",
+        nargs="?",
+        const=True,
+        metavar="MANIFEST",
+        help="Render the tailored variants of the input CV listed in a YAML "
+        "MANIFEST (default: the 'variants' front matter field) into --output-dir",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Batch and variant mode: number of parallel workers (default: number of CPU cores)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-render when the input, template or filters change",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Watch mode: poll for changes instead of using native file events",
+    )
+    parser.add_argument(
+        "--service",
+        nargs="?",
+        const=DEFAULT_SERVICE_URL,
+        default=os.environ.get("CV_BUILDER_RENDER_SERVICE"),
+        metavar="URL",
+        help="Build on the local render service (python -m cli.serve) at URL "
+        f"(default: {DEFAULT_SERVICE_URL} or $CV_BUILDER_RENDER_SERVICE); "
+        "falls back to a local build if it is not running",
+    )
+    parser.add_argument(
+        "--engine",
+        default="xelatex",
+        metavar="NAME",
+        help="LaTeX engine: xelatex (default), lualatex, pdflatex, or 'auto' to "
+        "measure the installed engines once per template and use the fastest",
+    )
+    parser.add_argument(
+        "--fit-pages",
+        type=int,
+        metavar="N",
+        help="Tighten font size, line spacing, margins and list spacing until "
+        "the CV fits on N pages",
+    )
+    parser.add_argument(
+        "--native-latex",
+        action="store_true",
+        help="Render the LaTeX in process instead of running Pandoc when the CV "
+        "only uses the supported subset (falls back to Pandoc otherwise)",
+    )
+    parser.add_argument(
+        "--optimize-pdf",
+        action="store_true",
+        help="Linearize the PDF (fast web view) and compress it into object "
+        "streams with qpdf, if installed",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-stage timings (Pandoc parse/filters/template, engine passes)",
+    )
+    parser.add_argument(
+        "--profile-json",
+        type=Path,
+        metavar="PATH",
+        help="Append the build's stage timings as one JSON line to PATH",
+    )
     parser.add_argument(
         "--preview",
         action="store_true",
         help="Open PDF in default viewer after generation",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.variants and args.native_latex:
+        # Variants are built from the parsed document, which Pandoc renders
+        parser.error("--native-latex cannot be combined with --variants")
+    if args.variants and args.fit_pages is not None:
+        parser.error("--fit-pages cannot be combined with --variants")
+    return args
 
 
 def main():
     args = parse_args()
-    generate_pdf(
-        input_md=args.input_md,
-        output_pdf=args.output,
-        template=args.template,
-        lua_filters=args.filters,
-        do_preprocess=args.do_preprocess,
-        preview=args.preview,
-    )
+    if args.batch or args.manifest:
+        generate_batch(
+            patterns=args.batch or [],
+            manifest=args.manifest,
+            output_dir=args.output_dir,
+            template=args.template,
+            lua_filters=args.filters,
+            do_preprocess=args.do_preprocess,
+            cache_dir=args.cache_dir if args.use_cache else None,
+            jobs=args.jobs,
+            engine=args.engine,
+            native=args.native_latex,
+            fit_pages=args.fit_pages,
+            optimize=args.optimize_pdf,
+        )
+        return
+
+    if not args.input_md.exists():
+        print(f"Error: Markdown file '{args.input_md}' does not exist.")
+        sys.exit(1)
+
+    from utils.profiling import profile_build
+    from utils.render_cache import DirectoryBackend, RenderCache
+    from utils.render_service import RenderServiceClient
+
+    cache = RenderCache(DirectoryBackend(args.cache_dir)) if args.use_cache else None
+    if args.variants:
+        generate_variants(
+            input_md=args.input_md,
+            manifest=None if args.variants is True else Path(args.variants),
+            output_dir=args.output_dir,
+            template=args.template,
+            lua_filters=args.filters,
+            do_preprocess=args.do_preprocess,
+            cache=cache,
+            jobs=args.jobs,
+            engine=args.engine,
+            optimize=args.optimize_pdf,
+        )
+        return
+    if args.watch:
+        from cli.watch import watch
+
+        watch(
+            input_md=args.input_md,
+            output_pdf=args.output,
+            template=args.template,
+            lua_filters=args.filters,
+            do_preprocess=args.do_preprocess,
+            cache=cache,
+            force_polling=args.poll,
+            engine=args.engine,
+            native=args.native_latex,
+            preview=args.preview,
+            fit_pages=args.fit_pages,
+            optimize=args.optimize_pdf,
+        )
+        return
+
+    with profile_build(
+        jsonl_path=args.profile_json, split_pandoc=args.profile
+    ) as profile:
+        generate_pdf(
+            input_md=args.input_md,
+            output_pdf=args.output,
+            template=args.template,
+            lua_filters=args.filters,
+            do_preprocess=args.do_preprocess,
+            preview=args.preview,
+            cache=cache,
+            service=RenderServiceClient(args.service) if args.service else None,
+            engine=args.engine,
+            fit_pages=args.fit_pages,
+            native=args.native_latex,
+            optimize=args.optimize_pdf,
+        )
+    if args.profile:
+        print(profile.report())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+Run the local render service used by the Streamlit app and the CLI.
+
+Usage:
+    python -m cli.serve --port 8765 --workers 2 --max-queue 8
+"""
+
+import argparse
+import os
+import threading
+from pathlib import Path
+
+from utils.config import DEFAULT_CACHE_DIR
+from utils.engines import AUTO, get_engine, warm_font_cache
+from utils.pandoc_server import PandocServerPool
+from utils.render_cache import DirectoryBackend, RenderCache
+from utils.render_service import RenderService, make_server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the local CV render service")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) // 2),
+        help="Builds running at the same time (default: half the CPU cores)",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=8,
+        help="Jobs allowed to wait before new ones are rejected (default: 8)",
+    )
+    parser.add_argument(
+        "--job-timeout",
+        type=float,
+        default=60.0,
+        help="Seconds until a queued or running job is cancelled (default: 60)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR / "renders",
+        help="Directory for cached renders",
+    )
+    parser.add_argument(
+        "--no-pandoc-server",
+        dest="use_pandoc_server",
+        action="store_false",
+        help="Start a Pandoc process per conversion instead of a persistent server",
+    )
+    parser.add_argument(
+        "--engine",
+        default="xelatex",
+        metavar="NAME",
+        help="LaTeX engine: xelatex (default), lualatex, pdflatex or 'auto'",
+    )
+    parser.add_argument(
+        "--no-warm-fonts",
+        dest="warm_fonts",
+        action="store_false",
+        help="Skip resolving the templates' fonts at startup",
+    )
+    return parser.parse_args()
+
+
+def warm_fonts(engine: str) -> None:
+    """Resolve the bundled templates' fonts so the first build doesn't pay for it."""
+    templates = Path(__file__).parent.parent / "templates"
+    texts = [t.read_text(encoding="utf-8") for t in sorted(templates.glob("*.tex"))]
+    engines = None if engine == AUTO else [get_engine(engine)]
+    for name, seconds in warm_font_cache(texts, engines).items():
+        if seconds is None:
+            print(f"⚠️ Font warm-up failed for {name}")
+        else:
+            print(f"🔤 Fonts warmed up for {name} in {seconds:.1f}s")
+
+
+def main():
+    args = parse_args()
+    service = RenderService(
+        workers=args.workers,
+        max_queue=args.max_queue,
+        job_timeout=args.job_timeout,
+        cache=RenderCache(DirectoryBackend(args.cache_dir)),
+        pandoc_server=(
+            PandocServerPool(size=args.workers) if args.use_pandoc_server else None
+        ),
+        engine=args.engine,
+    )
+    if args.warm_fonts:
+        threading.Thread(target=warm_fonts, args=(args.engine,), daemon=True).start()
+    server = make_server(service, args.host, args.port)
+    print(
+        f"🖨️  Render service on http://{args.host}:{args.port} "
+        f"({args.workers} workers, queue of {args.max_queue}). Press Ctrl+C to stop."
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping render service.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
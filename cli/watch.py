@@ -0,0 +1,235 @@
+"""
+Watch mode: keep one process alive and re-render whenever an input changes.
+"""
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from utils.config import DEFAULT_CACHE_DIR
+from utils.fit_pages import fit_to_pages
+from utils.markdown_processor import (
+    BuildCancelled,
+    convert_md_to_pdf,
+    preprocess_markdown,
+)
+from utils.pdf_postprocess import optimize_pdf
+from utils.render_cache import RenderCache
+from utils.validation import validate_build
+from utils.workspaces import WorkspacePool
+
+try:  # inotify (Linux), FSEvents (macOS), ReadDirectoryChangesW (Windows)
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # fall back to polling
+    Observer = None
+
+
+def file_digest(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return ""
+
+
+def _start_native_watch(paths: list[Path], notify: Callable[[], None]):
+    """Watch the parent directories of `paths`; return a stop function or None."""
+    if Observer is None:
+        return None
+
+    watched = {p.resolve() for p in paths}
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Editors often save via rename, so check both ends of a move
+            for src in (event.src_path, getattr(event, "dest_path", "")):
+                if src and Path(src).resolve() in watched:
+                    notify()
+                    return
+
+    observer = Observer()
+    for directory in {p.parent for p in watched}:
+        observer.schedule(Handler(), str(directory), recursive=False)
+    try:
+        observer.start()
+    except OSError:  # e.g. inotify watch limit reached
+        return None
+
+    def stop():
+        observer.stop()
+        observer.join()
+
+    return stop
+
+
+def _start_polling_watch(
+    paths: list[Path], notify: Callable[[], None], interval: float = 0.5
+):
+    """Poll modification time and size of `paths`; return a stop function."""
+    stopped = threading.Event()
+
+    def snapshot():
+        state = []
+        for p in paths:
+            try:
+                st = p.stat()
+                state.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                state.append(None)
+        return state
+
+    def loop():
+        last = snapshot()
+        while not stopped.wait(interval):
+            current = snapshot()
+            if current != last:
+                last = current
+                notify()
+
+    threading.Thread(target=loop, daemon=True, name="watch-poll").start()
+    return stopped.set
+
+
+def watch(
+    input_md: Path,
+    output_pdf: Path,
+    template: Path,
+    lua_filters: list[Path],
+    do_preprocess: bool = True,
+    cache: RenderCache | None = None,
+    debounce: float = 0.2,
+    force_polling: bool = False,
+    engine: str = "xelatex",
+    native: bool = False,
+    preview: bool = False,
+    fit_pages: int | None = None,
+    optimize: bool = False,
+):
+    """
+    Render `input_md` and re-render whenever the markdown, the template or a
+    Lua filter changes content. Bursts of saves within `debounce` seconds are
+    coalesced; a build still running when newer input arrives is cancelled.
+    Runs until interrupted with Ctrl+C. With `preview`, the PDF is opened
+    once the first build has written it; with `fit_pages`, every build is
+    fitted to that many pages (see `fit_to_pages`); with `optimize`, every
+    PDF is linearized and compressed for the web.
+
+    Builds reuse one persistent workspace, so the engine starts from the
+    previous build's auxiliary files and usually needs a single pass.
+    """
+    paths = [input_md, template, *lua_filters]
+    workspaces = WorkspacePool(DEFAULT_CACHE_DIR / "workspaces")
+    changed = threading.Condition()
+    dirty_at = [None]  # monotonic time of the latest unhandled change
+    open_pending = [preview]  # open the PDF after the first successful build
+
+    def notify():
+        with changed:
+            dirty_at[0] = time.monotonic()
+            changed.notify()
+
+    def build(cancel: threading.Event, reason: str, triggered_at: float):
+        start = time.perf_counter()
+        try:
+            md_text = input_md.read_text(encoding="utf-8")
+            validate_build(md_text, template.read_text(encoding="utf-8"), lua_filters)
+            md_to_use = preprocess_markdown(md_text) if do_preprocess else md_text
+            fit = None
+            if fit_pages is not None:
+                fit = fit_to_pages(
+                    md_to_use,
+                    template,
+                    lua_filters,
+                    fit_pages,
+                    cache=cache,
+                    engine=engine,
+                    cancel=cancel,
+                    workspaces=workspaces,
+                    session=str(input_md.resolve()),
+                    native=native,
+                )
+                pdf_bytes = fit.pdf
+            else:
+                pdf_bytes = convert_md_to_pdf(
+                    md_to_use,
+                    template,
+                    lua_filters,
+                    cache=cache,
+                    cancel=cancel,
+                    engine=engine,
+                    workspaces=workspaces,
+                    session=str(input_md.resolve()),
+                    native=native,
+                )
+            if optimize:
+                pdf_bytes = optimize_pdf(pdf_bytes, cache=cache)
+            output_pdf.parent.mkdir(parents=True, exist_ok=True)
+            output_pdf.write_bytes(pdf_bytes)
+        except BuildCancelled:
+            print(f"⏹️  Build for {reason} superseded by newer changes")
+            return
+        except Exception as e:
+            print(f"❌ Build failed ({reason}): {e}")
+            return
+        now = time.perf_counter()
+        print(
+            f"✅ Rebuilt {output_pdf} ({reason}) · build {now - start:.2f}s · "
+            f"change → PDF {time.monotonic() - triggered_at:.2f}s"
+            + (f" · {fit.describe()}" if fit is not None else "")
+        )
+        if open_pending[0]:
+            open_pending[0] = False
+            import webbrowser
+
+            try:
+                webbrowser.open(output_pdf.resolve().as_uri())
+            except Exception as e:
+                print(f"⚠️ Failed to open PDF preview: {e}")
+
+    stop = None if force_polling else _start_native_watch(paths, notify)
+    mode = "native file events"
+    if stop is None:
+        stop = _start_polling_watch(paths, notify)
+        mode = "polling"
+    print(f"👀 Watching {', '.join(map(str, paths))} ({mode}). Press Ctrl+C to stop.")
+
+    digests = {p: file_digest(p) for p in paths}
+    cancel = threading.Event()
+    worker = threading.Thread(
+        target=build, args=(cancel, "initial build", time.monotonic())
+    )
+    worker.start()
+
+    try:
+        while True:
+            with changed:
+                while dirty_at[0] is None:
+                    changed.wait()
+                # Coalesce a burst of saves into one rebuild
+                while (quiet := time.monotonic() - dirty_at[0]) < debounce:
+                    changed.wait(debounce - quiet)
+                triggered_at = dirty_at[0]
+                dirty_at[0] = None
+
+            current = {p: file_digest(p) for p in paths}
+            modified = [p.name for p in paths if current[p] != digests[p]]
+            if not modified:
+                continue  # touched or saved without changes
+            digests = current
+
+            if worker.is_alive():
+                cancel.set()
+                worker.join()
+            cancel = threading.Event()
+            worker = threading.Thread(
+                target=build, args=(cancel, ", ".join(modified), triggered_at)
+            )
+            worker.start()
+    except KeyboardInterrupt:
+        print("\nStopping watch mode.")
+        cancel.set()
+        worker.join()
+    finally:
+        stop()
@@ -13,10 +13,13 @@ local function latex_escape(s)
   
   local function make_columns(columns)
     local ncols = #columns
-    local latex =
+    -- Collect pieces and join once: repeated `..` copies the whole string
+    -- each time and grows quadratically with the table size.
+    local parts = {
       "\\begin{tabularx}{\\linewidth}{@{}" ..
       string.rep("X", ncols) ..
       "@{}}\n"
+    }
   
     local max_rows = 0
     for _, col in ipairs(columns) do
@@ -26,13 +29,13 @@ local function latex_escape(s)
     for r = 1, max_rows do
       for c = 1, ncols do
         local v = columns[c][r] or ""
-        latex = latex .. latex_escape(v)
-        latex = latex .. (c < ncols and " & " or " \\\\\n")
+        parts[#parts + 1] = latex_escape(v)
+        parts[#parts + 1] = (c < ncols and " & " or " \\\\\n")
       end
     end
   
-    latex = latex .. "\\end{tabularx}\n"
-    return pandoc.RawBlock("latex", latex)
+    parts[#parts + 1] = "\\end{tabularx}\n"
+    return pandoc.RawBlock("latex", table.concat(parts))
   end
   
   function Pandoc(doc)
@@ -0,0 +1,171 @@
+-- cv.lua
+--
+-- Fused single-pass version of inline_dates.lua and columns.lua.
+-- Both rewrites are applied during one traversal of doc.blocks:
+--   * level 2/3 header (+ following blockquote) -> \HeadingWithNote
+--   * bullet lists separated by horizontal rules -> tabularx column block
+--
+-- Each rewrite can be switched off per render through metadata flags, which
+-- utils/markdown_processor.py sets when it substitutes this filter:
+--   pandoc -M cv-inline-dates=false -M cv-columns=true ...
+-- The flags are removed from the metadata before the template is applied.
+--
+-- For HTML output (the app's draft preview) the same rewrites emit HTML
+-- instead, styled by the CSS next to each template.
+
+-- Escaping used by inline_dates.lua
+local heading_replacements = {
+  ["\\"] = "\\textbackslash{}",
+  ["{"] = "\\{",
+  ["}"] = "\\}",
+  ["&"] = "\\&",
+  ["%"] = "\\%",
+  ["$"] = "\\$",
+  ["#"] = "\\#",
+  ["_"] = "\\_",
+  ["~"] = "\\textasciitilde{}",
+  ["^"] = "\\textasciicircum{}"
+}
+
+local function escape_heading(str)
+  return (str:gsub(".", heading_replacements))
+end
+
+-- Escaping used by columns.lua (kept identical so output does not change)
+local function escape_cell(s)
+  return (s
+    :gsub("\\", "\\textbackslash{}")
+    :gsub("%%", "\\%%")
+    :gsub("&", "\\&")
+    :gsub("#", "\\#")
+    :gsub("_", "\\_")
+    :gsub("{", "\\{")
+    :gsub("}", "\\}"))
+end
+
+local html_replacements = {
+  ["&"] = "&amp;",
+  ["<"] = "&lt;",
+  [">"] = "&gt;",
+  ['"'] = "&quot;"
+}
+
+local function escape_html(str)
+  return (str:gsub('[&<>"]', html_replacements))
+end
+
+local is_html = FORMAT:match("html") ~= nil
+
+local function heading_with_note(level, header, note)
+  if is_html then
+    return pandoc.RawBlock("html", string.format(
+      '<h%i class="heading-with-note"><span>%s</span><span class="note">%s</span></h%i>',
+      level, escape_html(header), escape_html(note), level))
+  end
+  return pandoc.RawBlock("latex", string.format(
+    "\\HeadingWithNote{%i}{%s}{%s}", level, escape_heading(header), escape_heading(note)))
+end
+
+local function make_html_columns(columns)
+  local parts = { '<table class="cv-columns">\n' }
+
+  local max_rows = 0
+  for _, col in ipairs(columns) do
+    max_rows = math.max(max_rows, #col)
+  end
+
+  for r = 1, max_rows do
+    parts[#parts + 1] = "<tr>"
+    for c = 1, #columns do
+      parts[#parts + 1] = "<td>" .. escape_html(columns[c][r] or "") .. "</td>"
+    end
+    parts[#parts + 1] = "</tr>\n"
+  end
+
+  parts[#parts + 1] = "</table>\n"
+  return pandoc.RawBlock("html", table.concat(parts))
+end
+
+local function make_columns(columns)
+  if is_html then
+    return make_html_columns(columns)
+  end
+  local ncols = #columns
+  local parts = { "\\begin{tabularx}{\\linewidth}{@{}" .. string.rep("X", ncols) .. "@{}}\n" }
+
+  local max_rows = 0
+  for _, col in ipairs(columns) do
+    max_rows = math.max(max_rows, #col)
+  end
+
+  for r = 1, max_rows do
+    for c = 1, ncols do
+      parts[#parts + 1] = escape_cell(columns[c][r] or "")
+      parts[#parts + 1] = (c < ncols and " & " or " \\\\\n")
+    end
+  end
+
+  parts[#parts + 1] = "\\end{tabularx}\n"
+  return pandoc.RawBlock("latex", table.concat(parts))
+end
+
+local function flag(meta, key)
+  local value = meta[key]
+  meta[key] = nil
+  if value == nil then
+    return true
+  end
+  if type(value) == "boolean" then
+    return value
+  end
+  return pandoc.utils.stringify(value) ~= "false"
+end
+
+function Pandoc(doc)
+  local inline_dates = flag(doc.meta, "cv-inline-dates")
+  local columns = flag(doc.meta, "cv-columns")
+
+  local blocks = doc.blocks
+  local n = #blocks
+  local out = {}
+  local i = 1
+
+  while i <= n do
+    local b = blocks[i]
+
+    if inline_dates and b.t == "Header" and (b.level == 2 or b.level == 3) then
+      local note = ""
+      if blocks[i + 1] and blocks[i + 1].t == "BlockQuote" then
+        note = pandoc.utils.stringify(blocks[i + 1].content)
+        i = i + 1
+      end
+      out[#out + 1] = heading_with_note(b.level, pandoc.utils.stringify(b.content), note)
+      i = i + 1
+
+    elseif columns and b.t == "BulletList"
+        and blocks[i + 1] and blocks[i + 1].t == "HorizontalRule" then
+      local cols = {}
+      while true do
+        local col = {}
+        for _, item in ipairs(blocks[i].content) do
+          col[#col + 1] = pandoc.utils.stringify(item)
+        end
+        cols[#cols + 1] = col
+        i = i + 1
+
+        if not (blocks[i] and blocks[i].t == "HorizontalRule"
+            and blocks[i + 1] and blocks[i + 1].t == "BulletList") then
+          break
+        end
+        i = i + 1 -- skip HR
+      end
+      out[#out + 1] = make_columns(cols)
+
+    else
+      out[#out + 1] = b
+      i = i + 1
+    end
+  end
+
+  return pandoc.Pandoc(out, doc.meta)
+end
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The project is run from a checkout (`python -m cli.main`), not installed
+sys.path.insert(0, str(ROOT))
+
+from utils.tools import tool_path
+
+requires_pandoc = pytest.mark.skipif(
+    tool_path("pandoc") is None, reason="pandoc is not installed"
+)
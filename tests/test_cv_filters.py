@@ -0,0 +1,131 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+from conftest import ROOT, requires_pandoc
+
+from benchmarks.synthetic import experience_cv, skills_cv
+from utils.cv_filters import apply_cv_filters, stringify
+from utils.markdown_processor import (
+    FUSED_FILTER,
+    FUSED_FILTER_FLAGS,
+    _convert_text,
+    parse_markdown,
+    preprocess_markdown,
+)
+
+
+def text(words: str) -> list:
+    inlines = []
+    for word in words.split(" "):
+        if inlines:
+            inlines.append({"t": "Space"})
+        inlines.append({"t": "Str", "c": word})
+    return inlines
+
+
+def header(level: int, words: str) -> dict:
+    return {"t": "Header", "c": [level, ["", [], []], text(words)]}
+
+
+def bullets(*items: str) -> dict:
+    return {"t": "BulletList", "c": [[{"t": "Plain", "c": text(i)}] for i in items]}
+
+
+HR = {"t": "HorizontalRule"}
+
+
+def document(*blocks) -> dict:
+    return {"pandoc-api-version": [1, 23], "meta": {}, "blocks": list(blocks)}
+
+
+def test_stringify_flattens_inlines():
+    inlines = [
+        {"t": "Emph", "c": text("Senior dev")},
+        {"t": "SoftBreak"},
+        {"t": "Quoted", "c": [{"t": "DoubleQuote"}, text("R&D")]},
+        {"t": "Note", "c": [{"t": "Para", "c": text("dropped")}]},
+    ]
+    assert stringify(inlines) == "Senior dev \u201cR&D\u201d"
+
+
+def test_heading_with_note_from_the_following_blockquote():
+    quote = {"t": "BlockQuote", "c": [{"t": "Para", "c": text("2020 – now")}]}
+    doc = apply_cv_filters(document(header(2, "R&D_lead"), quote, header(1, "Top")))
+    assert doc["blocks"] == [
+        {
+            "t": "RawBlock",
+            "c": ["latex", "\\HeadingWithNote{2}{R\\&D\\_lead}{2020 – now}"],
+        },
+        header(1, "Top"),
+    ]
+
+
+def test_columns_from_lists_separated_by_rules():
+    doc = apply_cv_filters(document(bullets("C#", "50%"), HR, bullets("Go")))
+    assert doc["blocks"] == [
+        {
+            "t": "RawBlock",
+            "c": [
+                "latex",
+                (
+                    "\\begin{tabularx}{\\linewidth}{@{}XX@{}}\n"
+                    "C\\# & Go \\\\\n"
+                    "50\\% &  \\\\\n"
+                    "\\end{tabularx}\n"
+                ),
+            ],
+        }
+    ]
+
+
+def test_html_output_and_disabled_rewrites():
+    doc = apply_cv_filters(document(header(3, "<Role>")), to="html5")
+    assert doc["blocks"][0]["c"] == [
+        "html",
+        (
+            '<h3 class="heading-with-note"><span>&lt;Role&gt;</span>'
+            '<span class="note"></span></h3>'
+        ),
+    ]
+
+    blocks = [header(2, "Role"), bullets("a"), HR, bullets("b")]
+    doc = apply_cv_filters(document(*blocks), inline_dates=False, columns=False)
+    assert doc["blocks"] == blocks
+
+
+CASES = {
+    "example": (ROOT / "examples" / "default.md").read_text(encoding="utf-8"),
+    "skills": skills_cv(4, 12),
+    "experience": experience_cv(6, 3),
+}
+
+
+@requires_pandoc
+@pytest.mark.parametrize("to", ["latex", "html5"])
+@pytest.mark.parametrize("flags", [(True, True), (True, False), (False, True)])
+@pytest.mark.parametrize("case", CASES)
+def test_matches_the_lua_filter(case, flags, to):
+    ast = parse_markdown(preprocess_markdown(CASES[case]))
+    names = list(FUSED_FILTER_FLAGS.values())
+    metadata = [
+        f"--metadata={flag}={'true' if on else 'false'}"
+        for flag, on in zip(names, flags)
+    ]
+    expected = _convert_text(
+        ast,
+        to=to,
+        format="json",
+        extra_args=[f"--lua-filter={FUSED_FILTER}", *metadata],
+    )
+
+    doc = apply_cv_filters(
+        copy.deepcopy(json.loads(ast)), inline_dates=flags[0], columns=flags[1], to=to
+    )
+    assert _convert_text(json.dumps(doc), to=to, format="json") == expected
+
+
+def test_fused_filter_is_the_one_ported():
+    assert Path(FUSED_FILTER).name == "cv.lua"
+    assert list(FUSED_FILTER_FLAGS.values()) == ["cv-inline-dates", "cv-columns"]
@@ -0,0 +1,41 @@
+import json
+
+from utils import engines
+
+
+def test_choices_are_stored_on_disk(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "engines.json"
+    monkeypatch.setattr(engines, "ENGINE_CHOICES_PATH", path)
+    engines._store_choice("a", "xelatex")
+    engines._store_choice("b", "pdflatex")
+    assert json.loads(path.read_text()) == {"a": "xelatex", "b": "pdflatex"}
+
+
+def test_unwritable_cache_is_not_an_error(tmp_path, monkeypatch):
+    blocker = tmp_path / "cache"
+    blocker.write_text("not a directory")
+    monkeypatch.setattr(engines, "ENGINE_CHOICES_PATH", blocker / "engines.json")
+    engines._store_choice("a", "xelatex")
+
+    def replace(src, dst):
+        raise PermissionError(dst)
+
+    monkeypatch.setattr(engines, "ENGINE_CHOICES_PATH", tmp_path / "engines.json")
+    monkeypatch.setattr(engines.os, "replace", replace)
+    engines._store_choice("a", "xelatex")
+    assert list(tmp_path.iterdir()) == [blocker]  # no temp file left behind
+
+
+def test_select_engine_uses_the_stored_choice(tmp_path, monkeypatch):
+    xelatex = engines.ENGINES["xelatex"]
+    monkeypatch.setattr(engines, "available_engines", lambda text: [xelatex])
+    monkeypatch.setattr(engines, "tex_installation_stamp", lambda exe: "stamp")
+    monkeypatch.setattr(engines, "ENGINE_CHOICES_PATH", tmp_path / "engines.json")
+    key = engines._choice_key("template", [xelatex])
+    engines._store_choice(key, "stored")
+
+    def compile_fn(name):
+        raise AssertionError("measured although a choice was stored")
+
+    assert engines.select_engine("template", compile_fn) == "stored"
+    engines._choices.pop(key)
@@ -0,0 +1,145 @@
+import re
+
+import pytest
+
+from utils import fit_pages
+from utils.fit_pages import (
+    Layout,
+    apply_layout,
+    fit_to_pages,
+    interpolate,
+    template_layout,
+    tightest_layout,
+)
+
+TEMPLATE = r"""\documentclass[11pt]{article}
+\usepackage[a4paper,margin=2cm]{geometry}
+\usepackage{setspace}
+\setstretch{1.1}
+\setlist[itemize]{itemsep=0.3em, topsep=0.4em, leftmargin=*}
+% \setstretch{3}
+"""
+LATEX = "\\documentclass{article}\n\\begin{document}\nCV\n\\end{document}\n"
+
+
+def test_template_layout():
+    assert template_layout(TEMPLATE) == Layout(
+        font_size=11.0,
+        stretch=1.1,
+        margin=2.0,
+        margin_unit="cm",
+        item_sep=0.3,
+        top_sep=0.4,
+        list_options=(("leftmargin", "*"),),
+    )
+    assert template_layout("\\documentclass{article}\n") == Layout(
+        10.0, 1.0, 2.5, "cm", 0.5, 0.5
+    )
+
+
+def test_tightest_layout_is_never_looser():
+    loose = template_layout(TEMPLATE)
+    tight = tightest_layout(loose)
+    assert (tight.font_size, tight.stretch, tight.margin) == (10.0, 1.0, 1.2)
+    assert (tight.item_sep, tight.top_sep) == (0.0, 0.0)
+
+    small = Layout(8.0, 0.9, 1.0, "cm", 0.0, 0.0)
+    assert tightest_layout(small).font_size == 8.0
+    assert tightest_layout(small).stretch == 0.9
+
+
+def test_interpolate_endpoints():
+    loose = template_layout(TEMPLATE)
+    tight = tightest_layout(loose)
+    assert interpolate(loose, tight, 0.0) == loose
+    assert interpolate(loose, tight, 1.0) == tight
+    assert interpolate(loose, tight, 0.5).font_size == 10.5
+
+
+def test_apply_layout_inserts_overrides_after_begin_document():
+    layout = Layout(10.5, 1.0, 1.5, "cm", 0.1, 0.2, (("leftmargin", "*"),))
+    latex = apply_layout(LATEX, layout)
+    head, body = latex.split("\\begin{document}\n")
+    assert head == "\\documentclass{article}\n"
+    assert body.startswith("\\ifdefined\\newgeometry\\newgeometry{margin=1.5cm}\\fi\n")
+    assert "\\fontsize{10.5pt}{12.6pt}" in body
+    assert "\\setlist[itemize]{itemsep=0.1em, topsep=0.2em, leftmargin=*}\\fi" in body
+    # Templates without setspace still get the line stretch
+    assert (
+        "\\ifdefined\\setstretch\\setstretch{1}\\else\\linespread{1}\\selectfont\\fi\n"
+    ) in body
+
+    with pytest.raises(RuntimeError, match="no \\\\begin\\{document\\}"):
+        apply_layout("\\documentclass{article}", layout)
+
+
+@pytest.fixture
+def fake_build(tmp_path, monkeypatch):
+    """Builds whose page count depends only on the body font size."""
+    template = tmp_path / "template.tex"
+    template.write_text(TEMPLATE, encoding="utf-8")
+    compiled = []
+
+    def compile_latex_to_pdf(latex, **kwargs):
+        compiled.append(latex)
+        return latex.encode()
+
+    def pdf_page_count(pdf):
+        font = re.search(rb"\\fontsize\{([\d.]+)pt\}", pdf)
+        size = float(font.group(1)) if font else 11.0
+        return fake_build.pages(size)
+
+    monkeypatch.setattr(fit_pages, "convert_md_to_latex", lambda *a, **k: LATEX)
+    monkeypatch.setattr(fit_pages, "compile_latex_to_pdf", compile_latex_to_pdf)
+    monkeypatch.setattr(fit_pages, "pdf_page_count", pdf_page_count)
+    fake_build.template = template
+    fake_build.compiled = compiled
+    return fake_build
+
+
+def test_template_as_written_when_it_fits(fake_build):
+    fake_build.pages = lambda size: 1
+    result = fit_to_pages("# CV", fake_build.template, [], 1)
+    assert (result.fits, result.pages, result.probes, result.density) == (
+        True,
+        1,
+        1,
+        0.0,
+    )
+    assert result.pdf == LATEX.encode()
+
+
+def test_bisects_to_the_loosest_fitting_layout(fake_build):
+    # Font 11pt as written, 10pt tightest: fits from density 0.6 on
+    fake_build.pages = lambda size: 1 if size <= 10.4 else 2
+    result = fit_to_pages("# CV", fake_build.template, [], 1, steps=3)
+
+    assert result.fits
+    assert result.probes == 5  # as written, tightest, then 0.5, 0.75, 0.625
+    assert result.density == 0.625
+    assert result.layout.font_size == 10.38
+    assert b"\\fontsize{10.38pt}" in result.pdf
+
+
+def test_tightest_build_when_nothing_fits(fake_build):
+    fake_build.pages = lambda size: 3
+    result = fit_to_pages("# CV", fake_build.template, [], 2)
+    assert (result.fits, result.pages, result.probes, result.density) == (
+        False,
+        3,
+        2,
+        1.0,
+    )
+    assert result.layout.font_size == 10.0
+
+
+def test_unknown_page_count_fails(fake_build):
+    fake_build.pages = lambda size: None
+    with pytest.raises(RuntimeError, match="cannot be counted"):
+        fit_to_pages("# CV", fake_build.template, [], 1)
+
+
+def test_target_must_be_positive(fake_build):
+    with pytest.raises(RuntimeError, match="at least 1 page"):
+        fit_to_pages("# CV", fake_build.template, [], 0)
+    assert fake_build.compiled == []
@@ -0,0 +1,41 @@
+import pytest
+from conftest import ROOT, requires_pandoc
+
+from benchmarks.run import TEMPLATES, filter_combinations
+from benchmarks.synthetic import experience_cv, skills_cv
+from utils.markdown_processor import convert_md_to_latex, preprocess_markdown
+from utils.native_latex import render_latex
+
+CASES = {
+    "example": (ROOT / "examples" / "default.md").read_text(encoding="utf-8"),
+    "skills": skills_cv(4, 12),
+    "experience": experience_cv(6, 3),
+}
+
+
+def test_unsupported_markdown_falls_back():
+    template = (ROOT / TEMPLATES["modern"]).read_text(encoding="utf-8")
+    assert render_latex("# CV\n\nPlain *text*.\n", template) is not None
+    assert (
+        render_latex("# CV\n\nSee [my site](https://example.com).\n", template) is None
+    )
+    assert render_latex("# CV\n\n| a | b |\n|---|---|\n| 1 | 2 |\n", template) is None
+
+
+@requires_pandoc
+@pytest.mark.parametrize("combo", filter_combinations())
+@pytest.mark.parametrize("template", TEMPLATES)
+@pytest.mark.parametrize("case", CASES)
+def test_output_is_identical_to_pandoc(case, template, combo):
+    md_text = preprocess_markdown(CASES[case])
+    template_path = ROOT / TEMPLATES[template]
+    filters = [ROOT / path for path in filter_combinations()[combo]]
+
+    expected = convert_md_to_latex(md_text, template_path, filters)
+    native = render_latex(
+        md_text,
+        template_path.read_text(encoding="utf-8"),
+        inline_dates="inline_dates" in combo,
+        columns="columns" in combo,
+    )
+    assert native == expected
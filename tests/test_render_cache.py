@@ -0,0 +1,126 @@
+import os
+import time
+
+from utils.render_cache import (
+    STALE_TMP_AGE,
+    DirectoryBackend,
+    RenderCache,
+    content_key,
+    render_cache_key,
+)
+
+
+def age(path, seconds: float) -> None:
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_content_key_separates_kinds_and_part_boundaries():
+    key = content_key("latex", [b"ab", b"c"])
+    assert key == content_key("latex", [b"ab", b"c"])
+    assert key != content_key("pdf", [b"ab", b"c"])
+    assert key != content_key("latex", [b"a", b"bc"])
+    assert key != content_key("latex", [b"abc"])
+
+
+def test_render_cache_key_follows_file_contents(tmp_path):
+    template = tmp_path / "template.tex"
+    lua_filter = tmp_path / "filter.lua"
+    template.write_text("$body$")
+    lua_filter.write_text("-- v1")
+
+    def key(md_text="# CV", extra_args=()):
+        return render_cache_key(
+            "latex", md_text, template, [lua_filter], extra_args, tools=()
+        )
+
+    first = key()
+    assert key() == first
+    assert key("# Other") != first
+    assert key(extra_args=["--metadata=cv-columns=false"]) != first
+    lua_filter.write_text("-- v2")
+    assert key() != first
+
+
+def test_directory_backend_round_trip(tmp_path):
+    backend = DirectoryBackend(tmp_path)
+    assert backend.get("ab12") is None
+    backend.put("ab12", b"pdf")
+    assert backend.get("ab12") == b"pdf"
+    assert backend.path("ab12") == tmp_path / "ab" / "ab12"
+
+
+def test_directory_backend_expires_old_entries(tmp_path):
+    backend = DirectoryBackend(tmp_path, max_age=60)
+    backend.put("ab12", b"pdf")
+    age(backend.path("ab12"), 120)
+    assert backend.get("ab12") is None
+    assert not backend.path("ab12").exists()
+
+
+def test_prune_drops_least_recently_used_entries(tmp_path):
+    backend = DirectoryBackend(tmp_path)
+    for n, key in enumerate(["aa01", "bb02", "cc03"]):
+        backend.put(key, b"x" * 4000)
+        age(backend.path(key), 100 - n)  # aa01 is the oldest
+    backend.get("aa01")  # ... until it is read again
+
+    backend.max_bytes = 10_000
+    assert backend.prune() == 1
+    assert backend.get("bb02") is None
+    assert backend.get("aa01") is not None
+    assert backend.get("cc03") is not None
+
+
+def test_prune_removes_stale_temp_files_only(tmp_path):
+    backend = DirectoryBackend(tmp_path)
+    backend.put("ab12", b"pdf")
+    stale = tmp_path / "ab" / ".tmp-crashed"
+    fresh = tmp_path / "ab" / ".tmp-writing"
+    stale.write_bytes(b"partial")
+    fresh.write_bytes(b"partial")
+    age(stale, STALE_TMP_AGE + 60)
+
+    assert backend.prune() == 0
+    assert not stale.exists()
+    assert fresh.exists()
+    assert backend.get("ab12") == b"pdf"
+
+
+def test_put_only_scans_the_directory_when_over_budget(tmp_path, monkeypatch):
+    backend = DirectoryBackend(tmp_path, max_bytes=10_000, prune_interval=3600)
+    scans = []
+    prune = backend.prune
+    monkeypatch.setattr(backend, "prune", lambda: scans.append(1) or prune())
+
+    backend.put("aa01", b"x" * 4000)  # first write: the total is unknown
+    backend.put("bb02", b"x" * 4000)
+    backend.put("bb02", b"x" * 4000)  # replacing an entry keeps the total
+    assert len(scans) == 1
+
+    backend.put("cc03", b"x" * 4000)
+    assert len(scans) == 2
+
+
+def test_render_cache_memory_tier_is_lru_bounded():
+    cache = RenderCache(memory_max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"12345")  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"12345"
+    assert cache.get("c") == b"12345"
+    assert cache.stats.evictions == 1
+    assert cache.stats.memory_hits == 3
+    assert cache.stats.misses == 1
+
+
+def test_render_cache_reads_through_to_the_backend(tmp_path):
+    DirectoryBackend(tmp_path).put("ab12", b"pdf")
+    cache = RenderCache(DirectoryBackend(tmp_path))
+
+    assert cache.get("ab12") == b"pdf"
+    assert cache.get("ab12") == b"pdf"
+    assert (cache.stats.disk_hits, cache.stats.memory_hits) == (1, 1)
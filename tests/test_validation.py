@@ -0,0 +1,95 @@
+import pytest
+
+from utils.validation import (
+    ValidationError,
+    check_balance,
+    check_front_matter,
+    check_template,
+    template_variables,
+    validate_build,
+)
+
+TEMPLATE = r"""\documentclass{article}
+\usepackage{tabularx}
+\newcommand{\HeadingWithNote}[3]{#2 #3}
+\begin{document}
+$name$
+$if(subtitle)$$subtitle$$endif$
+$body$
+\end{document}
+"""
+FILTERS = frozenset({"cv.lua"})
+
+
+def test_front_matter_is_parsed():
+    metadata, issues = check_front_matter("---\nname: Jane\n---\n# CV\n")
+    assert metadata == {"name": "Jane"}
+    assert issues == []
+
+
+def test_front_matter_problems_report_their_line():
+    _, issues = check_front_matter("\n---\nname: Jane\n# CV\n")
+    assert [(i.line, i.message) for i in issues] == [
+        (2, "front matter is not closed with '---'")
+    ]
+
+    _, issues = check_front_matter("---\nname: Jane\nrole: a: b\n---\n")
+    assert [(i.line, i.message) for i in issues] == [
+        (3, "invalid YAML: mapping values are not allowed here")
+    ]
+
+    _, issues = check_front_matter("---\n- a\n- b\n---\n")
+    assert "field: value" in issues[0].message
+
+
+def test_template_variables_tracks_guards():
+    variables = template_variables(TEMPLATE)
+    assert variables["name"] == (5, False)
+    assert variables["subtitle"] == (6, True)
+    assert "endif" not in variables
+
+
+def test_ifx_empty_counts_as_guard():
+    variables = template_variables(r"\ifx\empty$role$\else $role$\fi")
+    assert variables["role"][1]
+
+
+def test_check_balance_finds_unclosed_groups_and_environments():
+    issues = check_balance("\\begin{itemize}\n{\n\\end{itemize}\n}}\n")
+    messages = [(i.line, i.message) for i in issues]
+    assert messages[0] == (3, "\\end{itemize} but '{' from line 2 is still open")
+    assert (4, "unmatched '}'") in messages
+
+
+def test_check_balance_ignores_comments_and_escaped_braces():
+    assert check_balance("\\{ % }\n\\begin{center}\\end{center}\n") == []
+
+
+def test_check_template_requires_what_the_filters_emit():
+    assert check_template(TEMPLATE, FILTERS) == ()
+    bare = "\\documentclass{article}\n"
+    messages = [i.message for i in check_template(bare, FILTERS)]
+    assert len(messages) == 2
+    assert "\\HeadingWithNote" in messages[0]
+    assert "tabularx" in messages[1]
+    assert check_template(bare, frozenset()) == ()
+
+
+def test_check_template_ignores_commented_code_but_not_escaped_percent():
+    commented = TEMPLATE.replace("\\usepackage{tabularx}", "% \\usepackage{tabularx}")
+    assert "tabularx" in check_template(commented, FILTERS)[0].message
+
+    escaped = TEMPLATE.replace(
+        "\\usepackage{tabularx}", "50\\% wide \\usepackage{tabularx}"
+    )
+    assert check_template(escaped, FILTERS) == ()
+
+
+def test_validate_build_lists_missing_variables(tmp_path):
+    with pytest.raises(ValidationError) as e:
+        validate_build("# CV\n", TEMPLATE, [tmp_path / "cv.lua"])
+    assert [i.message for i in e.value.issues] == [
+        "the template uses 'name' (template line 5), add 'name: ...' to the front matter"
+    ]
+    metadata = validate_build("---\nname: Jane\n---\n", TEMPLATE, tmp_path / "cv.lua")
+    assert metadata == {"name": "Jane"}
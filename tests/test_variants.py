@@ -0,0 +1,180 @@
+import json
+
+import pytest
+from conftest import requires_pandoc
+
+from utils.cv_filters import apply_cv_filters
+from utils.markdown_processor import _convert_text, parse_markdown
+from utils.variants import (
+    Variant,
+    _meta_value,
+    parse_manifest,
+    select_blocks,
+    variant_document,
+)
+
+
+def header(level: int, title: str, *classes: str) -> dict:
+    return {
+        "t": "Header",
+        "c": [level, ["", list(classes), []], [{"t": "Str", "c": title}]],
+    }
+
+
+def para(word: str) -> dict:
+    return {"t": "Para", "c": [{"t": "Str", "c": word}]}
+
+
+def div(*blocks, classes=()) -> dict:
+    return {"t": "Div", "c": [["", list(classes), []], list(blocks)]}
+
+
+def words(blocks: list) -> list[str]:
+    out = []
+    for block in blocks:
+        if block["t"] == "Div":
+            out.append(words(block["c"][1]))
+        else:
+            inlines = block["c"][2] if block["t"] == "Header" else block["c"]
+            out.append(inlines[0]["c"])
+    return out
+
+
+TAGS = frozenset({"data", "web", "long"})
+DOC = [
+    header(1, "Experience"),
+    header(2, "Analyst", "data"),
+    para("sql"),
+    header(3, "Details"),  # part of the tagged level-2 section
+    para("etl"),
+    header(2, "Frontend", "web"),
+    para("css"),
+    header(1, "Education"),
+    para("msc"),
+]
+
+
+def test_parse_manifest():
+    variants = parse_manifest(
+        {
+            "variants": {
+                "data": {"include": ["data"], "metadata": {"subtitle": "Data"}},
+                "short": {"exclude": ["long"]},
+                "all": None,
+            }
+        }
+    )
+    assert [v.name for v in variants] == ["data", "short", "all"]
+    assert variants[0].include == {"data"}
+    assert variants[0].metadata == {"subtitle": "Data"}
+    assert variants[1].exclude == {"long"}
+    assert variants[2] == Variant("all")
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ({}, "expected a 'variants' mapping"),
+        ({"variants": {"a/b": {}}}, "is not a file name"),
+        ({"variants": {"a": {"only": ["x"]}}}, "takes 'include', 'exclude'"),
+        ({"variants": {"a": {"metadata": ["x"]}}}, "must be a mapping"),
+    ],
+)
+def test_parse_manifest_rejects(data, message):
+    with pytest.raises(RuntimeError, match=message):
+        parse_manifest(data)
+
+
+def test_keeps():
+    variant = Variant("v", include=frozenset({"data"}), exclude=frozenset({"long"}))
+    assert variant.keeps(set())
+    assert variant.keeps({"data"})
+    assert not variant.keeps({"web"})
+    assert not variant.keeps({"data", "long"})
+    assert Variant("all").keeps({"web"})
+
+
+def test_tagged_sections_run_to_the_next_heading_of_their_level():
+    data = Variant("data", include=frozenset({"data"}))
+    assert words(select_blocks(DOC, data, TAGS)) == [
+        "Experience",
+        "Analyst",
+        "sql",
+        "Details",
+        "etl",
+        "Education",
+        "msc",
+    ]
+
+    web = Variant("web", exclude=frozenset({"data"}))
+    assert words(select_blocks(DOC, web, TAGS)) == [
+        "Experience",
+        "Frontend",
+        "css",
+        "Education",
+        "msc",
+    ]
+
+
+def test_classes_outside_the_manifest_are_not_tags():
+    blocks = [header(2, "Styled", "center"), para("kept")]
+    data = Variant("data", include=frozenset({"data"}))
+    assert select_blocks(blocks, data, TAGS) == blocks
+
+
+def test_tagged_divs_are_dropped_as_a_whole():
+    blocks = [para("intro"), div(para("a"), para("b"), classes=["long"])]
+    short = Variant("short", exclude=frozenset({"long"}))
+    assert words(select_blocks(blocks, short, TAGS)) == ["intro"]
+
+
+def test_kept_tagged_divs_are_spliced_into_their_parent():
+    styled = div(para("boxed"), classes=["center"])  # not a tag: stays a div
+    blocks = [div(header(2, "Role"), para("2020"), classes=["long"]), styled]
+    long = Variant("long", include=frozenset({"long"}))
+
+    assert select_blocks(blocks, long, TAGS) == [
+        header(2, "Role"),
+        para("2020"),
+        styled,
+    ]
+
+
+def test_filters_rewrite_headings_inside_kept_divs():
+    quote = {"t": "BlockQuote", "c": [para("2020")]}
+    blocks = [div(header(2, "Role"), quote, classes=["long"])]
+    doc = {"meta": {}, "blocks": select_blocks(blocks, Variant("all"), TAGS)}
+
+    apply_cv_filters(doc)
+    assert doc["blocks"] == [
+        {"t": "RawBlock", "c": ["latex", "\\HeadingWithNote{2}{Role}{2020}"]}
+    ]
+
+
+def test_metadata_overrides_are_inlines():
+    assert _meta_value("C# dev_ops") == {
+        "t": "MetaInlines",
+        "c": [{"t": "Str", "c": "C#"}, {"t": "Space"}, {"t": "Str", "c": "dev_ops"}],
+    }
+    assert _meta_value(None) == {"t": "MetaInlines", "c": []}
+    assert _meta_value({"draft": True, "years": [2024]}) == {
+        "t": "MetaMap",
+        "c": {
+            "draft": {"t": "MetaBool", "c": True},
+            "years": {"t": "MetaList", "c": [_meta_value("2024")]},
+        },
+    }
+
+
+@requires_pandoc
+def test_metadata_overrides_are_escaped_in_latex(tmp_path):
+    template = tmp_path / "template.tex"
+    template.write_text("$subtitle$\n", encoding="utf-8")
+    doc = json.loads(parse_markdown("# CV\n"))
+    variant = Variant("rd", metadata={"subtitle": "R&D 100% C#_dev"})
+    ast = variant_document(doc, variant, frozenset())
+
+    latex = _convert_text(
+        ast, to="latex", format="json", extra_args=[f"--template={template}"]
+    )
+    assert latex.strip() == "R\\&D 100\\% C\\#\\_dev"
@@ -0,0 +1,76 @@
+import os
+import time
+
+from utils.workspaces import WorkspacePool, aux_digest, clear_aux
+
+
+def fill(workspace, size: int) -> None:
+    (workspace / "cv.pdf").write_bytes(b"x" * size)
+
+
+def test_lease_reuses_the_workspace_of_a_session_and_template(tmp_path):
+    pool = WorkspacePool(tmp_path)
+    with pool.lease("s1", "template") as first:
+        (first / "cv.aux").write_text("\\relax")
+    with pool.lease("s1", "template") as again:
+        assert again == first
+        assert (again / "cv.aux").exists()
+    with pool.lease("s2", "template") as other:
+        assert other != first
+
+
+def test_busy_workspace_gives_a_throw_away_directory(tmp_path):
+    pool = WorkspacePool(tmp_path)
+    with (
+        pool.lease("s1", "template") as held,
+        pool.lease("s1", "template") as concurrent,
+    ):
+        assert concurrent != held
+        assert not concurrent.is_relative_to(tmp_path)
+    assert not concurrent.exists()
+
+
+def test_aux_digest_follows_aux_files(tmp_path):
+    assert aux_digest(tmp_path) == ""
+    (tmp_path / "cv.aux").write_text("a")
+    first = aux_digest(tmp_path)
+    (tmp_path / "cv.aux").write_text("b")
+    assert aux_digest(tmp_path) not in ("", first)
+    clear_aux(tmp_path)
+    assert aux_digest(tmp_path) == ""
+
+
+def test_prune_removes_expired_then_least_recently_used(tmp_path):
+    pool = WorkspacePool(tmp_path / "pool", max_age=3600)
+    paths = []
+    for n in range(3):
+        with pool.lease(f"s{n}", "template") as workspace:
+            fill(workspace, 4000)
+        then = time.time() - 100 + n  # s0 is the least recently used
+        os.utime(workspace, (then, then))
+        paths.append(workspace)
+
+    pool.max_bytes = 10_000
+    assert pool.prune() == 1
+    assert [p.exists() for p in paths] == [False, True, True]
+
+    old = time.time() - 7200
+    os.utime(paths[1], (old, old))
+    assert pool.prune() == 1
+    assert [p.exists() for p in paths] == [False, False, True]
+
+
+def test_builds_only_scan_the_pool_when_due(tmp_path, monkeypatch):
+    pool = WorkspacePool(tmp_path, max_bytes=10_000, prune_interval=3600)
+    scans = []
+    prune = pool.prune
+    monkeypatch.setattr(pool, "prune", lambda: scans.append(1) or prune())
+
+    for session in ("s0", "s1", "s1"):  # first build: the total is unknown
+        with pool.lease(session, "template") as workspace:
+            fill(workspace, 4000)
+    assert len(scans) == 1
+
+    with pool.lease("s2", "template") as workspace:
+        fill(workspace, 4000)  # 12 000 bytes: over budget
+    assert len(scans) == 2
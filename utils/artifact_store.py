@@ -0,0 +1,95 @@
+"""Shared on-disk store for build artifacts (PDFs, exports) referenced by key."""
+
+import hashlib
+import mmap
+import os
+import threading
+from pathlib import Path
+
+from utils.render_cache import DirectoryBackend
+
+
+class ArtifactStore:
+    """
+    Content-addressed artifact files shared by all sessions of a process.
+
+    Callers keep only the key returned by `put`; identical builds map to the
+    same key and file. Reads are memory-mapped, so every session viewing an
+    artifact shares the page cache instead of holding its own copy. Total
+    size is bounded: the least recently used artifacts are evicted, after
+    which `get` returns None and the artifact has to be built again.
+
+    Args:
+        root: Directory holding the artifacts.
+        max_bytes: Size budget of all artifacts together.
+        max_age: Seconds after their last use that artifacts expire.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: float = 24 * 3600,
+    ):
+        self.files = DirectoryBackend(root, max_bytes=max_bytes, max_age=max_age)
+        self._maps: dict[str, mmap.mmap] = {}
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes) -> str:
+        """Store `data` (once per content) and return its key."""
+        key = hashlib.sha256(data).hexdigest()
+        try:
+            os.utime(self.files.path(key))  # already stored: mark as used
+        except FileNotFoundError:
+            if self.files.put(key, data):
+                self._release_evicted()
+        return key
+
+    def path(self, key: str) -> Path | None:
+        """File of the artifact, or None if it was evicted."""
+        path = self.files.path(key)
+        return path if path.exists() else None
+
+    def get(self, key: str) -> memoryview | None:
+        """
+        Read-only view of the artifact without copying it into memory.
+
+        Returns:
+            A memoryview over a shared mapping of the file, or None if the
+            artifact was evicted.
+        """
+        path = self.files.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._maps.pop(key, None)
+            return None
+
+        with self._lock:
+            mapped = self._maps.get(key)
+            if mapped is None:
+                try:
+                    with open(path, "rb") as f:
+                        if os.fstat(f.fileno()).st_size == 0:
+                            return memoryview(b"")
+                        # The mapping stays valid after eviction unlinks the file
+                        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except FileNotFoundError:
+                    return None  # evicted in between
+                self._maps[key] = mapped
+        return memoryview(mapped)
+
+    def prune(self) -> int:
+        """Evict expired and least recently used artifacts above the budget."""
+        evicted = self.files.prune()
+        if evicted:
+            self._release_evicted()
+        return evicted
+
+    def _release_evicted(self) -> None:
+        # A mapping pins the unlinked file's disk space; outstanding views keep
+        # it alive until they are released, new reads no longer find it
+        with self._lock:
+            for key in [k for k in self._maps if self.path(k) is None]:
+                del self._maps[key]
@@ -0,0 +1,16 @@
+"""
+Locations and endpoints shared by the app, the CLI and the render service.
+
+Kept free of heavy imports: the CLI reads these before it knows whether it
+will build anything at all.
+"""
+
+import os
+from pathlib import Path
+
+# Root for all on-disk caches; can be pointed at a shared directory
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("CV_BUILDER_CACHE_DIR", Path.home() / ".cache" / "cv-builder")
+)
+
+DEFAULT_SERVICE_URL = "http://127.0.0.1:8765"
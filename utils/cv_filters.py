@@ -0,0 +1,188 @@
+"""
+Python port of the built-in Lua filters, operating on Pandoc's JSON AST.
+
+`pandoc server` cannot run Lua filters, so documents converted through the
+server are filtered here instead. The rewrites and the escaping match
+filters/cv.lua (and thus inline_dates.lua and columns.lua) exactly, including
+its HTML output for the draft preview.
+"""
+
+# Escaping used by inline_dates.lua
+_HEADING_ESCAPES = str.maketrans(
+    {
+        "\\": "\\textbackslash{}",
+        "{": "\\{",
+        "}": "\\}",
+        "&": "\\&",
+        "%": "\\%",
+        "$": "\\$",
+        "#": "\\#",
+        "_": "\\_",
+        "~": "\\textasciitilde{}",
+        "^": "\\textasciicircum{}",
+    }
+)
+
+# Escaping used by columns.lua, applied one after the other like its gsub chain
+_CELL_ESCAPES = [
+    ("\\", "\\textbackslash{}"),
+    ("%", "\\%"),
+    ("&", "\\&"),
+    ("#", "\\#"),
+    ("_", "\\_"),
+    ("{", "\\{"),
+    ("}", "\\}"),
+]
+
+_HTML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+_QUOTES = {"SingleQuote": ("\u2018", "\u2019"), "DoubleQuote": ("\u201c", "\u201d")}
+
+
+def stringify(node) -> str:
+    """
+    Plain text of an AST node or list of nodes, like `pandoc.utils.stringify`:
+    formatting is dropped, spaces and line breaks become " ", footnotes are
+    removed and quotes are turned into curly quotes.
+    """
+    if isinstance(node, list):
+        return "".join(stringify(n) for n in node)
+    if not isinstance(node, dict) or "t" not in node:
+        return ""  # attributes, targets, levels, ...
+
+    t, c = node["t"], node.get("c")
+    if t == "Str":
+        return c
+    if t in ("Space", "SoftBreak", "LineBreak"):
+        return " "
+    if t in ("Code", "Math"):
+        return c[1]
+    if t == "RawInline":
+        return " " if c[0] == "html" and c[1].startswith("<br") else ""
+    if t == "Note":
+        return ""
+    if t == "Quoted":
+        left, right = _QUOTES[c[0]["t"]]
+        return left + stringify(c[1]) + right
+    if t in ("CodeBlock", "RawBlock"):
+        return ""
+    if t == "Cite":
+        citations = [
+            part
+            for cit in c[0]
+            for part in (cit["citationPrefix"], cit["citationSuffix"])
+        ]
+        return stringify(citations) + stringify(c[1])
+    return stringify(c)
+
+
+def escape_heading(text: str) -> str:
+    return text.translate(_HEADING_ESCAPES)
+
+
+def escape_cell(text: str) -> str:
+    for char, replacement in _CELL_ESCAPES:
+        text = text.replace(char, replacement)
+    return text
+
+
+def escape_html(text: str) -> str:
+    return text.translate(_HTML_ESCAPES)
+
+
+def _raw(fmt: str, text: str) -> dict:
+    return {"t": "RawBlock", "c": [fmt, text]}
+
+
+def heading_with_note(level: int, header: str, note: str, html: bool = False) -> dict:
+    if html:
+        return _raw(
+            "html",
+            f'<h{level} class="heading-with-note"><span>{escape_html(header)}</span>'
+            f'<span class="note">{escape_html(note)}</span></h{level}>',
+        )
+    return _raw(
+        "latex",
+        f"\\HeadingWithNote{{{level}}}{{{escape_heading(header)}}}"
+        f"{{{escape_heading(note)}}}",
+    )
+
+
+def make_html_columns(columns: list[list[str]]) -> dict:
+    parts = ['<table class="cv-columns">\n']
+    max_rows = max(len(col) for col in columns)
+    for r in range(max_rows):
+        parts.append("<tr>")
+        for col in columns:
+            parts.append(f"<td>{escape_html(col[r] if r < len(col) else '')}</td>")
+        parts.append("</tr>\n")
+    parts.append("</table>\n")
+    return _raw("html", "".join(parts))
+
+
+def make_columns(columns: list[list[str]], html: bool = False) -> dict:
+    if html:
+        return make_html_columns(columns)
+    ncols = len(columns)
+    parts = ["\\begin{tabularx}{\\linewidth}{@{}" + "X" * ncols + "@{}}\n"]
+    max_rows = max(len(col) for col in columns)
+    for r in range(max_rows):
+        for c, col in enumerate(columns):
+            parts.append(escape_cell(col[r] if r < len(col) else ""))
+            parts.append(" & " if c < ncols - 1 else " \\\\\n")
+    parts.append("\\end{tabularx}\n")
+    return _raw("latex", "".join(parts))
+
+
+def apply_cv_filters(
+    doc: dict, inline_dates: bool = True, columns: bool = True, to: str = "latex"
+) -> dict:
+    """
+    Apply the built-in rewrites to a Pandoc JSON document in place.
+
+    Args:
+        doc: Document as produced by `pandoc -t json`.
+        inline_dates: Level 2/3 header (+ following blockquote) → \\HeadingWithNote.
+        columns: Bullet lists separated by horizontal rules → tabularx block.
+        to: Output format; HTML formats get the HTML equivalents.
+
+    Returns:
+        The same document, for chaining.
+    """
+    html = "html" in to
+    blocks = doc["blocks"]
+    n = len(blocks)
+
+    def is_type(i: int, t: str) -> bool:
+        return i < n and blocks[i]["t"] == t
+
+    out = []
+    i = 0
+    while i < n:
+        b = blocks[i]
+
+        if inline_dates and b["t"] == "Header" and b["c"][0] in (2, 3):
+            level, _, content = b["c"]
+            note = ""
+            if is_type(i + 1, "BlockQuote"):
+                note = stringify(blocks[i + 1]["c"])
+                i += 1
+            out.append(heading_with_note(level, stringify(content), note, html))
+            i += 1
+
+        elif columns and b["t"] == "BulletList" and is_type(i + 1, "HorizontalRule"):
+            cols = []
+            while True:
+                cols.append([stringify(item) for item in blocks[i]["c"]])
+                i += 1
+                if not (is_type(i, "HorizontalRule") and is_type(i + 1, "BulletList")):
+                    break
+                i += 1  # skip HR
+            out.append(make_columns(cols, html))
+
+        else:
+            out.append(b)
+            i += 1
+
+    doc["blocks"] = out
+    return doc
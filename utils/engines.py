@@ -0,0 +1,258 @@
+"""
+LaTeX engines: registry, font-cache warm-up and measured auto-selection.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from utils.config import DEFAULT_CACHE_DIR
+from utils.latex_format import tex_installation_stamp
+from utils.pdf_tools import pdf_page_count, pdf_text
+from utils.profiling import record_subprocess
+
+AUTO = "auto"
+ENGINE_CHOICES_PATH = DEFAULT_CACHE_DIR / "engines.json"
+
+_FONTSPEC = re.compile(r"^[^%\n]*\\usepackage(\[[^\]]*\])?\{fontspec\}", re.MULTILINE)
+_FONT_NAME = re.compile(
+    r"^[^%\n]*\\(?:set(?:main|sans|mono)font|newfontfamily\\\w+)"
+    r"(?:\[[^\]]*\])?\{([^}]+)\}",
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class Engine:
+    name: str
+    executable: str
+    unicode_fonts: bool  # system fonts through fontspec
+    precompiled_format: bool  # can start from a dumped preamble format
+
+
+ENGINES = {
+    "xelatex": Engine("xelatex", "xelatex", True, True),
+    # LuaTeX formats cannot restore luaotfload's callbacks
+    "lualatex": Engine("lualatex", "lualatex", True, False),
+    "pdflatex": Engine("pdflatex", "pdflatex", False, True),
+}
+
+
+def get_engine(name: str) -> Engine:
+    """Look up an engine; unknown names are treated as a LaTeX-compatible executable."""
+    return ENGINES.get(name) or Engine(name, name, True, False)
+
+
+def available_engines(template_text: str | None = None) -> list[Engine]:
+    """
+    Installed engines able to compile documents of `template_text`, in order
+    of preference.
+    """
+    needs_fonts = template_text is not None and _FONTSPEC.search(template_text)
+    return [
+        engine
+        for engine in ENGINES.values()
+        if shutil.which(engine.executable) and (engine.unicode_fonts or not needs_fonts)
+    ]
+
+
+def template_fonts(template_texts: list[str]) -> list[str]:
+    """Font names selected through fontspec in the given templates."""
+    fonts = []
+    for text in template_texts:
+        for name in _FONT_NAME.findall(text):
+            if name not in fonts:
+                fonts.append(name)
+    return fonts
+
+
+def warm_font_cache(
+    template_texts: list[str], engines: list[Engine] | None = None
+) -> dict[str, float | None]:
+    """
+    Pay the first-lookup cost of the templates' fonts ahead of the first build:
+    build luaotfload's font database and let every engine resolve each font
+    once, which fills fontconfig's and the engines' own caches.
+
+    Args:
+        template_texts: Templates whose fonts are warmed up.
+        engines: Engines to warm up; defaults to all installed font engines.
+
+    Returns:
+        Seconds spent per engine, or None where the warm-up failed.
+    """
+    if engines is None:
+        engines = [e for e in available_engines() if e.unicode_fonts]
+    fonts = template_fonts(template_texts)
+    document = (
+        "\\documentclass{article}\n\\usepackage{fontspec}\n\\begin{document}\n"
+        + "".join(f"{{\\fontspec{{{font}}}x}}\n" for font in fonts)
+        + "\\end{document}\n"
+    )
+
+    timings = {}
+    for engine in engines:
+        start = time.perf_counter()
+        try:
+            if engine.name == "lualatex" and shutil.which("luaotfload-tool"):
+                record_subprocess()
+                subprocess.run(
+                    ["luaotfload-tool", "--update"],
+                    capture_output=True,
+                    check=False,
+                    timeout=600,
+                )
+            with tempfile.TemporaryDirectory() as tmpdir:
+                (Path(tmpdir) / "warmup.tex").write_text(document, encoding="utf-8")
+                record_subprocess()
+                subprocess.run(
+                    [
+                        engine.executable,
+                        "-interaction=nonstopmode",
+                        "-halt-on-error",
+                        "warmup.tex",
+                    ],
+                    cwd=tmpdir,
+                    capture_output=True,
+                    check=True,
+                    timeout=600,
+                )
+        except (OSError, subprocess.SubprocessError):
+            timings[engine.name] = None
+            continue
+        timings[engine.name] = time.perf_counter() - start
+    return timings
+
+
+_choices: dict[str, str] = {}
+_measuring: dict[str, threading.Event] = {}  # set once the choice is known
+_choices_lock = threading.Lock()
+_store_lock = threading.Lock()  # serializes updates of ENGINE_CHOICES_PATH
+
+
+def _choice_key(template_text: str, candidates: list[Engine]) -> str:
+    h = hashlib.sha256(template_text.encode("utf-8"))
+    for engine in candidates:
+        h.update(f"|{engine.name}|{tex_installation_stamp(engine.executable)}".encode())
+    return h.hexdigest()
+
+
+def _load_choices() -> dict[str, str]:
+    try:
+        return json.loads(ENGINE_CHOICES_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_choice(key: str, name: str) -> None:
+    with _store_lock:
+        choices = _load_choices()
+        choices[key] = name
+        tmp = None
+        try:
+            ENGINE_CHOICES_PATH.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(
+                dir=ENGINE_CHOICES_PATH.parent, prefix=".engines-"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(choices, f, indent=2)
+            os.replace(tmp, ENGINE_CHOICES_PATH)
+        except OSError:
+            # read-only cache directory: the choice is kept in memory only
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+
+def _equivalent(pdf: bytes, reference: bytes) -> bool:
+    pages, expected_pages = pdf_page_count(pdf), pdf_page_count(reference)
+    if pages is None or expected_pages is None or pages != expected_pages:
+        return False
+    text, expected = pdf_text(pdf), pdf_text(reference)
+    return text is None or expected is None or text == expected
+
+
+def select_engine(
+    template_text: str,
+    compile_fn: Callable[[str], bytes],
+    runs: int = 2,
+) -> str:
+    """
+    Pick the fastest installed engine for a template, measured once and then
+    remembered (in memory and on disk) until the template or TeX changes.
+
+    The first engine in order of preference that compiles the sample is the
+    reference; faster engines only win if their PDF has the same page count
+    and text. Builds for other templates are not held up by a measurement;
+    concurrent calls for the same template wait for it instead of repeating it.
+
+    Args:
+        template_text: Template the choice is made for.
+        compile_fn: Compiles a document rendered from the template with the
+            named engine and returns the PDF.
+        runs: Timed compiles per engine after a warm-up compile.
+
+    Returns:
+        Name of the chosen engine.
+    """
+    candidates = available_engines(template_text)
+    if not candidates:
+        return "xelatex"  # let the build report the missing engine
+    key = _choice_key(template_text, candidates)
+
+    while True:
+        with _choices_lock:
+            if key in _choices:
+                return _choices[key]
+            measuring = _measuring.get(key)
+            if measuring is None:
+                measuring = _measuring[key] = threading.Event()
+                break
+        measuring.wait()  # retries if that measurement failed
+
+    try:
+        stored = _load_choices().get(key)
+        name = stored or _measure(candidates, compile_fn, runs)
+        if stored is None:
+            _store_choice(key, name)
+        with _choices_lock:
+            _choices[key] = name
+    finally:
+        with _choices_lock:
+            del _measuring[key]
+        measuring.set()
+    return name
+
+
+def _measure(
+    candidates: list[Engine],
+    compile_fn: Callable[[str], bytes],
+    runs: int,
+) -> str:
+    reference = None
+    best, best_time = candidates[0].name, float("inf")
+    for engine in candidates:
+        try:
+            pdf = compile_fn(engine.name)  # warm-up, also builds the format
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                compile_fn(engine.name)
+                timings.append(time.perf_counter() - start)
+        except RuntimeError:
+            continue
+        if reference is None:
+            reference = pdf
+        elif not _equivalent(pdf, reference):
+            continue
+        if min(timings) < best_time:
+            best, best_time = engine.name, min(timings)
+    return best
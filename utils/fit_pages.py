@@ -0,0 +1,249 @@
+"""
+Fit a CV onto a target number of pages by tightening the template's layout.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from utils.markdown_processor import compile_latex_to_pdf, convert_md_to_latex
+from utils.pandoc_server import PandocServerPool
+from utils.pdf_tools import pdf_page_count
+from utils.render_cache import RenderCache
+from utils.workspaces import WorkspacePool
+
+_FONT_SIZE = re.compile(r"\\documentclass\[[^\]]*?\b(\d+(?:\.\d+)?)pt\b")
+_MARGIN = re.compile(
+    r"\\usepackage\[[^\]]*?\bmargin=(\d*\.?\d+)(cm|mm|in|pt)[^\]]*\]\{geometry\}"
+)
+_STRETCH = re.compile(r"^[^%\n]*\\setstretch\{(\d*\.?\d+)\}", re.MULTILINE)
+_ITEMIZE_LIST = re.compile(r"^[^%\n]*\\setlist\[itemize\]\{([^}]*)\}", re.MULTILINE)
+_EM_LENGTH = re.compile(r"^(-?\d*\.?\d+)em$")
+_BEGIN_DOCUMENT = "\\begin{document}"
+
+
+@dataclass(frozen=True)
+class Layout:
+    font_size: float  # pt, body text
+    stretch: float  # \setstretch factor
+    margin: float  # page margin in `margin_unit`
+    margin_unit: str
+    item_sep: float  # em, between list items
+    top_sep: float  # em, around lists
+    list_options: tuple[tuple[str, str], ...] = ()  # other \setlist[itemize] keys
+
+    def describe(self) -> str:
+        return (
+            f"font {self.font_size:g}pt · line stretch {self.stretch:g} · "
+            f"margin {self.margin:g}{self.margin_unit} · "
+            f"list spacing {self.item_sep:g}em/{self.top_sep:g}em"
+        )
+
+
+@dataclass
+class FitResult:
+    pdf: bytes
+    pages: int
+    fits: bool  # False if even the tightest layout needs more pages
+    layout: Layout
+    density: float  # 0 = template as written, 1 = tightest layout
+    probes: int  # documents compiled (cached ones included)
+
+    def describe(self) -> str:
+        if self.fits:
+            return f"fits on {self.pages} page(s): {self.layout.describe()}"
+        return (
+            f"still {self.pages} pages with the tightest layout "
+            f"({self.layout.describe()})"
+        )
+
+
+def template_layout(template_text: str) -> Layout:
+    """Layout the template sets up, with LaTeX's defaults where it sets none."""
+    font = _FONT_SIZE.search(template_text)
+    margin = _MARGIN.search(template_text)
+    stretch = _STRETCH.search(template_text)
+
+    lengths = {"itemsep": 0.5, "topsep": 0.5}  # roughly enumitem's defaults
+    others = []
+    itemize = _ITEMIZE_LIST.search(template_text)
+    for option in itemize.group(1).split(",") if itemize else []:
+        key, _, value = (part.strip() for part in option.partition("="))
+        em = _EM_LENGTH.match(value)
+        if key in lengths and em:
+            lengths[key] = float(em.group(1))
+        elif key and key not in lengths:
+            others.append((key, value))
+
+    return Layout(
+        font_size=float(font.group(1)) if font else 10.0,
+        stretch=float(stretch.group(1)) if stretch else 1.0,
+        margin=float(margin.group(1)) if margin else 2.5,
+        margin_unit=margin.group(2) if margin else "cm",
+        item_sep=lengths["itemsep"],
+        top_sep=lengths["topsep"],
+        list_options=tuple(others),
+    )
+
+
+def tightest_layout(layout: Layout) -> Layout:
+    """The densest layout still considered readable; never looser than `layout`."""
+    return replace(
+        layout,
+        font_size=min(layout.font_size, max(8.0, layout.font_size - 1.0)),
+        stretch=min(layout.stretch, 1.0),
+        margin=layout.margin * 0.6,
+        item_sep=0.0,
+        top_sep=0.0,
+    )
+
+
+def interpolate(loose: Layout, tight: Layout, density: float) -> Layout:
+    """Layout `density` of the way from `loose` to `tight`, rounded for stable keys."""
+
+    def at(a: float, b: float, digits: int) -> float:
+        return round(a + (b - a) * density, digits)
+
+    return replace(
+        loose,
+        font_size=at(loose.font_size, tight.font_size, 2),
+        stretch=at(loose.stretch, tight.stretch, 3),
+        margin=at(loose.margin, tight.margin, 2),
+        item_sep=at(loose.item_sep, tight.item_sep, 3),
+        top_sep=at(loose.top_sep, tight.top_sep, 3),
+    )
+
+
+def apply_layout(latex: str, layout: Layout) -> str:
+    """
+    Insert layout overrides right after `\\begin{document}`.
+
+    The preamble stays untouched, so every probe compiles from the same
+    precompiled format. Margins and list spacing are only changed when the
+    template loads geometry and enumitem; without setspace, the line stretch
+    falls back to `\\linespread`.
+    """
+    list_options = [
+        f"itemsep={layout.item_sep:g}em",
+        f"topsep={layout.top_sep:g}em",
+        *(f"{k}={v}" if v else k for k, v in layout.list_options),
+    ]
+    stretch = f"{layout.stretch:g}"
+    overrides = (
+        f"\\ifdefined\\newgeometry"
+        f"\\newgeometry{{margin={layout.margin:g}{layout.margin_unit}}}\\fi\n"
+        f"\\renewcommand{{\\normalsize}}{{\\fontsize{{{layout.font_size:g}pt}}"
+        f"{{{layout.font_size * 1.2:g}pt}}\\selectfont}}\\normalsize\n"
+        f"\\ifdefined\\setstretch\\setstretch{{{stretch}}}"
+        f"\\else\\linespread{{{stretch}}}\\selectfont\\fi\n"
+        f"\\ifdefined\\setlist\\setlist[itemize]{{{', '.join(list_options)}}}\\fi\n"
+    )
+    head, found, body = latex.partition(_BEGIN_DOCUMENT)
+    if not found:
+        raise RuntimeError("Cannot fit pages: the document has no \\begin{document}")
+    return head + _BEGIN_DOCUMENT + "\n" + overrides + body
+
+
+def fit_to_pages(
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path] | Path,
+    pages: int,
+    steps: int = 3,
+    cache: RenderCache | None = None,
+    pandoc_server: PandocServerPool | None = None,
+    engine: str = "xelatex",
+    cancel: threading.Event | None = None,
+    workspaces: WorkspacePool | None = None,
+    session: str | None = None,
+    native: bool = False,
+) -> FitResult:
+    """
+    Build the CV with the loosest layout that fits on `pages` pages.
+
+    Pandoc runs once; each probe only recompiles the LaTeX with different
+    layout overrides after `\\begin{document}`, sharing the template's
+    precompiled format (and, with `cache`, the engine stage's cache). The
+    template as written is tried first and returned as is if it fits; then
+    the tightest layout; then `steps` bisection probes between the two. That
+    is at most `steps + 2` compiles.
+
+    Args:
+        md_text: Input markdown text.
+        template_path: Path to the LaTeX template file.
+        lua_filter_paths: List of paths to Lua filter files or a single path.
+        pages: Target page count.
+        steps: Bisection probes after the first two compiles.
+        cache: Optional render cache for both build stages.
+        pandoc_server: Optional server pool for the Pandoc stage.
+        engine: LaTeX engine (see `compile_latex_to_pdf`).
+        cancel: Event that aborts the search once set.
+        workspaces: Optional persistent build directories, used with `session`.
+        session: Identifies the client the workspace belongs to.
+        native: Skip Pandoc for documents the in-process renderer covers
+            (see `convert_md_to_latex`).
+
+    Returns:
+        The chosen build; `fits` is False if the tightest layout still needs
+        more than `pages` pages (its build is returned then).
+
+    Raises:
+        RuntimeError: If a build fails or its pages cannot be counted (see
+            `pdf_page_count`).
+    """
+    if pages < 1:
+        raise RuntimeError("Cannot fit pages: the target must be at least 1 page")
+    template_text = Path(template_path).read_text(encoding="utf-8")
+    latex = convert_md_to_latex(
+        md_text,
+        template_path,
+        lua_filter_paths,
+        cache=cache,
+        pandoc_server=pandoc_server,
+        native=native,
+    )
+    loose = template_layout(template_text)
+    tight = tightest_layout(loose)
+    probes = 0
+
+    def probe(density: float) -> tuple[bytes, int, Layout]:
+        nonlocal probes
+        probes += 1
+        layout = interpolate(loose, tight, density)
+        source = latex if density == 0 else apply_layout(latex, layout)
+        pdf = compile_latex_to_pdf(
+            source,
+            template_text=template_text,
+            engine=engine,
+            cache=cache,
+            cancel=cancel,
+            workspaces=workspaces,
+            session=session,
+        )
+        count = pdf_page_count(pdf)
+        if count is None:
+            raise RuntimeError(
+                "Cannot fit pages: the PDF's pages cannot be counted; "
+                "install pypdf or poppler-utils (pdfinfo)"
+            )
+        return pdf, count, layout
+
+    pdf, count, layout = probe(0.0)
+    if count <= pages:
+        return FitResult(pdf, count, True, layout, 0.0, probes)
+
+    best = probe(1.0)
+    if best[1] > pages:
+        return FitResult(*best[:2], False, best[2], 1.0, probes)
+
+    # Invariant: `lo` overflows, `hi` fits; keep the loosest fitting layout
+    lo, hi = 0.0, 1.0
+    for _ in range(steps):
+        mid = (lo + hi) / 2
+        result = probe(mid)
+        if result[1] <= pages:
+            hi, best = mid, result
+        else:
+            lo = mid
+    return FitResult(best[0], best[1], True, best[2], hi, probes)
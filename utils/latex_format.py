@@ -0,0 +1,182 @@
+"""
+Precompiled LaTeX formats (mylatexformat-style) for the static template preamble.
+
+Loading fontspec, hyperref, titlesec, tabularx, enumitem, ... dominates the
+start of every engine run. The static part of a template's preamble is dumped
+into a format file once; later compiles start from that format and only
+execute the rest of the preamble.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from utils.config import DEFAULT_CACHE_DIR
+from utils.profiling import record_subprocess
+from utils.tools import tool_output, tool_version
+
+FORMAT_CACHE_DIR = DEFAULT_CACHE_DIR / "formats"
+
+# Everything from this marker on is executed on every compile. The csname form
+# is a no-op when the document is compiled without a format.
+ENDOFDUMP = "\\csname endofdump\\endcsname\n"
+
+# XeTeX/LuaTeX cannot dump native (OpenType) fonts, so the dump has to stop
+# before fontspec and the first font selection.
+_DUMP_STOP = re.compile(
+    r"^[^%\n]*("
+    r"\\usepackage(\[[^\]]*\])?\{(fontspec|unicode-math)\}"
+    r"|\\set(main|sans|mono|math)font|\\newfontfamily|\\newfontface"
+    r"|\\defaultfontfeatures|\\fontspec\b|\\selectfont|\\begin\{document\}"
+    r")",
+    re.MULTILINE,
+)
+
+# Pandoc variables must not be dumped either, as they differ between documents
+_TEMPLATE_VARIABLE = re.compile(r"^.*\$(?!\$)", re.MULTILINE)
+
+
+def split_preamble(
+    latex: str, template_text: str | None = None
+) -> tuple[str, str] | None:
+    """
+    Split a standalone LaTeX document into the dumpable preamble and the rest.
+
+    Args:
+        latex: Complete LaTeX document as produced by Pandoc.
+        template_text: Template the document was rendered from. If given, the
+            dump also stops at the first template line using a Pandoc variable,
+            so documents from the same template share one format.
+
+    Returns:
+        (static preamble, remainder) or None if there is nothing worth dumping.
+    """
+    if not latex.lstrip().startswith("\\documentclass"):
+        return None
+    match = _DUMP_STOP.search(latex)
+    if match is None:
+        return None
+    cut = match.start()
+
+    if template_text is not None:
+        variable = _TEMPLATE_VARIABLE.search(template_text)
+        if variable is not None:
+            cut = min(cut, variable.start())
+        if latex[:cut] != template_text[:cut]:
+            return None
+    preamble = latex[:cut]
+    if "\\usepackage" not in preamble:
+        return None
+    return preamble, latex[cut:]
+
+
+@lru_cache(maxsize=None)
+def tex_installation_stamp(engine: str) -> str:
+    """
+    Identify the TeX installation: engine version plus the modification time
+    of the file name database, which `mktexlsr` rewrites on every package
+    install or update.
+    """
+    stamp = tool_version(engine)
+    texmf = tool_output("kpsewhich", "-var-value=TEXMFDIST").strip()
+    if not texmf:
+        return stamp
+    for ls_r in (Path(texmf) / "ls-R", Path(texmf).parent / "ls-R"):
+        if ls_r.exists():
+            stamp += f"|{ls_r.stat().st_mtime_ns}"
+            break
+    return stamp
+
+
+def format_name(preamble: str, engine: str) -> str:
+    h = hashlib.sha256()
+    h.update(engine.encode())
+    h.update(tex_installation_stamp(engine).encode())
+    h.update(preamble.encode("utf-8"))
+    return f"cv-{engine}-{h.hexdigest()[:24]}"
+
+
+def ensure_format(
+    preamble: str, engine: str = "xelatex", cache_dir: Path = FORMAT_CACHE_DIR
+) -> Path | None:
+    """
+    Return the format file for `preamble`, dumping it on first use.
+
+    Args:
+        preamble: Static preamble from `split_preamble`.
+        engine: LaTeX engine the format is built for.
+        cache_dir: Directory holding the format files.
+
+    Returns:
+        Path to the .fmt file, or None if the preamble cannot be dumped
+        (the failure is remembered so it is not retried on every build).
+    """
+    name = format_name(preamble, engine)
+    fmt_path = cache_dir / f"{name}.fmt"
+    failed_marker = cache_dir / f"{name}.failed"
+    if fmt_path.exists():
+        return fmt_path
+    if failed_marker.exists() or shutil.which(engine) is None:
+        return None
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_dir, prefix=".build-") as tmpdir:
+        tmpdir = Path(tmpdir)
+        source = tmpdir / f"{name}.tex"
+        source.write_text(
+            preamble + ENDOFDUMP + "\\begin{document}\n\\end{document}\n",
+            encoding="utf-8",
+        )
+        record_subprocess()
+        try:
+            subprocess.run(
+                [
+                    engine,
+                    "-ini",
+                    "-interaction=nonstopmode",
+                    "-halt-on-error",
+                    f"-jobname={name}",
+                    f"&{engine}",
+                    "mylatexformat.ltx",
+                    source.name,
+                ],
+                cwd=tmpdir,
+                capture_output=True,
+                check=True,
+                timeout=300,
+            )
+        except (OSError, subprocess.SubprocessError):
+            failed_marker.touch()
+            return None
+
+        built = tmpdir / f"{name}.fmt"
+        if not built.exists():
+            failed_marker.touch()
+            return None
+        # Atomic publish; concurrent builders simply overwrite each other
+        os.replace(built, fmt_path)
+    return fmt_path
+
+
+def prepare_for_format(
+    latex: str, template_text: str | None = None, engine: str = "xelatex"
+) -> tuple[str, Path | None]:
+    """
+    Insert the end-of-dump marker into `latex` and resolve its format file.
+
+    Returns:
+        (LaTeX source to compile, format path or None to compile from scratch)
+    """
+    split = split_preamble(latex, template_text)
+    if split is None:
+        return latex, None
+    preamble, rest = split
+    fmt_path = ensure_format(preamble, engine)
+    if fmt_path is None:
+        return latex, None
+    return preamble + ENDOFDUMP + rest, fmt_path
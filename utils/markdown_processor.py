@@ -1,9 +1,123 @@
 """Module for preprocessing markdown and converting it to PDF using Pandoc."""
 
+import contextvars
+import json
+import os
+import re
+import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import pypandoc
+from utils.cv_filters import apply_cv_filters
+from utils.engines import AUTO, get_engine, select_engine
+from utils.latex_format import prepare_for_format
+from utils.native_latex import render_latex
+from utils.pandoc_server import PandocServerError, PandocServerPool
+from utils.pdf_postprocess import optimize_pdf
+from utils.profiling import (
+    current_profile,
+    record_cache,
+    record_subprocess,
+    stage,
+)
+from utils.render_cache import RenderCache, content_key, render_cache_key
+from utils.tools import tool_path
+from utils.workspaces import WorkspacePool, aux_digest, clear_aux
+
+FILTERS_DIR = Path(__file__).resolve().parent.parent / "filters"
+
+# HTML template and per-template stylesheets of the draft preview
+PREVIEW_DIR = Path(__file__).resolve().parent.parent / "templates" / "preview"
+PREVIEW_TEMPLATE = PREVIEW_DIR / "preview.html"
+
+# Built-in filters implemented by the fused single-pass filter, with the
+# metadata flag that switches each rewrite on or off
+FUSED_FILTER = FILTERS_DIR / "cv.lua"
+FUSED_FILTER_FLAGS = {
+    "inline_dates.lua": "cv-inline-dates",
+    "columns.lua": "cv-columns",
+}
+
+# Styles for the built-in filters' HTML in Pandoc's default template (the
+# draft preview has them in its per-template stylesheets)
+EXPORT_HTML_STYLE = """<style>
+.heading-with-note { display: flex; justify-content: space-between; gap: 1em; }
+.heading-with-note .note { font-weight: normal; font-style: italic; }
+.cv-columns { width: 100%; table-layout: fixed; border-collapse: collapse; }
+.cv-columns td { padding: 0 0.5em 0 0; vertical-align: top; }
+</style>"""
+
+# Formats `render_exports` can produce; binary ones are written to a file
+EXPORT_FORMATS = ("latex", "pdf", "html", "docx")
+BINARY_FORMATS = {"docx", "odt", "epub"}
+
+# Engine log messages asking for another pass (cross references, outlines)
+_RERUN_PATTERN = re.compile(r"Rerun to get|Label\(s\) may have changed|Rerun LaTeX")
+
+
+class BuildCancelled(RuntimeError):
+    """Raised when a build is cancelled through its `cancel` event."""
+
+
+def _convert_text(
+    source: str,
+    to: str,
+    format: str,
+    extra_args: list[str] = (),
+    outputfile: str | None = None,
+) -> str:
+    """
+    Run pandoc on `source` and return its output, like `pypandoc.convert_text`
+    without its per-process discovery: pypandoc probes every candidate pandoc
+    with `--version` and lists pandoc's formats before each conversion, which
+    costs more than small conversions themselves. The path comes from the
+    on-disk tool cache (`PYPANDOC_PANDOC` still overrides it).
+
+    Raises:
+        RuntimeError: If pandoc is not installed or fails.
+    """
+    pandoc = os.environ.get("PYPANDOC_PANDOC") or tool_path("pandoc")
+    if pandoc is None:
+        raise RuntimeError(
+            "pandoc is not installed (https://pandoc.org/installing.html)"
+        )
+    cmd = [pandoc, f"--from={format}", f"--to={to}", *extra_args]
+    if outputfile is not None:
+        cmd.append(f"--output={outputfile}")
+    try:
+        proc = subprocess.run(
+            cmd, input=source.encode("utf-8"), capture_output=True, check=False
+        )
+    except OSError as e:
+        raise RuntimeError(f"Could not run pandoc: {e}")
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode("utf-8", errors="replace")
+        raise RuntimeError(f'Pandoc died with exitcode "{proc.returncode}": {stderr}')
+    return proc.stdout.decode("utf-8", errors="replace")
+
+
+def _run_engine(
+    cmd: list[str],
+    cwd: Path,
+    env: dict | None,
+    cancel: threading.Event | None = None,
+) -> int:
+    """Run an engine pass and return its exit code; kill it if `cancel` is set."""
+    record_subprocess()
+    # Output goes to the .log file; an unread pipe could block the engine
+    proc = subprocess.Popen(
+        cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    while True:
+        try:
+            return proc.wait(timeout=0.05)
+        except subprocess.TimeoutExpired:
+            if cancel is not None and cancel.is_set():
+                proc.kill()
+                proc.wait()
+                raise BuildCancelled("Build cancelled")
 
 
 def preprocess_markdown(md: str) -> str:
@@ -17,6 +131,11 @@ def preprocess_markdown(md: str) -> str:
     Returns:
         Preprocessed markdown with proper spacing.
     """
+    with stage("preprocess"):
+        return _preprocess_markdown(md)
+
+
+def _preprocess_markdown(md: str) -> str:
     lines = md.splitlines()
     out = []
     prev = ""  # Tracks if the previous line was non-empty
@@ -60,60 +179,366 @@ def preprocess_markdown(md: str) -> str:
     return "\n".join(out) + "\n"
 
 
+def compile_latex_to_pdf(
+    latex: str,
+    template_text: str | None = None,
+    engine: str = "xelatex",
+    precompiled_format: bool = True,
+    max_passes: int = 3,
+    cache: RenderCache | None = None,
+    cancel: threading.Event | None = None,
+    workspaces: WorkspacePool | None = None,
+    session: str | None = None,
+) -> bytes:
+    """
+    Compile a standalone LaTeX document to PDF (second build stage).
+
+    Args:
+        latex: Complete LaTeX document (e.g. from `convert_md_to_latex`).
+        template_text: Template the document was rendered from; lets all
+            documents of one template share a precompiled format.
+        engine: LaTeX engine ("xelatex", "lualatex", any installed engine), or
+            "auto" for the fastest equivalent engine measured for the template.
+        precompiled_format: Start the engine from a cached format file of the
+            static preamble instead of loading all packages on every run
+            (where the engine supports it).
+        max_passes: Upper bound for engine passes. Another pass only runs when
+            the engine asks for it and the auxiliary files actually changed.
+        cache: Optional render cache keyed on the LaTeX source, so unchanged
+            documents never reach the engine.
+        cancel: Event that aborts the build (killing the engine) once set.
+        workspaces: Optional pool of persistent build directories; with a
+            `session`, the build starts from that session's auxiliary files
+            of the previous build with the same template.
+        session: Identifies the client (e.g. a Streamlit session).
+
+    Returns:
+        PDF file content as bytes.
+    """
+    if engine == AUTO:
+        basis = template_text or latex.partition("\\begin{document}")[0]
+        engine = select_engine(
+            basis,
+            lambda name: compile_latex_to_pdf(
+                latex, template_text, name, precompiled_format, max_passes
+            ),
+        )
+    spec = get_engine(engine)
+
+    key = None
+    if cache is not None:
+        key = content_key("engine", [engine.encode(), latex.encode("utf-8")], (engine,))
+        cached = cache.get(key)
+        record_cache("engine", cached is not None)
+        if cached is not None:
+            return cached
+
+    fmt_path = None
+    if precompiled_format and spec.precompiled_format:
+        with stage("format"):
+            latex, fmt_path = prepare_for_format(latex, template_text, spec.executable)
+
+    cmd = [spec.executable, "-interaction=nonstopmode", "-halt-on-error"]
+    env = None
+    if fmt_path is not None:
+        cmd.append(f"-fmt={fmt_path.stem}")
+        env = {**os.environ, "TEXFORMATS": f"{fmt_path.parent}{os.pathsep}"}
+    cmd.append("cv.tex")
+
+    if workspaces is not None and session is not None:
+        basis = template_text or latex.partition("\\begin{document}")[0]
+        build_dir = workspaces.lease(session, basis)
+    else:
+        build_dir = tempfile.TemporaryDirectory()
+
+    with build_dir as tmpdir:
+        tmpdir = Path(tmpdir)
+        (tmpdir / "cv.tex").write_text(latex, encoding="utf-8")
+        (tmpdir / "cv.pdf").unlink(missing_ok=True)
+
+        n = 0
+        while n < max_passes:
+            n += 1
+            aux_before = aux_digest(tmpdir)
+            try:
+                with stage(f"{engine} pass {n}"):
+                    returncode = _run_engine(cmd, tmpdir, env, cancel)
+            except OSError as e:
+                raise RuntimeError(f"{engine} failed: {e}")
+
+            log_path = tmpdir / "cv.log"
+            log = log_path.read_text(errors="replace") if log_path.exists() else ""
+            if returncode != 0:
+                if n == 1 and aux_before:
+                    # Auxiliary files of an earlier document can break the
+                    # first pass; start over from a clean workspace
+                    clear_aux(tmpdir)
+                    continue
+                tail = "\n".join(log.splitlines()[-20:])
+                raise RuntimeError(f"{engine} failed (exit code {returncode}):\n{tail}")
+            if not _RERUN_PATTERN.search(log) or aux_digest(tmpdir) == aux_before:
+                break
+
+        pdf_bytes = (tmpdir / "cv.pdf").read_bytes()
+
+    if cache is not None:
+        cache.put(key, pdf_bytes)
+    return pdf_bytes
+
+
 def convert_md_to_pdf(
     md_text: str,
     template_path: Path,
     lua_filter_paths: list[Path] | Path,
+    cache: RenderCache | None = None,
+    precompiled_format: bool = True,
+    cancel: threading.Event | None = None,
+    pandoc_server: PandocServerPool | None = None,
+    engine: str = "xelatex",
+    workspaces: WorkspacePool | None = None,
+    session: str | None = None,
+    native: bool = False,
+    optimize: bool = False,
 ) -> bytes:
     """
-    Run Pandoc to convert markdown to PDF using the specified template and Lua filters.
+    Convert markdown to PDF in two stages: Pandoc renders the filtered LaTeX
+    (`convert_md_to_latex`), the engine compiles it (`compile_latex_to_pdf`).
 
     Args:
         md_text: Input markdown text.
         template_path: Path to the LaTeX template file.
         lua_filter_paths: List of paths to Lua filter files or a single path.
+        cache: Optional render cache. Both stages are cached on their own, so
+            edits that leave the generated LaTeX unchanged skip the engine.
+        precompiled_format: Compile from a cached format of the template preamble.
+        cancel: Event that aborts the build once set; raises BuildCancelled.
+        pandoc_server: Optional server pool for the Pandoc stage
+            (see `convert_md_to_latex`).
+        engine: LaTeX engine or "auto" (see `compile_latex_to_pdf`).
+        workspaces: Optional persistent build directories, used together with
+            `session` (see `compile_latex_to_pdf`).
+        session: Identifies the client the workspace belongs to.
+        native: Skip Pandoc for documents the in-process renderer covers
+            (see `convert_md_to_latex`).
+        optimize: Linearize and compress the PDF for the web (see
+            `utils.pdf_postprocess.optimize_pdf`).
 
     Returns:
         PDF file content as bytes.
     """
-    if isinstance(lua_filter_paths, Path):
-        lua_filter_paths = [lua_filter_paths]
+    latex = convert_md_to_latex(
+        md_text,
+        template_path,
+        lua_filter_paths,
+        cache=cache,
+        pandoc_server=pandoc_server,
+        native=native,
+    )
+    if cancel is not None and cancel.is_set():
+        raise BuildCancelled("Build cancelled")
+    pdf_bytes = compile_latex_to_pdf(
+        latex,
+        template_text=Path(template_path).read_text(encoding="utf-8"),
+        engine=engine,
+        precompiled_format=precompiled_format,
+        cache=cache,
+        cancel=cancel,
+        workspaces=workspaces,
+        session=session,
+    )
+    return optimize_pdf(pdf_bytes, cache=cache) if optimize else pdf_bytes
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir = Path(tmpdir)
-        pdf_path = tmpdir / "cv.pdf"
 
-        # Convert Markdown to PDF using pypandoc
-        try:
-            pypandoc.convert_text(
-                md_text,
-                to="pdf",
-                format="md",
-                outputfile=str(pdf_path),
-                extra_args=[
-                    f"--template={template_path}",
-                    "--pdf-engine=xelatex",
-                ]
-                + [f"--lua-filter={lf}" for lf in lua_filter_paths],
+def _is_builtin_filter(lua_filter: Path) -> bool:
+    name = Path(lua_filter).name
+    return (
+        name in FUSED_FILTER_FLAGS and Path(lua_filter).resolve() == FILTERS_DIR / name
+    )
+
+
+def fuse_lua_filters(lua_filter_paths: list[Path]) -> tuple[list[Path], list[str]]:
+    """
+    Replace the built-in filters by the fused single-pass filter `cv.lua`, so
+    the document is traversed (and serialized to Lua) once instead of once per
+    filter. Custom filters are kept; fusing only happens when the built-in
+    filters form one consecutive run, which keeps the filter order intact.
+
+    Args:
+        lua_filter_paths: Lua filters in the order they are applied.
+
+    Returns:
+        (filters to pass to Pandoc, extra Pandoc arguments)
+    """
+    builtin = [_is_builtin_filter(lf) for lf in lua_filter_paths]
+    positions = [i for i, is_builtin in enumerate(builtin) if is_builtin]
+    if not positions:
+        return list(lua_filter_paths), []
+    first, last = positions[0], positions[-1]
+    names = [Path(lua_filter_paths[i]).name for i in positions]
+    if last - first + 1 != len(positions) or len(set(names)) != len(names):
+        return list(lua_filter_paths), []
+
+    extra_args = [
+        f"--metadata={flag}={'true' if name in names else 'false'}"
+        for name, flag in FUSED_FILTER_FLAGS.items()
+    ]
+    fused = (
+        list(lua_filter_paths[:first])
+        + [FUSED_FILTER]
+        + list(lua_filter_paths[last + 1 :])
+    )
+    return fused, extra_args
+
+
+def _run_pandoc(
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path],
+    extra_args: list[str],
+    ast: str | None = None,
+    to: str = "latex",
+    variables: dict[str, str] | None = None,
+) -> str:
+    """Markdown (or its JSON AST) → `to` with filters and template in one process."""
+    source, source_format = (md_text, "markdown") if ast is None else (ast, "json")
+    template_args = [f"--template={template_path}"] + [
+        f"--variable={name}={value}" for name, value in (variables or {}).items()
+    ]
+    profile = current_profile()
+    if profile is not None and profile.split_pandoc:
+        # Same conversion via the JSON AST, so each phase can be timed
+        if ast is None:
+            with stage("pandoc parse"):
+                record_subprocess()
+                ast = _convert_text(md_text, to="json", format="markdown")
+        with stage("pandoc lua filters"):
+            record_subprocess()
+            ast = _convert_text(
+                ast,
+                to="json",
+                format="json",
+                extra_args=[f"--lua-filter={lf}" for lf in lua_filter_paths]
+                + extra_args,
             )
-        except RuntimeError as e:
-            raise RuntimeError(f"Pandoc failed: {e}")
+        with stage("pandoc template"):
+            record_subprocess()
+            return _convert_text(ast, to=to, format="json", extra_args=template_args)
+
+    with stage("pandoc"):
+        record_subprocess()
+        return _convert_text(
+            source,
+            to=to,
+            format=source_format,
+            extra_args=template_args
+            + [f"--lua-filter={lf}" for lf in lua_filter_paths]
+            + extra_args,
+        )
+
+
+def _run_native(
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path],
+    extra_args: list[str],
+) -> str | None:
+    """
+    Markdown → LaTeX in process; None when the document or the filters are
+    outside what `render_latex` covers and Pandoc has to run.
+    """
+    if lua_filter_paths not in ([], [FUSED_FILTER]):
+        return None
+    flags = {
+        flag: bool(lua_filter_paths) and f"--metadata={flag}=true" in extra_args
+        for flag in FUSED_FILTER_FLAGS.values()
+    }
+
+    with stage("native latex"):
+        return render_latex(
+            md_text,
+            Path(template_path).read_text(encoding="utf-8"),
+            inline_dates=flags["cv-inline-dates"],
+            columns=flags["cv-columns"],
+        )
+
+
+def _run_pandoc_server(
+    pandoc_server: PandocServerPool,
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path],
+    extra_args: list[str],
+    ast: str | None = None,
+    to: str = "latex",
+    variables: dict[str, str] | None = None,
+) -> str | None:
+    """
+    Markdown → `to` through the server pool, with the built-in filters applied
+    in Python (the server cannot run Lua filters). Returns None when the
+    conversion has to fall back to a Pandoc subprocess: custom filters or
+    arguments, or the server failing.
+    """
+    if lua_filter_paths not in ([], [FUSED_FILTER]):
+        return None
+    flags = {
+        flag: f"--metadata={flag}=true" in extra_args
+        for flag in FUSED_FILTER_FLAGS.values()
+    }
 
-        return pdf_path.read_bytes()
+    with stage("pandoc server"):
+        try:
+            if ast is None:
+                ast = pandoc_server.convert(md_text, "markdown", "json")
+            doc = json.loads(ast)
+            if lua_filter_paths:
+                apply_cv_filters(
+                    doc,
+                    inline_dates=flags["cv-inline-dates"],
+                    columns=flags["cv-columns"],
+                    to=to,
+                )
+            return pandoc_server.convert(
+                json.dumps(doc),
+                "json",
+                to,
+                template=Path(template_path).read_text(encoding="utf-8"),
+                variables=variables,
+            )
+        except PandocServerError:
+            return None
 
 
 def convert_md_to_latex(
     md_text: str,
     template_path: Path,
     lua_filter_paths: list[Path] | Path,
+    cache: RenderCache | None = None,
+    fuse_filters: bool = True,
+    pandoc_server: PandocServerPool | None = None,
+    ast: str | None = None,
+    native: bool = False,
+    source_key: str | None = None,
 ) -> str:
     """
-    Run Pandoc to convert markdown to LaTeX using the specified template and Lua filters.
+    Run Pandoc to convert markdown to LaTeX using the specified template and Lua filters
+    (first build stage).
 
     Args:
         md_text: Input markdown text.
         template_path: Path to the LaTeX template file.
         lua_filter_paths: List of paths to Lua filter files or a single path.
+        cache: Optional render cache; identical inputs skip Pandoc.
+        fuse_filters: Apply the built-in filters in a single pass (see
+            `fuse_lua_filters`); the output is the same either way.
+        pandoc_server: Convert through a pool of persistent Pandoc servers
+            instead of a new process. Falls back to a subprocess when the
+            server is unavailable or custom Lua filters are used.
+        ast: JSON AST of `md_text` from `parse_markdown`; skips parsing.
+        native: Render documents within the supported subset in process
+            (see `utils.native_latex`), with the same output as Pandoc. Other
+            documents, custom filters and `ast` input still go through Pandoc.
+        source_key: Identifies the document in the cache key instead of
+            `md_text`, for documents that only exist as `ast` (e.g. variants).
 
     Returns:
         LaTeX content as a string.
@@ -121,17 +546,346 @@ def convert_md_to_latex(
     if isinstance(lua_filter_paths, Path):
         lua_filter_paths = [lua_filter_paths]
 
+    extra_args = []
+    if fuse_filters:
+        lua_filter_paths, extra_args = fuse_lua_filters(lua_filter_paths)
+
+    key = None
+    if cache is not None:
+        source = md_text if source_key is None else source_key
+        key = render_cache_key(
+            "latex", source, template_path, lua_filter_paths, extra_args
+        )
+        cached = cache.get(key)
+        record_cache("latex", cached is not None)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+    latex_content = None
+    if native and ast is None and fuse_filters:
+        latex_content = _run_native(
+            md_text, template_path, lua_filter_paths, extra_args
+        )
+
+    if latex_content is None and pandoc_server is not None and fuse_filters:
+        latex_content = _run_pandoc_server(
+            pandoc_server, md_text, template_path, lua_filter_paths, extra_args, ast
+        )
+
     try:
-        latex_content = pypandoc.convert_text(
+        if latex_content is None:
+            latex_content = _run_pandoc(
+                md_text, template_path, lua_filter_paths, extra_args, ast
+            )
+    except RuntimeError as e:
+        raise RuntimeError(f"Pandoc failed: {e}")
+
+    if cache is not None:
+        cache.put(key, latex_content.encode("utf-8"))
+    return latex_content
+
+
+def preview_css(template_path: Path) -> Path:
+    """Stylesheet approximating `template_path` in the draft preview."""
+    css = PREVIEW_DIR / f"{Path(template_path).stem}.css"
+    return css if css.exists() else PREVIEW_DIR / "modern.css"
+
+
+def convert_md_to_html(
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path] | Path,
+    cache: RenderCache | None = None,
+    pandoc_server: PandocServerPool | None = None,
+) -> str:
+    """
+    Render a draft preview of the CV as a standalone HTML page, without a
+    LaTeX engine. The built-in filters emit HTML equivalents of their LaTeX
+    (headings with notes, column tables), styled after `template_path`.
+
+    Args:
+        md_text: Input markdown text.
+        template_path: LaTeX template the preview should resemble.
+        lua_filter_paths: List of paths to Lua filter files or a single path.
+        cache: Optional render cache; identical inputs skip Pandoc.
+        pandoc_server: Optional server pool used instead of a Pandoc process.
+
+    Returns:
+        HTML document as a string.
+    """
+    if isinstance(lua_filter_paths, Path):
+        lua_filter_paths = [lua_filter_paths]
+
+    # Only the fused filter has HTML output, so it replaces the built-in
+    # filters wherever they appear
+    names = {Path(lf).name for lf in lua_filter_paths if _is_builtin_filter(lf)}
+    custom = [lf for lf in lua_filter_paths if not _is_builtin_filter(lf)]
+    lua_filter_paths, extra_args = custom, []
+    if names:
+        lua_filter_paths = [FUSED_FILTER] + custom
+        extra_args = [
+            f"--metadata={flag}={'true' if name in names else 'false'}"
+            for name, flag in FUSED_FILTER_FLAGS.items()
+        ]
+    variables = {"preview-css": preview_css(template_path).read_text(encoding="utf-8")}
+
+    key = None
+    if cache is not None:
+        key = render_cache_key(
+            "preview",
+            md_text,
+            PREVIEW_TEMPLATE,
+            lua_filter_paths,
+            extra_args + [variables["preview-css"]],
+        )
+        cached = cache.get(key)
+        record_cache("preview", cached is not None)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+    html = None
+    if pandoc_server is not None:
+        html = _run_pandoc_server(
+            pandoc_server,
             md_text,
-            to="latex",
-            format="md",
-            extra_args=[
-                f"--template={template_path}",
-            ]
-            + [f"--lua-filter={lf}" for lf in lua_filter_paths],
+            PREVIEW_TEMPLATE,
+            lua_filter_paths,
+            extra_args,
+            to="html5",
+            variables=variables,
         )
+
+    try:
+        if html is None:
+            html = _run_pandoc(
+                md_text,
+                PREVIEW_TEMPLATE,
+                lua_filter_paths,
+                extra_args,
+                to="html5",
+                variables=variables,
+            )
     except RuntimeError as e:
         raise RuntimeError(f"Pandoc failed: {e}")
 
-    return latex_content
+    if cache is not None:
+        cache.put(key, html.encode("utf-8"))
+    return html
+
+
+def parse_markdown(
+    md_text: str,
+    cache: RenderCache | None = None,
+    pandoc_server: PandocServerPool | None = None,
+) -> str:
+    """
+    Parse markdown into Pandoc's JSON AST, which every writer can start from.
+
+    Args:
+        md_text: Input markdown text.
+        cache: Optional render cache; the AST is cached by content hash.
+        pandoc_server: Optional server pool used instead of a Pandoc process.
+
+    Returns:
+        The document as Pandoc JSON.
+    """
+    key = None
+    if cache is not None:
+        key = content_key("ast", [md_text.encode("utf-8")], ("pandoc",))
+        cached = cache.get(key)
+        record_cache("ast", cached is not None)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+    ast = None
+    with stage("pandoc parse"):
+        if pandoc_server is not None:
+            try:
+                ast = pandoc_server.convert(md_text, "markdown", "json")
+            except PandocServerError:
+                pass  # fall back to a Pandoc process
+        if ast is None:
+            record_subprocess()
+            try:
+                ast = _convert_text(md_text, to="json", format="markdown")
+            except RuntimeError as e:
+                raise RuntimeError(f"Pandoc failed: {e}")
+
+    if cache is not None:
+        cache.put(key, ast.encode("utf-8"))
+    return ast
+
+
+def convert_ast(
+    ast: str,
+    to: str,
+    cache: RenderCache | None = None,
+    pandoc_server: PandocServerPool | None = None,
+    lua_filter_paths: list[Path] = (),
+) -> bytes:
+    """
+    Render a JSON AST as a standalone document with Pandoc's default template.
+
+    For HTML writers, the built-in filters among `lua_filter_paths` are
+    applied as in the draft preview (headings with notes, column tables),
+    with `EXPORT_HTML_STYLE` added to the page header. Custom filters are
+    not applied, and other writers get the AST unfiltered: the filters emit
+    raw LaTeX, which those writers would drop.
+
+    Args:
+        ast: Document as Pandoc JSON (see `parse_markdown`).
+        to: Pandoc writer, e.g. "html" or "docx".
+        cache: Optional render cache keyed on the AST.
+        pandoc_server: Optional server pool for text formats.
+        lua_filter_paths: Lua filters of the build.
+
+    Returns:
+        The rendered document as bytes.
+    """
+    names = {Path(lf).name for lf in lua_filter_paths if _is_builtin_filter(lf)}
+    if names and "html" in to:
+        flags = {flag: name in names for name, flag in FUSED_FILTER_FLAGS.items()}
+        with stage("cv filters"):
+            doc = apply_cv_filters(
+                json.loads(ast),
+                inline_dates=flags["cv-inline-dates"],
+                columns=flags["cv-columns"],
+                to=to,
+            )
+            raw = {"t": "RawBlock", "c": ["html", EXPORT_HTML_STYLE]}
+            style = {"t": "MetaBlocks", "c": [raw]}
+            includes = doc["meta"].get("header-includes")
+            if includes is None:
+                doc["meta"]["header-includes"] = style
+            elif includes["t"] == "MetaList":
+                includes["c"].append(style)
+            else:
+                doc["meta"]["header-includes"] = {
+                    "t": "MetaList",
+                    "c": [includes, style],
+                }
+            ast = json.dumps(doc)
+
+    key = None
+    if cache is not None:
+        key = content_key(to, [to.encode(), ast.encode("utf-8")], ("pandoc",))
+        cached = cache.get(key)
+        record_cache(to, cached is not None)
+        if cached is not None:
+            return cached
+
+    output = None
+    with stage(f"pandoc {to}"):
+        if pandoc_server is not None and to not in BINARY_FORMATS:
+            try:
+                output = pandoc_server.convert(ast, "json", to, standalone=True)
+                output = output.encode("utf-8")
+            except PandocServerError:
+                pass  # fall back to a Pandoc process
+        if output is None:
+            record_subprocess()
+            try:
+                if to in BINARY_FORMATS:
+                    # Binary writers need an output file
+                    with tempfile.TemporaryDirectory() as tmpdir:
+                        out_path = Path(tmpdir) / f"cv.{to}"
+                        _convert_text(
+                            ast, to=to, format="json", outputfile=str(out_path)
+                        )
+                        output = out_path.read_bytes()
+                else:
+                    output = _convert_text(
+                        ast, to=to, format="json", extra_args=["--standalone"]
+                    ).encode("utf-8")
+            except RuntimeError as e:
+                raise RuntimeError(f"Pandoc failed: {e}")
+
+    if cache is not None:
+        cache.put(key, output)
+    return output
+
+
+def render_exports(
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path] | Path,
+    formats: tuple[str, ...] = EXPORT_FORMATS,
+    cache: RenderCache | None = None,
+    pandoc_server: PandocServerPool | None = None,
+    precompiled_format: bool = True,
+    engine: str = "xelatex",
+    workspaces: WorkspacePool | None = None,
+    session: str | None = None,
+    optimize: bool = False,
+) -> dict[str, bytes]:
+    """
+    Produce several output formats from a single parse of the markdown.
+
+    The markdown is parsed to a JSON AST once; the writers then run
+    concurrently on that AST. "latex" uses the template and Lua filters,
+    "pdf" compiles that LaTeX, other formats use Pandoc's default templates
+    (HTML with the built-in filters' HTML rewrites, see `convert_ast`).
+
+    Args:
+        md_text: Input markdown text.
+        template_path: Path to the LaTeX template file.
+        lua_filter_paths: List of paths to Lua filter files or a single path.
+        formats: Formats to produce, any of EXPORT_FORMATS.
+        cache: Optional render cache shared with the single-format functions.
+        pandoc_server: Optional server pool for the Pandoc steps.
+        precompiled_format: Compile the PDF from a cached preamble format.
+        engine: LaTeX engine for the PDF, or "auto".
+        workspaces: Optional persistent build directories for the PDF.
+        session: Identifies the client the workspace belongs to.
+        optimize: Linearize and compress the PDF for the web.
+
+    Returns:
+        Mapping of format to file content.
+    """
+    if isinstance(lua_filter_paths, Path):
+        lua_filter_paths = [lua_filter_paths]
+
+    ast = parse_markdown(md_text, cache=cache, pandoc_server=pandoc_server)
+
+    def latex() -> bytes:
+        return convert_md_to_latex(
+            md_text,
+            template_path,
+            lua_filter_paths,
+            cache=cache,
+            pandoc_server=pandoc_server,
+            ast=ast,
+        ).encode("utf-8")
+
+    with ThreadPoolExecutor(max_workers=max(len(formats), 1)) as executor:
+
+        def submit(fn, *args):
+            # Copy the context so stages still reach the current build profile
+            return executor.submit(contextvars.copy_context().run, fn, *args)
+
+        latex_future = submit(latex) if {"latex", "pdf"} & set(formats) else None
+
+        def pdf() -> bytes:
+            pdf_bytes = compile_latex_to_pdf(
+                latex_future.result().decode("utf-8"),
+                template_text=Path(template_path).read_text(encoding="utf-8"),
+                precompiled_format=precompiled_format,
+                cache=cache,
+                engine=engine,
+                workspaces=workspaces,
+                session=session,
+            )
+            return optimize_pdf(pdf_bytes, cache=cache) if optimize else pdf_bytes
+
+        futures = {}
+        for fmt in formats:
+            if fmt == "latex":
+                futures[fmt] = latex_future
+            elif fmt == "pdf":
+                futures[fmt] = submit(pdf)
+            else:
+                futures[fmt] = submit(
+                    convert_ast, ast, fmt, cache, pandoc_server, lua_filter_paths
+                )
+
+        return {fmt: future.result() for fmt, future in futures.items()}
@@ -0,0 +1,457 @@
+"""
+In-process Markdown → LaTeX for the CV dialect, without starting Pandoc.
+
+Covers what the bundled templates and examples use: YAML front matter with
+plain string values, H1–H3 headings (with blockquote notes), bullet lists,
+columns separated by horizontal rules, paragraphs with emphasis and strong
+emphasis. The output is byte-identical to Pandoc's LaTeX writer with
+the built-in filters (checked by `python -m benchmarks.bench_native_latex`),
+including Pandoc's smart punctuation and 72-column line wrapping.
+
+Anything outside that subset (links, code, tables, nested lists, raw
+LaTeX, template conditionals, ...) makes `render_latex` return None, so
+the caller falls back to Pandoc.
+"""
+
+import re
+import unicodedata
+
+import yaml
+
+from utils.cv_filters import heading_with_note, make_columns, stringify
+
+WIDTH = 72  # Pandoc's default --columns
+
+# Pandoc's default abbreviations (`pandoc --print-default-data-file
+# abbreviations`); with smart punctuation a space after them is non-breaking
+ABBREVIATIONS = frozenset(
+    """aet. aetat. al. Apr. Aug. bk. Bros. c. Capt. cf. ch. chap. chs. Co.
+    col. Corp. cp. d. Dec. Dr. e.g. ed. eds. esp. f. fasc. Feb. ff. fig. fl.
+    fol. fols. Fr. Gen. Gov. Hon. i.e. ill. Inc. incl. Jan. Jr. Jul. Jun. Ltd.
+    M.A. M.D. Mar. Mr. Mrs. Ms. n. n.b. nn. No. Nov. Oct. p. Ph.D. pp. Pres.
+    Prof. pt. q.v. Rep. Rev. s.v. s.vv. saec. sec. Sen. Sep. Sept. Sgt. Sr.
+    St. univ. viz. vol. vs.""".split()
+)
+
+# Variables Pandoc's LaTeX writer sets itself; templates using them need Pandoc
+WRITER_VARIABLES = frozenset(
+    """documentclass lang babel-lang polyglossia-lang tables graphics
+    numbersections csquotes strikeout verbatim-in-note highlighting-macros
+    title-meta author-meta date-meta pagetitle toc toc-title fontfamily
+    mainfont linestretch geometry header-includes include-before include-after
+    subtitle title author date abstract""".split()
+)
+
+# Markdown syntax the subset does not cover
+_UNSUPPORTED_INLINE = re.compile(
+    r"[\\`\"<>|\[\]$~^]|&#?\w+;|----|(?<![^\W_])@|(?<![^\W_])'|'(?![^\W_])"
+)
+# Underscores that could open or close emphasis; a single one never does
+_EDGE_UNDERSCORE = re.compile(r"(?<![^\W_])_|_(?![^\W_])")
+_EMPHASIS = re.compile(r"(?<![^\s(])(\*\*?)([^\s*](?:[^*]*[^\s*])?)\1(?=$|[\s.,;:!?)])")
+_ABBREVIATION_RUN = re.compile(r"(?:[^\W_]|\.)+$")
+_HEADING = re.compile(r"^(#{1,3}) +(.*?)\s*$")
+_RULE = re.compile(r"^-{3,}\s*$")
+_BLOCK_MARKER = re.compile(r"^(?:[-+*](?:\s|$)|[#>:|=]|\d+[.)](?:\s|$))")
+_RULE_LIKE = re.compile(r"^(?:[-\s]+|=+\s*)$")  # setext underlines, table borders
+_TEMPLATE_DIRECTIVE = re.compile(r"\$\$|\$\{([^}\n]*)\}|\$([^$\n]*)\$|\$")
+_VARIABLE_NAME = re.compile(r"^[A-Za-z][\w-]*$")
+
+_PLAIN_INLINES = ("Str", "Space", "SoftBreak")
+
+_LATEX_ESCAPES = str.maketrans(
+    {
+        "{": "\\{",
+        "}": "\\}",
+        "%": "\\%",
+        "&": "\\&",
+        "#": "\\#",
+        "_": "\\_",
+        "\u2013": "--",
+        "\u2014": "---",
+        "\u2026": "\\ldots{}",
+        "\u2018": "`",
+        "\u2019": "'",
+        "\u201c": "``",
+        "\u201d": "''",
+        "\xa0": "~",
+    }
+)
+
+SPACE = None  # breaking space in a token list; strings are unbreakable text
+
+# Pandoc's LaTeX for a horizontal rule
+RULE = "\\begin{center}\\rule{0.5\\linewidth}{0.5pt}\\end{center}"
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _check(condition: bool) -> None:
+    if not condition:
+        raise _Unsupported
+
+
+def _smart(text: str) -> str:
+    # Pandoc's `smart` extension: dashes, ellipses, apostrophes
+    text = text.replace("---", "\u2014").replace("--", "\u2013")
+    return text.replace("...", "\u2026").replace("'", "\u2019")
+
+
+def _plain_inlines(text: str) -> list[dict]:
+    nodes = []
+    for piece in re.split(r"(\s+)", text.strip()):
+        if not piece:
+            continue
+        if piece.isspace():
+            nodes.append({"t": "SoftBreak" if "\n" in piece else "Space"})
+        else:
+            nodes.append({"t": "Str", "c": _smart(piece)})
+    return nodes
+
+
+def parse_inlines(text: str) -> list[dict]:
+    """
+    Inline markdown → Pandoc JSON inline nodes.
+
+    Raises:
+        _Unsupported: For syntax outside the subset.
+    """
+    _check(not _UNSUPPORTED_INLINE.search(text))
+    _check(len(_EDGE_UNDERSCORE.findall(text)) <= 1)
+    lines = text.split("\n")
+    _check(all(not line.endswith("  ") for line in lines[:-1]))  # hard breaks
+    text = "\n".join(line.strip() for line in lines)
+
+    # Plain text keeps its edge whitespace, which separates it from emphasis
+    segments = []
+    pos = 0
+    for match in _EMPHASIS.finditer(text):
+        segments += [(None, text[pos : match.start()]), match.group(1, 2)]
+        pos = match.end()
+    segments.append((None, text[pos:]))
+
+    nodes = []
+    for delimiter, segment in segments:
+        if delimiter is None:
+            _check("*" not in segment)
+            head = segment[: len(segment) - len(segment.lstrip())]
+            tail = segment[len(segment.rstrip()) :] if segment.strip() else ""
+            if head and nodes:
+                nodes.append({"t": "SoftBreak" if "\n" in head else "Space"})
+            nodes += _plain_inlines(segment)
+            if tail:
+                nodes.append({"t": "SoftBreak" if "\n" in tail else "Space"})
+        else:
+            kind = "Strong" if delimiter == "**" else "Emph"
+            nodes.append({"t": kind, "c": _plain_inlines(segment)})
+    return _abbreviations(nodes)
+
+
+def _abbreviations(nodes: list[dict]) -> list[dict]:
+    # "e.g. x" → Str "e.g.\xa0" directly followed by "x": no line break there
+    out = []
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        if node["t"] == "Str":
+            run = _ABBREVIATION_RUN.search(node["c"])
+            if (
+                run is not None
+                and run.group(0) in ABBREVIATIONS
+                and i + 1 < len(nodes)
+                and nodes[i + 1]["t"] == "Space"
+            ):
+                out.append({"t": "Str", "c": node["c"] + "\xa0"})
+                i += 2
+                continue
+        elif node["t"] in ("Emph", "Strong"):
+            node = {"t": node["t"], "c": _abbreviations(node["c"])}
+        out.append(node)
+        i += 1
+    return out
+
+
+def latex_tokens(nodes: list[dict]) -> list[str | None]:
+    """Inline nodes → LaTeX text pieces and breaking spaces (`SPACE`)."""
+    tokens: list[str | None] = []
+    for node in nodes:
+        t = node["t"]
+        if t == "Str":
+            tokens.append(node["c"].translate(_LATEX_ESCAPES))
+        elif t in ("Space", "SoftBreak"):
+            tokens.append(SPACE)
+        else:
+            command = "\\textbf{" if t == "Strong" else "\\emph{"
+            tokens += [command, *latex_tokens(node["c"]), "}"]
+    return tokens
+
+
+def _width(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    for char in text:
+        _check(
+            not unicodedata.combining(char)
+            and unicodedata.east_asian_width(char) not in ("W", "F")
+        )
+    return len(text)
+
+
+def layout(tokens: list[str | None], indent: int = 0) -> str:
+    """
+    Lay out text like Pandoc's pretty printer: a breaking space becomes a
+    newline when the following unbreakable text would pass column WIDTH.
+    Strings may contain hard newlines; `indent` prefixes every line.
+    """
+    items: list[str | None] = []
+    for token in tokens:
+        if token is SPACE:
+            items.append(SPACE)
+            continue
+        for k, part in enumerate(token.split("\n")):
+            if k:
+                items.append("\n")
+            if part:
+                items.append(part)
+
+    out = []
+    col = 0
+    for i, item in enumerate(items):
+        if item == "\n":
+            out.append("\n")
+            col = 0
+        elif item is SPACE:
+            if i > 0 and items[i - 1] is SPACE:
+                continue
+            following = 0
+            for j in range(i + 1, len(items)):
+                if items[j] is SPACE or items[j] == "\n":
+                    break
+                following += _width(items[j])
+            if col + 1 + following > WIDTH:
+                out.append("\n")
+                col = 0
+            elif col > 0:
+                out.append(" ")
+                col += 1
+        else:
+            if col == 0 and indent:
+                out.append(" " * indent)
+                col = indent
+            out.append(item)
+            col += _width(item)
+    return "".join(out)
+
+
+def _identifier(nodes: list[dict], used: set[str]) -> str:
+    # Pandoc's auto_identifiers
+    text = "".join(
+        c for c in stringify(nodes).lower() if c.isalnum() or c in "_-." or c.isspace()
+    )
+    ident = "-".join(text.split())
+    while ident and not ident[0].isalpha():
+        ident = ident[1:]
+    ident = ident or "section"
+    _check(ident.isascii())
+    unique, n = ident, 0
+    while unique in used:
+        n += 1
+        unique = f"{ident}-{n}"
+    used.add(unique)
+    return unique
+
+
+def _split_front_matter(md_text: str) -> tuple[dict, list[str]]:
+    lines = md_text.split("\n")
+    if not lines or lines[0].rstrip() != "---":
+        return {}, lines
+    _check(len(lines) > 1 and lines[1].strip() != "")
+    for end in range(1, len(lines)):
+        if lines[end].rstrip() in ("---", "..."):
+            break
+    else:
+        raise _Unsupported
+    try:
+        metadata = yaml.safe_load("\n".join(lines[1:end]))
+    except yaml.YAMLError:
+        raise _Unsupported
+    _check(isinstance(metadata, dict))
+    return metadata, lines[end + 1 :]
+
+
+def _blocks(lines: list[str]) -> list[tuple[str, object]]:
+    """Group lines into (kind, data) blocks separated by blank lines."""
+    blocks: list[tuple[str, object]] = []
+    current: list[str] = []
+    for line in lines + [""]:
+        if line.strip():
+            _check(not line[0].isspace() and "\t" not in line)
+            current.append(line)
+            continue
+        if not current:
+            continue
+        first = current[0]
+        if first.startswith("#"):
+            heading = _HEADING.match(first)
+            _check(len(current) == 1 and heading is not None)
+            text = heading.group(2)
+            _check(text != "" and not text.endswith(("#", "}")))
+            blocks.append(("heading", (len(heading.group(1)), parse_inlines(text))))
+        elif _RULE.match(first):
+            _check(len(current) == 1)
+            blocks.append(("rule", None))
+        elif first.startswith(">"):
+            content = []
+            for quoted in current:
+                _check(quoted.startswith(">"))
+                quoted = quoted[1:].removeprefix(" ")
+                _check(quoted.strip() != "" and _text_line(quoted))
+                content.append(quoted)
+            blocks.append(("quote", parse_inlines("\n".join(content))))
+        elif first.startswith("- "):
+            items: list[list[str]] = []
+            for item_line in current:
+                _check(not _RULE_LIKE.match(item_line))
+                if item_line.startswith("- "):
+                    items.append([item_line[2:].lstrip()])
+                else:
+                    _check(_text_line(item_line))
+                    items[-1].append(item_line)
+            _check(all(item[0] and _text_line(item[0]) for item in items))
+            inlines = [parse_inlines("\n".join(i)) for i in items]
+            if blocks and blocks[-1][0] == "list":
+                # Items separated by a blank line: one loose list
+                blocks[-1] = ("list", (blocks[-1][1][0] + inlines, False))
+            else:
+                blocks.append(("list", (inlines, True)))
+        else:
+            for text_line in current:
+                _check(_text_line(text_line))
+            blocks.append(("para", parse_inlines("\n".join(current))))
+        current = []
+    return blocks
+
+
+def _text_line(line: str) -> bool:
+    # A line that continues a paragraph rather than starting another block
+    return not (
+        line[:1].isspace() or _BLOCK_MARKER.match(line) or _RULE_LIKE.match(line)
+    )
+
+
+def _itemize(items: list[list[dict]], tight: bool) -> str:
+    parts = ["\\begin{itemize}\n\\tightlist" if tight else "\\begin{itemize}"]
+    for item in items:
+        parts.append("\\item\n" + layout(latex_tokens(item), indent=2))
+    parts.append("\\end{itemize}")
+    return "\n".join(parts)
+
+
+def render_body(
+    blocks: list[tuple[str, object]], inline_dates: bool, columns: bool
+) -> str:
+    """LaTeX body of the blocks, with the built-in filters' rewrites applied."""
+    out = []
+    used: set[str] = set()
+    i = 0
+    n = len(blocks)
+    while i < n:
+        kind, data = blocks[i]
+        if kind == "heading":
+            level, inlines = data
+            ident = _identifier(inlines, used)
+            if inline_dates and level in (2, 3):
+                note = ""
+                if i + 1 < n and blocks[i + 1][0] == "quote":
+                    note = stringify(blocks[i + 1][1])
+                    i += 1
+                out.append(heading_with_note(level, stringify(inlines), note)["c"][1])
+            else:
+                # Pandoc adds a \texorpdfstring for formatted headings
+                _check(all(node["t"] in _PLAIN_INLINES for node in inlines))
+                command = ("section", "subsection", "subsubsection")[level - 1]
+                tokens = latex_tokens(inlines)
+                out.append(layout([f"\\{command}{{", *tokens, f"}}\\label{{{ident}}}"]))
+            i += 1
+        elif kind == "list" and columns and i + 1 < n and blocks[i + 1][0] == "rule":
+            cols = []
+            while True:
+                cols.append([stringify(item) for item in blocks[i][1][0]])
+                i += 1
+                if not (
+                    i + 1 < n and blocks[i][0] == "rule" and blocks[i + 1][0] == "list"
+                ):
+                    break
+                i += 1  # skip the rule
+            out.append(make_columns(cols)["c"][1].rstrip("\n"))
+        elif kind == "list":
+            out.append(_itemize(*data))
+            i += 1
+        elif kind == "para":
+            out.append(layout(latex_tokens(data)))
+            i += 1
+        elif kind == "quote":
+            quote = layout(latex_tokens(data))
+            out.append(f"\\begin{{quote}}\n{quote}\n\\end{{quote}}")
+            i += 1
+        else:
+            out.append(RULE)
+            i += 1
+    return "\n\n".join(out)
+
+
+def _template_tokens(template_text: str, metadata: dict, body: str) -> list[str | None]:
+    tokens: list[str | None] = []
+    pos = 0
+    for match in _TEMPLATE_DIRECTIVE.finditer(template_text):
+        tokens.append(template_text[pos : match.start()])
+        pos = match.end()
+        if match.group(0) == "$$":
+            tokens.append("$")
+            continue
+        name = match.group(1) if match.group(1) is not None else match.group(2)
+        _check(name is not None and _VARIABLE_NAME.match(name) is not None)
+        if name == "body":
+            tokens.append(body)
+            continue
+        value = metadata.get(name)
+        if value is None:
+            _check(name not in WRITER_VARIABLES and name not in metadata)
+            continue
+        _check(isinstance(value, str) and "\n" not in value and value.strip())
+        _check(not _BLOCK_MARKER.match(value.strip()))
+        tokens += latex_tokens(parse_inlines(value))
+    tokens.append(template_text[pos:])
+    return tokens
+
+
+def render_latex(
+    md_text: str,
+    template_text: str,
+    inline_dates: bool = True,
+    columns: bool = True,
+) -> str | None:
+    """
+    Render a standalone LaTeX document the way Pandoc would with the
+    template and the built-in filters.
+
+    Args:
+        md_text: Input markdown (preprocessed).
+        template_text: LaTeX template content.
+        inline_dates: Apply the inline_dates.lua rewrite.
+        columns: Apply the columns.lua rewrite.
+
+    Returns:
+        The LaTeX document, or None if the input is outside the supported
+        subset and has to go through Pandoc.
+    """
+    try:
+        metadata, lines = _split_front_matter(md_text)
+        body = render_body(_blocks(lines), inline_dates, columns)
+        latex = layout(_template_tokens(template_text, metadata, body))
+    except _Unsupported:
+        return None
+    # Pandoc drops one of several trailing newlines
+    return latex[:-1] if latex.endswith("\n\n") else latex
@@ -0,0 +1,206 @@
+"""Pool of long-lived `pandoc server` processes (Pandoc ≥ 3.0)."""
+
+import atexit
+import http.client
+import json
+import math
+import queue
+import socket
+import subprocess
+import threading
+import time
+
+from utils.profiling import record_subprocess
+
+
+class PandocServerError(RuntimeError):
+    """Raised when a conversion cannot be done by the server."""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Worker:
+    """One server process and a keep-alive connection to it."""
+
+    def __init__(self, executable: str, timeout: float, startup_timeout: float):
+        self.executable = executable
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.port = None
+        self.proc: subprocess.Popen | None = None
+        self.conn: http.client.HTTPConnection | None = None
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self) -> None:
+        self.stop()
+        self.port = _free_port()
+        record_subprocess()
+        self.proc = subprocess.Popen(
+            [
+                self.executable,
+                "server",
+                f"--port={self.port}",
+                # Server-side limit; the client gives up a second later
+                f"--timeout={math.ceil(self.timeout)}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise PandocServerError(
+                    f"'{self.executable} server' exited "
+                    f"with code {self.proc.returncode}"
+                )
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.1).close()
+                return
+            except OSError:
+                time.sleep(0.02)
+        self.stop()
+        raise PandocServerError(f"'{self.executable} server' did not start in time")
+
+    def request(self, payload: dict) -> str:
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(
+                "127.0.0.1", self.port, timeout=self.timeout + 1
+            )
+        self.conn.request(
+            "POST",
+            "/",
+            body=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+        )
+        response = self.conn.getresponse()
+        body = response.read().decode("utf-8", errors="replace")
+        if response.status != 200:
+            raise PandocServerError(f"HTTP {response.status}: {body.strip()}")
+        result = json.loads(body)
+        if "error" in result:
+            raise PandocServerError(result["error"])
+        return result["output"]
+
+    def stop(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+
+class PandocServerPool:
+    """
+    Convert documents through a pool of persistent `pandoc server` processes
+    instead of spawning Pandoc for every conversion.
+
+    Servers are started lazily and restarted when they crash or drop the
+    connection. If the server cannot be started at all (Pandoc too old or not
+    installed) the pool disables itself, and every call raises
+    PandocServerError so callers can fall back to the subprocess path.
+
+    Args:
+        size: Number of server processes, i.e. concurrent conversions.
+        executable: Pandoc executable.
+        timeout: Per-request timeout in seconds.
+        startup_timeout: Time a new server gets to accept connections.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        executable: str = "pandoc",
+        timeout: float = 10.0,
+        startup_timeout: float = 5.0,
+    ):
+        self.timeout = timeout
+        self.disabled_reason: str | None = None
+        self._workers = [
+            _Worker(executable, timeout, startup_timeout) for _ in range(size)
+        ]
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    @property
+    def available(self) -> bool:
+        return self.disabled_reason is None
+
+    def convert(
+        self,
+        text: str,
+        from_format: str,
+        to_format: str,
+        template: str | None = None,
+        standalone: bool = False,
+        variables: dict[str, str] | None = None,
+    ) -> str:
+        """
+        Convert `text` on one of the servers.
+
+        Args:
+            text: Input document.
+            from_format: Pandoc reader, e.g. "markdown" or "json".
+            to_format: Pandoc writer, e.g. "json" or "latex".
+            template: Template content (not a path); renders a standalone document.
+            standalone: Render a standalone document with the default template.
+            variables: Template variables, like `--variable` on the command line.
+
+        Returns:
+            The converted document.
+        """
+        if self.disabled_reason is not None:
+            raise PandocServerError(self.disabled_reason)
+
+        payload = {"text": text, "from": from_format, "to": to_format}
+        if template is not None:
+            payload.update(standalone=True, template=template)
+        elif standalone:
+            payload["standalone"] = True
+        if variables:
+            payload["variables"] = variables
+
+        worker = self._idle.get()
+        try:
+            # A second attempt on a fresh process covers crashed servers and
+            # keep-alive connections closed by the server
+            for attempt in (1, 2):
+                try:
+                    if not worker.alive():
+                        self._start(worker)
+                    return worker.request(payload)
+                except socket.timeout:
+                    worker.stop()  # abandon the stuck conversion
+                    raise PandocServerError(
+                        f"Pandoc server timed out after {self.timeout:g}s"
+                    )
+                except (OSError, http.client.HTTPException) as e:
+                    worker.stop()
+                    if attempt == 2:
+                        raise PandocServerError(f"Pandoc server failed: {e}")
+        finally:
+            self._idle.put(worker)
+
+    def _start(self, worker: _Worker) -> None:
+        try:
+            worker.start()
+        except (OSError, PandocServerError) as e:
+            with self._lock:
+                self.disabled_reason = f"Pandoc server unavailable: {e}"
+            raise PandocServerError(self.disabled_reason)
+
+    def close(self) -> None:
+        """Stop all server processes."""
+        for worker in self._workers:
+            worker.stop()
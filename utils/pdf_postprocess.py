@@ -0,0 +1,142 @@
+"""
+Post-processing of finished PDFs: web-optimized output and page previews.
+
+Both rely on optional tools, qpdf and poppler's pdftoppm. Without them the
+PDF is served exactly as the engine wrote it and no previews are made.
+"""
+
+import hashlib
+import subprocess
+import tempfile
+from pathlib import Path
+
+from utils.profiling import record_subprocess, stage
+from utils.render_cache import RenderCache, content_key
+from utils.tools import tool_path
+
+# Linearized ("fast web view": the first page displays before the rest
+# arrives), objects packed into compressed object streams
+QPDF_ARGS = [
+    "--linearize",
+    "--object-streams=generate",
+    "--compress-streams=y",
+    "--recompress-flate",
+    "--compression-level=9",
+]
+
+PREVIEW_RESOLUTION = 60  # dpi; an A4 page becomes about 500 x 700 pixels
+
+
+def _run(cmd: list[str], cwd: Path) -> int | None:
+    """Exit code of `cmd`, or None if it could not be run."""
+    record_subprocess()
+    try:
+        return subprocess.run(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=120,
+        ).returncode
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def is_linearized(pdf_bytes: bytes) -> bool:
+    """Whether the PDF starts with a linearization dictionary."""
+    return b"/Linearized" in bytes(pdf_bytes[:1024])
+
+
+def optimize_pdf(pdf_bytes: bytes, cache: RenderCache | None = None) -> bytes:
+    """
+    Linearize the PDF and pack its objects into compressed object streams.
+
+    Args:
+        pdf_bytes: PDF as written by the engine.
+        cache: Optional render cache; each distinct PDF is optimized once.
+
+    Returns:
+        The optimized PDF, or `pdf_bytes` unchanged if qpdf is not installed
+        or fails on the document.
+    """
+    qpdf = tool_path("qpdf")
+    if qpdf is None:
+        return pdf_bytes
+
+    key = None
+    if cache is not None:
+        parts = [pdf_bytes, *(arg.encode() for arg in QPDF_ARGS)]
+        key = content_key("optimized-pdf", parts, ("qpdf",))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    with stage("optimize pdf"), tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        (tmpdir / "in.pdf").write_bytes(pdf_bytes)
+        # Exit code 3: succeeded with warnings
+        if _run([qpdf, *QPDF_ARGS, "in.pdf", "out.pdf"], tmpdir) not in (0, 3):
+            return pdf_bytes
+        optimized = (tmpdir / "out.pdf").read_bytes()
+
+    if cache is not None:
+        cache.put(key, optimized)
+    return optimized
+
+
+def page_previews(
+    pdf_bytes: bytes,
+    cache: RenderCache | None = None,
+    resolution: int = PREVIEW_RESOLUTION,
+) -> list[bytes]:
+    """
+    One PNG image per page, small enough to show before the PDF itself.
+
+    Images are cached under the hash of the PDF, so a rerun showing the same
+    PDF reads them from the cache without starting pdftoppm. So is a failure
+    to rasterize it, as an empty list.
+
+    Args:
+        pdf_bytes: The PDF (bytes or a memoryview from the artifact store).
+        cache: Optional render cache for the images.
+        resolution: Rendering resolution in dpi.
+
+    Returns:
+        PNG files in page order; empty if pdftoppm is not installed or fails.
+    """
+    digest = hashlib.sha256(pdf_bytes).digest()
+
+    def key(part: str) -> str:
+        parts = [digest, str(resolution).encode(), part.encode()]
+        return content_key("page-preview", parts)
+
+    if cache is not None:
+        count = cache.get(key("pages"))
+        if count is not None:
+            images = [cache.get(key(str(n))) for n in range(int(count))]
+            if all(image is not None for image in images):
+                return images
+
+    pdftoppm = tool_path("pdftoppm")
+    if pdftoppm is None:
+        return []
+    with stage("page previews"), tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        (tmpdir / "doc.pdf").write_bytes(pdf_bytes)
+        cmd = [pdftoppm, "-png", "-r", str(resolution), "doc.pdf", "page"]
+        returncode = _run(cmd, tmpdir)
+        if returncode is None:  # timed out or could not start; try again later
+            return []
+        images = []
+        if returncode == 0:
+            # page-1.png, or page-01.png etc. for longer documents
+            files = sorted(tmpdir.glob("page-*.png"), key=lambda p: int(p.stem[5:]))
+            images = [f.read_bytes() for f in files]
+
+    if cache is not None:
+        # A PDF pdftoppm rejects is cached with zero pages, so reruns showing
+        # it do not start pdftoppm again
+        for n, image in enumerate(images):
+            cache.put(key(str(n)), image)
+        cache.put(key("pages"), str(len(images)).encode())
+    return images
@@ -0,0 +1,75 @@
+"""Inspect PDF output: page count and extracted text."""
+
+import io
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # fall back to poppler-utils or a byte scan
+    PdfReader = None
+
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?!s)")
+_OBJECT_STREAM = re.compile(rb"/Type\s*/ObjStm")
+
+
+def _poppler(tool: str, pdf_bytes: bytes, args: list[str]) -> str | None:
+    """Run a poppler-utils tool on `pdf_bytes`; return stdout or None."""
+    if shutil.which(tool) is None:
+        return None
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "doc.pdf"
+        path.write_bytes(pdf_bytes)
+        try:
+            result = subprocess.run(
+                [tool, *args, str(path), *(["-"] if tool == "pdftotext" else [])],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=60,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+    return result.stdout
+
+
+def pdf_page_count(pdf_bytes: bytes) -> int | None:
+    """
+    Number of pages, via pypdf, else pdfinfo, else counting page objects.
+
+    Returns:
+        The page count, or None if neither pypdf nor pdfinfo is available and
+        the PDF keeps objects in compressed object streams (as xdvipdfmx and
+        qpdf write it), where page objects cannot be counted in the bytes.
+    """
+    if PdfReader is not None:
+        return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    info = _poppler("pdfinfo", pdf_bytes, [])
+    if info is not None:
+        match = re.search(r"^Pages:\s+(\d+)", info, re.MULTILINE)
+        if match:
+            return int(match.group(1))
+    if _OBJECT_STREAM.search(pdf_bytes):
+        return None
+    return len(_PAGE_OBJECT.findall(pdf_bytes)) or None
+
+
+def pdf_text(pdf_bytes: bytes) -> str | None:
+    """
+    Text content with whitespace collapsed, via pypdf or pdftotext.
+
+    Returns:
+        The text, or None if no extractor is available.
+    """
+    text = None
+    if PdfReader is not None:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    else:
+        text = _poppler("pdftotext", pdf_bytes, ["-q"])
+    if text is None:
+        return None
+    return " ".join(text.split())
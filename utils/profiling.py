@@ -0,0 +1,183 @@
+"""
+Stage-level instrumentation for builds.
+
+Code paths in the build pipeline wrap their work in `stage(...)` and report
+cache lookups and spawned processes. All of this is a no-op unless a build is
+being recorded with `profile_build()`:
+
+    with profile_build(on_stage=print) as profile:
+        convert_md_to_pdf(...)
+    profile.to_json()
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_kb() -> tuple[int, int]:
+    """Peak resident set size of this process and of its largest child, in KiB."""
+    if resource is None:
+        return 0, 0
+    scale = 1024 if os.uname().sysname == "Darwin" else 1  # macOS reports bytes
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    return own, children
+
+
+@dataclass
+class StageRecord:
+    name: str
+    wall: float
+    cpu: float  # this process
+    children_cpu: float  # subprocesses that finished during the stage
+    subprocesses: int
+
+
+@dataclass
+class BuildProfile:
+    """
+    Measurements of one build.
+
+    Note that process CPU time and child counters are process-wide, so
+    builds running concurrently in other threads are attributed as well.
+    """
+
+    stages: list[StageRecord] = field(default_factory=list)
+    cache: list[dict] = field(default_factory=list)
+    subprocesses: int = 0
+    wall: float = 0.0
+    peak_rss_kb: int = 0
+    peak_child_rss_kb: int = 0
+    split_pandoc: bool = False
+    on_stage: Callable[[StageRecord], None] | None = field(default=None, repr=False)
+
+    def as_dict(self) -> dict:
+        return {
+            "stages": [asdict(s) for s in self.stages],
+            "cache": list(self.cache),
+            "subprocesses": self.subprocesses,
+            "wall": self.wall,
+            "peak_rss_kb": self.peak_rss_kb,
+            "peak_child_rss_kb": self.peak_child_rss_kb,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
+
+    def report(self) -> str:
+        """Human-readable table of the recorded stages."""
+        lines = [f"{'stage':<22}{'wall':>10}{'cpu':>10}{'child cpu':>11}{'procs':>7}"]
+        for s in self.stages:
+            lines.append(
+                f"{s.name:<22}{s.wall * 1000:>8.1f}ms{s.cpu * 1000:>8.1f}ms"
+                f"{s.children_cpu * 1000:>9.1f}ms{s.subprocesses:>7}"
+            )
+        lines.append(
+            f"{'total':<22}{self.wall * 1000:>8.1f}ms{'':>29}{self.subprocesses:>7}"
+        )
+        if self.cache:
+            outcomes = ", ".join(f"{c['kind']}: {c['outcome']}" for c in self.cache)
+            lines.append(f"cache: {outcomes}")
+        lines.append(
+            f"peak RSS: {self.peak_rss_kb / 1024:.1f} MiB (python), "
+            f"{self.peak_child_rss_kb / 1024:.1f} MiB (largest subprocess)"
+        )
+        return "\n".join(lines)
+
+
+_current: ContextVar[BuildProfile | None] = ContextVar("build_profile", default=None)
+_lock = threading.Lock()
+
+
+def current_profile() -> BuildProfile | None:
+    return _current.get()
+
+
+@contextmanager
+def profile_build(
+    on_stage: Callable[[StageRecord], None] | None = None,
+    jsonl_path: Path | None = None,
+    split_pandoc: bool = False,
+) -> Iterator[BuildProfile]:
+    """
+    Record the build(s) executed inside the `with` block.
+
+    Args:
+        on_stage: Callback invoked with each StageRecord as it completes.
+        jsonl_path: If given, the finished profile is appended as one JSON line.
+        split_pandoc: Run Pandoc as separate parse, filter and write steps so
+            each shows up as its own stage (costs two extra processes).
+
+    Yields:
+        The BuildProfile being filled in.
+    """
+    profile = BuildProfile(split_pandoc=split_pandoc, on_stage=on_stage)
+    token = _current.set(profile)
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        profile.wall = time.perf_counter() - start
+        profile.peak_rss_kb, profile.peak_child_rss_kb = _peak_rss_kb()
+        if jsonl_path is not None:
+            with _lock, open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write(profile.to_json() + "\n")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed code as stage `name` of the current build, if recorded."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+
+    procs_before = profile.subprocesses
+    wall, cpu, child = time.perf_counter(), time.process_time(), _children_cpu()
+    try:
+        yield
+    finally:
+        record = StageRecord(
+            name=name,
+            wall=time.perf_counter() - wall,
+            cpu=time.process_time() - cpu,
+            children_cpu=_children_cpu() - child,
+            subprocesses=profile.subprocesses - procs_before,
+        )
+        profile.stages.append(record)
+        if profile.on_stage is not None:
+            profile.on_stage(record)
+
+
+def record_cache(kind: str, hit: bool) -> None:
+    """Note the outcome of a cache lookup in the current build."""
+    profile = _current.get()
+    if profile is not None:
+        profile.cache.append({"kind": kind, "outcome": "hit" if hit else "miss"})
+
+
+def record_subprocess(count: int = 1) -> None:
+    """Note that the current build started `count` processes."""
+    profile = _current.get()
+    if profile is not None:
+        profile.subprocesses += count
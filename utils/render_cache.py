@@ -0,0 +1,268 @@
+"""Content-addressed cache for rendered build artifacts (PDF, LaTeX)."""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+from utils.tools import tool_version
+
+STALE_TMP_AGE = 3600  # seconds; no write takes this long
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how a cache has been used."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hits": self.hits}
+
+
+class CacheBackend(Protocol):
+    """Storage tier behind the in-memory LRU (e.g. a local or shared directory)."""
+
+    def get(self, key: str) -> bytes | None:
+        """Return the stored bytes for `key` or None if absent/expired."""
+
+    def put(self, key: str, data: bytes) -> int:
+        """Store `data` under `key` and return the number of evicted entries."""
+
+
+class DirectoryBackend:
+    """
+    On-disk cache tier bounded by total size and entry age.
+
+    Entries are written atomically (temp file + rename), so several processes
+    or nodes can share one directory, e.g. on a network mount. Writes keep a
+    running size total; the directory is only scanned when that total exceeds
+    `max_bytes` or `prune_interval` seconds have passed since the last scan
+    (which also picks up entries written by other processes).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600,
+        prune_interval: float = 60.0,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._total: int | None = None  # unknown until the first scan
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        """File an entry is (or would be) stored in."""
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        path = self.path(key)
+        try:
+            st = path.stat()
+            if time.time() - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                with self._lock:
+                    if self._total is not None:
+                        self._total -= st.st_size
+                return None
+            data = path.read_bytes()
+            os.utime(path)  # mtime doubles as "last used" for LRU pruning
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> int:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            if self._total is not None:
+                self._total += len(data) - replaced
+            due = (
+                self._total is None
+                or self._total > self.max_bytes
+                or time.monotonic() - self._last_prune > self.prune_interval
+            )
+        return self.prune() if due else 0
+
+    def prune(self) -> int:
+        """
+        Drop expired entries, then the least recently used ones above `max_bytes`.
+
+        Temp files older than `STALE_TMP_AGE` are left over from writers that
+        crashed before renaming them and are removed as well.
+        """
+        now = time.time()
+        entries = []
+        evicted = 0
+        for path in self.root.glob("??/*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.startswith(".tmp-"):
+                if now - st.st_mtime > STALE_TMP_AGE:
+                    path.unlink(missing_ok=True)
+                continue
+            if now - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                evicted += 1
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._total = total
+            self._last_prune = time.monotonic()
+        return evicted
+
+
+class RenderCache:
+    """
+    Two-tier cache: an in-memory LRU in front of an optional persistent backend.
+
+    Args:
+        backend: Persistent tier (e.g. DirectoryBackend) or None for memory only.
+        memory_max_bytes: Size budget of the in-memory LRU tier.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.backend = backend
+        self.memory_max_bytes = memory_max_bytes
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return data
+
+        data = self.backend.get(key) if self.backend is not None else None
+        with self._lock:
+            if data is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        evicted = self.backend.put(key, data) if self.backend is not None else 0
+        with self._lock:
+            self.stats.stores += 1
+            self.stats.evictions += evicted
+            self._remember(key, data)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        # Caller holds the lock
+        if len(data) > self.memory_max_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_bytes -= len(dropped)
+            self.stats.evictions += 1
+
+
+def content_key(kind: str, parts: list[bytes], tools: tuple[str, ...] = ()) -> str:
+    """
+    Hash a build input into a cache key.
+
+    Args:
+        kind: Build stage or output kind, keeps namespaces apart.
+        parts: Input contents, hashed in order.
+        tools: Executables whose versions influence the output.
+
+    Returns:
+        Hex digest usable as cache key.
+    """
+    h = hashlib.sha256()
+
+    def feed(part: bytes) -> None:
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+
+    feed(kind.encode())
+    for tool in tools:
+        feed(tool_version(tool).encode())
+    for part in parts:
+        feed(part)
+    return h.hexdigest()
+
+
+def render_cache_key(
+    kind: str,
+    md_text: str,
+    template_path: Path,
+    lua_filter_paths: list[Path],
+    extra_args: list[str] = (),
+    tools: tuple[str, ...] = ("pandoc",),
+) -> str:
+    """
+    Build a content hash identifying one Markdown conversion.
+
+    Args:
+        kind: Output kind (e.g. "latex"), keeps namespaces apart.
+        md_text: The (preprocessed) markdown that is fed to Pandoc.
+        template_path: Path to the template file.
+        lua_filter_paths: Lua filters in the order they are applied.
+        extra_args: Additional Pandoc arguments influencing the output.
+        tools: Executables whose versions influence the output.
+
+    Returns:
+        Hex digest usable as cache key.
+    """
+    parts = [md_text.encode("utf-8"), Path(template_path).read_bytes()]
+    parts += [Path(lf).read_bytes() for lf in lua_filter_paths]
+    parts += [arg.encode() for arg in extra_args]
+    return content_key(kind, parts, tools)
@@ -0,0 +1,164 @@
+"""Debounced background render queue for live preview."""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+from utils.artifact_store import ArtifactStore
+from utils.markdown_processor import BuildCancelled
+
+# A render job receives a cancel event and returns the PDF bytes
+RenderJob = Callable[[threading.Event], bytes]
+
+
+@dataclass
+class RenderResult:
+    seq: int
+    pdf_bytes: bytes | None  # None when kept in the queue's artifact store
+    error: str | None
+    build_time: float
+    pdf_key: str | None = None
+
+
+@dataclass
+class _Slot:
+    seq: int = 0
+    key: Hashable = None
+    timer: threading.Timer | None = None
+    cancel: threading.Event | None = None
+    running: bool = False
+    result: RenderResult | None = None
+
+
+class RenderQueue:
+    """
+    Run renders on a background worker pool, one slot per client (session).
+
+    Submissions to a slot are debounced: a render only starts once no newer
+    submission arrived for `debounce` seconds. A newer submission cancels the
+    render still in flight for the same slot, killing its engine process, so
+    stale builds never pile up.
+
+    Args:
+        max_workers: Number of renders running at the same time.
+        debounce: Quiet period in seconds before a render starts.
+        max_slots: Idle slots kept before the least recently used are dropped.
+        artifacts: Store for the finished PDFs, so results only hold a key.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        debounce: float = 0.6,
+        max_slots: int = 512,
+        artifacts: ArtifactStore | None = None,
+    ):
+        self.debounce = debounce
+        self.max_slots = max_slots
+        self.artifacts = artifacts
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="render"
+        )
+        self._slots: OrderedDict[str, _Slot] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, slot_id: str, key: Hashable, job: RenderJob) -> int:
+        """
+        Schedule `job` for `slot_id`, superseding any older submission.
+
+        Args:
+            slot_id: Client identifier, e.g. the Streamlit session.
+            key: Identifies the job's inputs; resubmitting the latest key is a no-op.
+            job: Callable doing the actual build.
+
+        Returns:
+            Sequence number of the submission the slot will eventually show.
+        """
+        with self._lock:
+            slot = self._slots.setdefault(slot_id, _Slot())
+            self._slots.move_to_end(slot_id)
+            if slot.key == key:
+                return slot.seq
+
+            slot.seq += 1
+            slot.key = key
+            if slot.timer is not None:
+                slot.timer.cancel()
+            if slot.cancel is not None:
+                slot.cancel.set()  # kill the outdated render
+
+            timer = threading.Timer(
+                self.debounce, self._start, (slot_id, slot.seq, job)
+            )
+            timer.daemon = True
+            slot.timer = timer
+            self._drop_idle_slots()
+        timer.start()
+        return slot.seq
+
+    def latest(self, slot_id: str) -> RenderResult | None:
+        """Return the newest finished result for `slot_id`."""
+        with self._lock:
+            slot = self._slots.get(slot_id)
+            return slot.result if slot else None
+
+    def pending(self, slot_id: str) -> bool:
+        """Whether a newer render than `latest()` is waiting or running."""
+        with self._lock:
+            slot = self._slots.get(slot_id)
+            if slot is None:
+                return False
+            return slot.result is None or slot.result.seq != slot.seq
+
+    def _start(self, slot_id: str, seq: int, job: RenderJob) -> None:
+        with self._lock:
+            slot = self._slots.get(slot_id)
+            if slot is None or slot.seq != seq:
+                return
+            cancel = threading.Event()
+            slot.cancel = cancel
+            slot.timer = None
+            slot.running = True
+        self._executor.submit(self._run, slot_id, seq, job, cancel)
+
+    def _run(self, slot_id: str, seq: int, job: RenderJob, cancel: threading.Event):
+        start = time.perf_counter()
+        pdf_bytes, pdf_key, error = None, None, None
+        try:
+            pdf_bytes = job(cancel)
+            if self.artifacts is not None:
+                pdf_key, pdf_bytes = self.artifacts.put(pdf_bytes), None
+        except BuildCancelled:
+            with self._lock:
+                slot = self._slots.get(slot_id)
+                if slot is not None and slot.cancel is cancel:
+                    slot.running = False
+            return
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            slot = self._slots.get(slot_id)
+            if slot is None or slot.seq != seq:
+                return  # superseded while finishing
+            slot.result = RenderResult(
+                seq, pdf_bytes, error, time.perf_counter() - start, pdf_key
+            )
+            slot.cancel = None
+            slot.running = False
+
+    def _drop_idle_slots(self) -> None:
+        # Caller holds the lock; least recently used idle slots go first
+        excess = len(self._slots) - self.max_slots
+        if excess <= 0:
+            return
+        idle = [
+            slot_id
+            for slot_id, slot in self._slots.items()
+            if slot.timer is None and not slot.running
+        ]
+        for slot_id in idle[:excess]:
+            del self._slots[slot_id]
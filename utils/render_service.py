@@ -0,0 +1,327 @@
+"""
+Local render service: a fixed pool of build workers behind a localhost HTTP
+endpoint, shared by the Streamlit app and the CLI.
+
+Admission control keeps the number of concurrent engine processes bounded:
+at most `workers` builds run at once, at most `max_queue` wait, and further
+requests are rejected with 503 instead of piling up.
+
+    POST /render   JSON {"md_text", "template_text", "lua_filters"} → PDF
+    GET  /metrics  queue depth, wait and build times, rejections (JSON)
+    GET  /health   200 once the service accepts jobs
+"""
+
+import json
+import queue
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from utils.config import DEFAULT_SERVICE_URL
+from utils.markdown_processor import BuildCancelled, convert_md_to_pdf
+from utils.pandoc_server import PandocServerPool
+from utils.render_cache import RenderCache
+from utils.template_store import TemplateStore
+
+
+class RenderServiceUnavailable(RuntimeError):
+    """Raised by the client when the service cannot be reached."""
+
+
+class RenderServiceBusy(RuntimeError):
+    """Raised by the client when the service rejected a job (queue full)."""
+
+
+@dataclass
+class _Job:
+    md_text: str
+    template_text: str
+    lua_filters: list[Path]
+    submitted: float = field(default_factory=time.monotonic)
+    cancel: threading.Event = field(default_factory=threading.Event)
+    done: threading.Event = field(default_factory=threading.Event)
+    pdf_bytes: bytes | None = None
+    error: str | None = None
+    timed_out: bool = False
+    wait_time: float = 0.0
+    build_time: float = 0.0
+
+
+def _summary(samples) -> dict:
+    if not samples:
+        return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+class RenderService:
+    """
+    Run PDF builds on a fixed number of worker threads with a bounded queue.
+
+    Args:
+        workers: Builds running at the same time (one engine process each).
+        max_queue: Jobs allowed to wait; more are rejected.
+        job_timeout: Seconds from admission until a job is cancelled, whether
+            it is still waiting or already building.
+        cache: Optional render cache for the builds.
+        pandoc_server: Optional Pandoc server pool for the builds.
+        engine: LaTeX engine for the builds, or "auto".
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 8,
+        job_timeout: float = 60.0,
+        cache: RenderCache | None = None,
+        pandoc_server: PandocServerPool | None = None,
+        engine: str = "xelatex",
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.cache = cache
+        self.pandoc_server = pandoc_server
+        self.engine = engine
+        self.templates = TemplateStore()
+        self._queue: queue.Queue[_Job] = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+        }
+        self._wait_times = deque(maxlen=1000)
+        self._build_times = deque(maxlen=1000)
+        for n in range(workers):
+            threading.Thread(
+                target=self._work, daemon=True, name=f"render-worker-{n}"
+            ).start()
+
+    def run(self, job: _Job) -> bool:
+        """Queue `job` and wait until it finished; return False if the queue is full."""
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._counters["rejected"] += 1
+            return False
+        with self._lock:
+            self._counters["submitted"] += 1
+        timer = threading.Timer(self.job_timeout, self._expire, (job,))
+        timer.daemon = True
+        timer.start()
+        job.done.wait()
+        timer.cancel()
+        return True
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queue_depth": self._queue.qsize(),
+                "max_queue": self.max_queue,
+                **self._counters,
+                "wait_time": _summary(self._wait_times),
+                "build_time": _summary(self._build_times),
+            }
+
+    def _expire(self, job: _Job) -> None:
+        job.timed_out = True
+        job.cancel.set()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.wait_time = time.monotonic() - job.submitted
+            with self._lock:
+                self._running += 1
+                self._wait_times.append(job.wait_time)
+            start = time.perf_counter()
+            try:
+                if job.cancel.is_set():
+                    raise BuildCancelled("Timed out while queued")
+                with self.templates.lease(job.template_text) as template_path:
+                    job.pdf_bytes = convert_md_to_pdf(
+                        job.md_text,
+                        template_path,
+                        job.lua_filters,
+                        cache=self.cache,
+                        cancel=job.cancel,
+                        pandoc_server=self.pandoc_server,
+                        engine=self.engine,
+                    )
+            except Exception as e:
+                job.error = str(e)
+            job.build_time = time.perf_counter() - start
+
+            with self._lock:
+                self._running -= 1
+                if job.timed_out:
+                    self._counters["timed_out"] += 1
+                elif job.error is not None:
+                    self._counters["failed"] += 1
+                else:
+                    self._counters["completed"] += 1
+                    self._build_times.append(job.build_time)
+            job.done.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: RenderService  # set by make_server
+
+    def log_message(self, format, *args):
+        pass  # one line per request is too noisy for a preview backend
+
+    def _send(self, status: int, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: dict, headers=None):
+        self._send(
+            status, json.dumps(data).encode("utf-8"), "application/json", headers
+        )
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send_json(200, self.service.metrics())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/render":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            job = _Job(
+                md_text=payload["md_text"],
+                template_text=payload["template_text"],
+                lua_filters=[Path(lf) for lf in payload.get("lua_filters", [])],
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"Invalid request: {e}"})
+            return
+
+        if not self.service.run(job):
+            self._send_json(
+                503, {"error": "Render queue is full"}, {"Retry-After": "1"}
+            )
+            return
+
+        timings = {
+            "X-Wait-Time": f"{job.wait_time:.3f}",
+            "X-Build-Time": f"{job.build_time:.3f}",
+        }
+        if job.timed_out:
+            self._send_json(
+                504,
+                {"error": f"Build timed out after {self.service.job_timeout:g}s"},
+                timings,
+            )
+        elif job.error is not None:
+            self._send_json(422, {"error": job.error}, timings)
+        else:
+            self._send(200, job.pdf_bytes, "application/pdf", timings)
+
+
+def make_server(
+    service: RenderService, host: str = "127.0.0.1", port: int = 8765
+) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server for `service`; call `serve_forever()` to run it.
+
+    The service trusts its clients (they choose the Lua filters to run), so
+    it should only listen on localhost.
+    """
+    handler = type("Handler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+class RenderServiceClient:
+    """
+    Submit builds to a running render service.
+
+    Args:
+        url: Base URL of the service.
+        timeout: Seconds to wait for a response (queueing plus build).
+    """
+
+    def __init__(self, url: str = DEFAULT_SERVICE_URL, timeout: float = 120.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def render(
+        self,
+        md_text: str,
+        template_path: Path,
+        lua_filter_paths: list[Path] | Path,
+    ) -> bytes:
+        """
+        Build a PDF on the service; arguments as for `convert_md_to_pdf`.
+
+        Raises:
+            RenderServiceUnavailable: The service cannot be reached.
+            RenderServiceBusy: The service rejected the job.
+            RuntimeError: The build failed or timed out.
+        """
+        if isinstance(lua_filter_paths, Path):
+            lua_filter_paths = [lua_filter_paths]
+        payload = {
+            "md_text": md_text,
+            "template_text": Path(template_path).read_text(encoding="utf-8"),
+            # The service resolves paths relative to its own working directory
+            "lua_filters": [str(Path(lf).resolve()) for lf in lua_filter_paths],
+        }
+        request = urllib.request.Request(
+            f"{self.url}/render",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("error", str(e))
+            if e.code == 503:
+                raise RenderServiceBusy(message)
+            raise RuntimeError(message)
+        except TimeoutError:
+            raise RuntimeError(
+                f"Render service did not answer within {self.timeout:g}s"
+            )
+        except (urllib.error.URLError, OSError) as e:
+            raise RenderServiceUnavailable(f"Render service unavailable: {e}")
+
+    def metrics(self) -> dict:
+        try:
+            with urllib.request.urlopen(
+                f"{self.url}/metrics", timeout=self.timeout
+            ) as response:
+                return json.loads(response.read())
+        except (urllib.error.URLError, OSError) as e:
+            raise RenderServiceUnavailable(f"Render service unavailable: {e}")
@@ -0,0 +1,87 @@
+"""Content-addressed scratch store for user-edited LaTeX templates."""
+
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+class TemplateStore:
+    """
+    Write each distinct template once, under its content hash, and hand out
+    the path for compiles.
+
+    Templates are immutable once written, so concurrent sessions using the same
+    text share one file and can never see each other's edits. Entries are
+    reference counted while a compile holds a lease and otherwise evicted in
+    least-recently-used order once more than `max_entries` are stored.
+
+    Args:
+        root: Directory for the files. Defaults to a private (0700) temporary
+            directory that is removed when the process exits.
+        max_entries: Number of templates kept before unused ones are deleted.
+    """
+
+    def __init__(self, root: Path | None = None, max_entries: int = 256):
+        if root is None:
+            root = Path(tempfile.mkdtemp(prefix="cv-templates-"))
+            atexit.register(shutil.rmtree, root, True)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._refcounts: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, template_text: str) -> Path:
+        """Store `template_text` (if new) and return its path."""
+        with self._lock:
+            path = self._put(template_text)
+            self._collect()
+        return path
+
+    @contextmanager
+    def lease(self, template_text: str) -> Iterator[Path]:
+        """Yield the template's path, protected from eviction until exit."""
+        with self._lock:
+            path = self._put(template_text)
+            self._refcounts[path.stem] += 1
+            self._collect()
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._refcounts[path.stem] -= 1
+                self._collect()
+
+    def __len__(self) -> int:
+        return len(self._refcounts)
+
+    def _put(self, template_text: str) -> Path:
+        # Caller holds the lock
+        data = template_text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.root / f"{digest}.tex"
+        if digest not in self._refcounts or not path.exists():
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._refcounts.setdefault(digest, 0)
+        self._refcounts.move_to_end(digest)
+        return path
+
+    def _collect(self) -> None:
+        # Caller holds the lock; leased entries are never removed
+        excess = len(self._refcounts) - self.max_entries
+        if excess <= 0:
+            return
+        unused = [d for d, refs in self._refcounts.items() if refs == 0]
+        for digest in unused[:excess]:
+            del self._refcounts[digest]
+            (self.root / f"{digest}.tex").unlink(missing_ok=True)
@@ -0,0 +1,89 @@
+"""
+Locate external tools (Pandoc, TeX engines) and read their versions once.
+
+Results are kept in a small JSON file under the cache directory and reused
+by later processes until the tool's binary changes (modification time or
+size), so a CLI run does not spawn `--version` probes before doing work.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from functools import lru_cache
+
+from utils.config import DEFAULT_CACHE_DIR
+
+TOOLS_CACHE_PATH = DEFAULT_CACHE_DIR / "tools.json"
+
+_lock = threading.Lock()
+
+
+def _load() -> dict:
+    try:
+        return json.loads(TOOLS_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _store(entries: dict) -> None:
+    try:
+        TOOLS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=TOOLS_CACHE_PATH.parent, prefix=".tools-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp, TOOLS_CACHE_PATH)
+    except OSError:
+        pass  # read-only cache directory: probe again next time
+
+
+@lru_cache(maxsize=None)
+def tool_path(executable: str) -> str | None:
+    """Absolute path of `executable` (symlinks resolved), or None if not installed."""
+    path = shutil.which(executable)
+    return os.path.realpath(path) if path else None
+
+
+@lru_cache(maxsize=None)
+def tool_output(executable: str, *args: str) -> str:
+    """
+    Stdout of `<executable> <args>`, cached on disk per binary.
+
+    Only for queries whose answer depends on the installed binary alone,
+    like `--version`.
+
+    Returns:
+        The output, or "" if the tool is not installed.
+    """
+    path = tool_path(executable)
+    if path is None:
+        return ""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+    key = " ".join([path, *args])
+    stamp = [stat.st_mtime_ns, stat.st_size]
+
+    entry = _load().get(key)
+    if entry is not None and entry.get("stamp") == stamp:
+        return entry["output"]
+
+    try:
+        output = subprocess.run(
+            [path, *args], capture_output=True, text=True, check=False
+        ).stdout
+    except OSError:
+        return ""
+    with _lock:
+        entries = _load()
+        entries[key] = {"stamp": stamp, "output": output}
+        _store(entries)
+    return output
+
+
+def tool_version(executable: str) -> str:
+    """Return the first line of `<executable> --version`, or "" if unavailable."""
+    return tool_output(executable, "--version").partition("\n")[0].strip()
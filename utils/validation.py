@@ -0,0 +1,302 @@
+"""
+Static checks of a build's inputs, run before any Pandoc or engine process.
+
+Catches the mistakes that otherwise only surface after seconds of Pandoc and
+XeLaTeX work: unparsable front matter, template variables the CV does not
+set, templates missing what the Lua filters emit, and unbalanced braces or
+environments in edited templates.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+# Filters whose output needs the template's support (cv.lua fuses both)
+INLINE_DATES_FILTERS = {"inline_dates.lua", "cv.lua"}
+COLUMNS_FILTERS = {"columns.lua", "cv.lua"}
+
+# Variables Pandoc (or this project) sets without front matter
+BUILTIN_VARIABLES = {
+    "body",
+    "header-includes",
+    "include-before",
+    "include-after",
+    "toc",
+    "toc-title",
+    "table-of-contents",
+    "title-meta",
+    "author-meta",
+    "date-meta",
+    "pagetitle",
+    "sourcefile",
+    "outputfile",
+    "meta-json",
+    "lang",
+    "dir",
+    "it",
+    "preview-css",
+}
+
+MAX_ISSUES = 20
+
+# Template directives: `$$` (a literal dollar), `${...}` and `$...$`
+_DIRECTIVE = re.compile(r"\$\$|\$\{([^}\n]*)\}|\$([^$\n]*)\$")
+_TEMPLATE_COMMENT = re.compile(r"\$--.*$", re.MULTILINE)
+_IFX_EMPTY = re.compile(r"\\ifx\s*\\empty\s*\$([\w.-]+)\$")
+_HEADING_WITH_NOTE = re.compile(
+    r"\\(?:(?:re)?newcommand|providecommand|DeclareRobustCommand"
+    r"|(?:New|Renew|Provide|Declare)DocumentCommand)\*?\s*\{?\s*\\HeadingWithNote\b"
+    r"|\\[gex]?def\s*\\HeadingWithNote\b"
+)
+_TABULARX = re.compile(
+    r"\\(?:usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{[^}]*\btabularx\b"
+)
+_LATEX_TOKEN = re.compile(r"\\(begin|end)\s*\{([^}]*)\}|\\.|%|[{}]")
+# A comment starts at a "%" preceded by an even number of backslashes
+# (`\%` is a literal percent sign, `\\%` a line break followed by a comment)
+_LATEX_COMMENT = re.compile(r"(?<!\\)((?:\\\\)*)%.*")
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    source: str  # "markdown" or "template"
+    line: int | None
+    message: str
+
+    def __str__(self) -> str:
+        where = self.source if self.line is None else f"{self.source} line {self.line}"
+        return f"{where}: {self.message}"
+
+
+class ValidationError(RuntimeError):
+    """Raised when the inputs of a build fail validation; lists every issue."""
+
+    def __init__(self, issues: list[ValidationIssue]):
+        self.issues = issues
+        super().__init__(
+            "The CV cannot be built:\n" + "\n".join(f"  {issue}" for issue in issues)
+        )
+
+
+def check_front_matter(md_text: str) -> tuple[dict, list[ValidationIssue]]:
+    """
+    Parse the YAML front matter at the top of `md_text`.
+
+    Returns:
+        (metadata, issues); metadata is empty if there is none or it is invalid.
+    """
+    lines = md_text.splitlines()
+    start = next((i for i, line in enumerate(lines) if line.strip()), None)
+    if start is None or lines[start].rstrip() != "---":
+        return {}, []
+
+    end = next(
+        (
+            i
+            for i in range(start + 1, len(lines))
+            if lines[i].rstrip() in ("---", "...")
+        ),
+        None,
+    )
+    if end is None:
+        return {}, [
+            ValidationIssue(
+                "markdown", start + 1, "front matter is not closed with '---'"
+            )
+        ]
+
+    try:
+        metadata = yaml.safe_load("\n".join(lines[start + 1 : end]))
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        line = start + 2 + mark.line if mark is not None else start + 1
+        problem = getattr(e, "problem", None) or str(e)
+        return {}, [ValidationIssue("markdown", line, f"invalid YAML: {problem}")]
+
+    if metadata is None:
+        return {}, []
+    if not isinstance(metadata, dict):
+        return {}, [
+            ValidationIssue(
+                "markdown", start + 2, "front matter must be a list of 'field: value'"
+            )
+        ]
+    return metadata, []
+
+
+def template_variables(template_text: str) -> dict[str, tuple[int, bool]]:
+    """
+    Variables the template references.
+
+    Returns:
+        Mapping of top-level variable name to (first line, guarded), where
+        guarded means every use sits in `$if(..)$`/`$for(..)$` or is checked
+        with `\\ifx\\empty$var$`, so a missing value is fine.
+    """
+    text = _TEMPLATE_COMMENT.sub("", template_text)
+    checked = set(_IFX_EMPTY.findall(text))
+    variables: dict[str, tuple[int, bool]] = {}
+    blocks: list[str] = []
+
+    for match in _DIRECTIVE.finditer(text):
+        directive = (match.group(1) or match.group(2) or "").strip()
+        if not directive:
+            continue
+        line = text.count("\n", 0, match.start()) + 1
+        keyword = re.match(r"(if|elseif|for)\(([^)]*)\)$", directive)
+        if keyword:
+            name = keyword.group(2).strip()
+            if keyword.group(1) != "elseif":
+                blocks.append(name)
+            guarded = True
+        elif directive in ("endif", "endfor"):
+            if blocks:
+                blocks.pop()
+            continue
+        elif directive in ("else", "sep") or directive.endswith("()"):
+            continue  # partials without a variable
+        else:
+            name = re.split(r"[/:]", directive)[0].strip()
+            guarded = bool(blocks)
+        name = name.split(".")[0]
+        guarded = guarded or name in checked
+        if name in variables:
+            first_line, was_guarded = variables[name]
+            variables[name] = (first_line, was_guarded and guarded)
+        else:
+            variables[name] = (line, guarded)
+    return variables
+
+
+def _strip_directives(template_text: str) -> str:
+    # Directives are no LaTeX; keep line breaks so line numbers stay valid
+    text = _TEMPLATE_COMMENT.sub("", template_text)
+    return _DIRECTIVE.sub(lambda m: "\n" * m.group(0).count("\n"), text)
+
+
+def check_balance(template_text: str) -> list[ValidationIssue]:
+    """Find unbalanced braces and \\begin/\\end pairs, ignoring comments."""
+    issues = []
+    stack: list[tuple[str, int]] = []  # ("{" or environment name, line)
+
+    for lineno, line in enumerate(_strip_directives(template_text).splitlines(), 1):
+        for token in _LATEX_TOKEN.finditer(line):
+            text = token.group(0)
+            if text == "%":
+                break  # comment until the end of the line
+            if token.group(1) == "begin":
+                stack.append((token.group(2).strip(), lineno))
+            elif token.group(1) == "end":
+                name = token.group(2).strip()
+                if not stack or stack[-1][0] != name:
+                    opened = (
+                        f"'{{' from line {stack[-1][1]} is still open"
+                        if stack and stack[-1][0] == "{"
+                        else f"\\begin{{{stack[-1][0]}}} from line {stack[-1][1]} is open"
+                        if stack
+                        else "no environment is open"
+                    )
+                    issues.append(
+                        ValidationIssue(
+                            "template", lineno, f"\\end{{{name}}} but {opened}"
+                        )
+                    )
+                    if any(entry[0] == name for entry in stack):
+                        while stack.pop()[0] != name:
+                            pass
+                else:
+                    stack.pop()
+            elif text == "{":
+                stack.append(("{", lineno))
+            elif text == "}":
+                if stack and stack[-1][0] == "{":
+                    stack.pop()
+                else:
+                    where = (
+                        f" inside \\begin{{{stack[-1][0]}}} from line {stack[-1][1]}"
+                        if stack
+                        else ""
+                    )
+                    issues.append(
+                        ValidationIssue("template", lineno, f"unmatched '}}'{where}")
+                    )
+            if len(issues) >= MAX_ISSUES:
+                return issues
+
+    for name, lineno in stack:
+        if name == "{":
+            message = "'{' is never closed"
+        else:
+            message = f"\\begin{{{name}}} is never ended"
+        issues.append(ValidationIssue("template", lineno, message))
+    return issues[:MAX_ISSUES]
+
+
+@lru_cache(maxsize=64)
+def check_template(
+    template_text: str, lua_filter_names: frozenset[str]
+) -> tuple[ValidationIssue, ...]:
+    """Check a template on its own and against the active filters (memoized)."""
+    issues = check_balance(template_text)
+    code = _LATEX_COMMENT.sub(r"\1", template_text)
+    if lua_filter_names & INLINE_DATES_FILTERS and not _HEADING_WITH_NOTE.search(code):
+        issues.append(
+            ValidationIssue(
+                "template",
+                None,
+                "inline_dates.lua needs \\HeadingWithNote, "
+                "e.g. \\newcommand{\\HeadingWithNote}[3]{...}",
+            )
+        )
+    if lua_filter_names & COLUMNS_FILTERS and not _TABULARX.search(code):
+        issues.append(
+            ValidationIssue(
+                "template", None, "columns.lua needs \\usepackage{tabularx}"
+            )
+        )
+    return tuple(issues)
+
+
+def validate_build(
+    md_text: str, template_text: str, lua_filter_paths: list[Path] | Path
+) -> dict:
+    """
+    Check a build's inputs without running any process.
+
+    Args:
+        md_text: The markdown as written by the user (before preprocessing,
+            so line numbers match the editor).
+        template_text: LaTeX template content.
+        lua_filter_paths: Active Lua filters.
+
+    Returns:
+        The front matter metadata.
+
+    Raises:
+        ValidationError: Listing every problem found, with line numbers.
+    """
+    if isinstance(lua_filter_paths, Path):
+        lua_filter_paths = [lua_filter_paths]
+    metadata, issues = check_front_matter(md_text)
+    issues += check_template(
+        template_text, frozenset(Path(lf).name for lf in lua_filter_paths)
+    )
+
+    if not issues:
+        for name, (line, guarded) in template_variables(template_text).items():
+            if not guarded and name not in metadata and name not in BUILTIN_VARIABLES:
+                issues.append(
+                    ValidationIssue(
+                        "markdown",
+                        None,
+                        f"the template uses '{name}' (template line {line}), "
+                        f"add '{name}: ...' to the front matter",
+                    )
+                )
+
+    if issues:
+        raise ValidationError(issues)
+    return metadata
@@ -0,0 +1,259 @@
+"""
+Tailored CV variants (by role, language, length, ...) from one master markdown.
+
+Sections are tagged with classes on their heading, e.g.
+`## Machine Learning {.data .en}`, or by wrapping blocks in a fenced div,
+`::: {.long} ... :::`. A variant manifest names the variants and the tags
+each one includes or excludes:
+
+    variants:
+      data-en:
+        include: [data, en]
+        metadata: {subtitle: Data Engineer}
+      short:
+        exclude: [long]
+
+Only classes used in the manifest count as tags; untagged sections are part
+of every variant.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+from utils.markdown_processor import (
+    compile_latex_to_pdf,
+    convert_md_to_latex,
+    parse_markdown,
+)
+from utils.pandoc_server import PandocServerPool
+from utils.render_cache import RenderCache
+
+_VARIANT_NAME = re.compile(r"^[\w.-]+$")
+
+
+@dataclass(frozen=True)
+class Variant:
+    name: str
+    include: frozenset[str] = frozenset()  # keep tagged sections with any of these
+    exclude: frozenset[str] = frozenset()  # drop sections with any of these
+    metadata: dict = field(default_factory=dict, hash=False)  # front matter overrides
+
+    def keeps(self, tags: set[str]) -> bool:
+        if not tags:
+            return True
+        if tags & self.exclude:
+            return False
+        return not self.include or bool(tags & self.include)
+
+
+@dataclass
+class VariantResult:
+    name: str
+    pdf: bytes
+    digest: str  # hash of the variant's selected document
+    duplicate_of: str | None = None  # earlier variant with the same content
+
+
+def load_manifest(path: Path) -> list[Variant]:
+    """Read a YAML variant manifest (see the module docstring)."""
+    try:
+        data = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+    except yaml.YAMLError as e:
+        raise RuntimeError(f"Invalid variant manifest '{path}': {e}")
+    return parse_manifest(data, str(path))
+
+
+def parse_manifest(data, source: str = "manifest") -> list[Variant]:
+    """Variants from the parsed manifest mapping `{"variants": {name: spec}}`."""
+    specs = data.get("variants") if isinstance(data, dict) else None
+    if not isinstance(specs, dict) or not specs:
+        raise RuntimeError(f"{source}: expected a 'variants' mapping of name to spec")
+
+    variants = []
+    for name, spec in specs.items():
+        name = str(name)
+        spec = spec or {}
+        if not _VARIANT_NAME.match(name):
+            raise RuntimeError(f"{source}: variant name '{name}' is not a file name")
+        if not isinstance(spec, dict) or set(spec) - {"include", "exclude", "metadata"}:
+            raise RuntimeError(
+                f"{source}: variant '{name}' takes 'include', 'exclude' and 'metadata'"
+            )
+        metadata = spec.get("metadata") or {}
+        if not isinstance(metadata, dict):
+            raise RuntimeError(f"{source}: 'metadata' of '{name}' must be a mapping")
+        variants.append(
+            Variant(
+                name,
+                include=frozenset(map(str, spec.get("include") or ())),
+                exclude=frozenset(map(str, spec.get("exclude") or ())),
+                metadata=metadata,
+            )
+        )
+    return variants
+
+
+def _meta_value(value) -> dict:
+    # Plain YAML values → Pandoc JSON MetaValues
+    if isinstance(value, bool):
+        return {"t": "MetaBool", "c": value}
+    if isinstance(value, dict):
+        return {"t": "MetaMap", "c": {str(k): _meta_value(v) for k, v in value.items()}}
+    if isinstance(value, list):
+        return {"t": "MetaList", "c": [_meta_value(v) for v in value]}
+    # Text as inlines, like the markdown reader's, so writers escape it;
+    # a MetaString would reach the template verbatim (`R&D` breaks LaTeX)
+    inlines = []
+    for word in ("" if value is None else str(value)).split():
+        if inlines:
+            inlines.append({"t": "Space"})
+        inlines.append({"t": "Str", "c": word})
+    return {"t": "MetaInlines", "c": inlines}
+
+
+def _block_tags(block: dict, tags: frozenset[str]) -> set[str]:
+    if block["t"] == "Header":
+        return set(block["c"][1][1]) & tags
+    if block["t"] == "Div":
+        return set(block["c"][0][1]) & tags
+    return set()
+
+
+def select_blocks(blocks: list, variant: Variant, tags: frozenset[str]) -> list:
+    """
+    The blocks of `variant`: a tagged heading's section runs until the next
+    heading of the same or a higher level; tagged divs are kept or dropped
+    as a whole. A kept tagged div is replaced by its content, so the Lua
+    filters, which only rewrite top-level blocks, still see its headings and
+    lists. Blocks are shared with the input, not copied.
+    """
+    selected = []
+    skip_level = None  # level of the dropped section we are in
+    for block in blocks:
+        if block["t"] == "Header":
+            level = block["c"][0]
+            if skip_level is not None and level <= skip_level:
+                skip_level = None
+            if skip_level is None and not variant.keeps(_block_tags(block, tags)):
+                skip_level = level
+        if skip_level is not None:
+            continue
+        if block["t"] == "Div":
+            div_tags = _block_tags(block, tags)
+            if not variant.keeps(div_tags):
+                continue
+            attr, content = block["c"]
+            content = select_blocks(content, variant, tags)
+            if div_tags:  # only marks the blocks as tagged
+                selected.extend(content)
+                continue
+            block = {"t": "Div", "c": [attr, content]}
+        selected.append(block)
+    return selected
+
+
+def variant_document(doc: dict, variant: Variant, tags: frozenset[str]) -> str:
+    """JSON AST of `variant`, derived from the parsed master document."""
+    meta = dict(doc["meta"])
+    meta.update((k, _meta_value(v)) for k, v in variant.metadata.items())
+    meta.pop("variants", None)
+    derived = {
+        **doc,
+        "meta": meta,
+        "blocks": select_blocks(doc["blocks"], variant, tags),
+    }
+    return json.dumps(derived, ensure_ascii=False, separators=(",", ":"))
+
+
+def render_variants(
+    md_text: str,
+    variants: list[Variant],
+    template_path: Path,
+    lua_filter_paths: list[Path] | Path,
+    cache: RenderCache | None = None,
+    pandoc_server: PandocServerPool | None = None,
+    engine: str = "xelatex",
+    max_workers: int | None = None,
+    cancel: threading.Event | None = None,
+) -> list[VariantResult]:
+    """
+    Render every variant of one master CV.
+
+    The (preprocessed) markdown is parsed once; each variant is derived by
+    selecting sections of the parsed document. Variants with identical
+    selected content are built once, the others are built in parallel.
+
+    Args:
+        md_text: Master markdown, already preprocessed.
+        variants: Variants to render (see `load_manifest`).
+        template_path: Path to the LaTeX template file.
+        lua_filter_paths: List of paths to Lua filter files or a single path.
+        cache: Optional render cache for the parse and both build stages.
+        pandoc_server: Optional server pool for the Pandoc steps.
+        engine: LaTeX engine (see `compile_latex_to_pdf`).
+        max_workers: Parallel builds (default: number of CPU cores).
+        cancel: Event that aborts the builds once set.
+
+    Returns:
+        One result per variant, in the order of `variants`.
+    """
+    doc = json.loads(parse_markdown(md_text, cache=cache, pandoc_server=pandoc_server))
+    tags = frozenset().union(*(v.include | v.exclude for v in variants))
+    template_text = Path(template_path).read_text(encoding="utf-8")
+
+    documents = {}  # digest -> (first variant, JSON AST)
+    digests = []
+    for variant in variants:
+        ast = variant_document(doc, variant, tags)
+        digest = hashlib.sha256(ast.encode("utf-8")).hexdigest()
+        documents.setdefault(digest, (variant.name, ast))
+        digests.append(digest)
+
+    def build(digest: str, ast: str) -> bytes:
+        latex = convert_md_to_latex(
+            "",  # a variant has no markdown of its own, only its AST
+            template_path,
+            lua_filter_paths,
+            cache=cache,
+            pandoc_server=pandoc_server,
+            ast=ast,
+            source_key=f"variant:{digest}",
+        )
+        return compile_latex_to_pdf(
+            latex,
+            template_text=template_text,
+            engine=engine,
+            cache=cache,
+            cancel=cancel,
+        )
+
+    workers = min(max_workers or os.cpu_count() or 1, len(documents)) or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            # Copy the context so stages still reach the current build profile
+            digest: executor.submit(contextvars.copy_context().run, build, digest, ast)
+            for digest, (_, ast) in documents.items()
+        }
+        pdfs = {digest: future.result() for digest, future in futures.items()}
+
+    results = []
+    for variant, digest in zip(variants, digests):
+        first = documents[digest][0]
+        results.append(
+            VariantResult(
+                variant.name,
+                pdfs[digest],
+                digest,
+                duplicate_of=None if first == variant.name else first,
+            )
+        )
+    return results
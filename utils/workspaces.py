@@ -0,0 +1,202 @@
+"""Persistent engine build directories that keep auxiliary files between builds."""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:  # POSIX: exclusive across threads and processes sharing the directory
+    import fcntl
+except ImportError:  # Windows: byte-range lock through msvcrt instead
+    fcntl = None
+
+# Files the engine reads back on the next pass; a rerun is only useful when
+# one of them changed
+AUX_SUFFIXES = (".aux", ".out", ".toc", ".lof", ".lot", ".nav", ".snm", ".bbl")
+
+LOCK_NAME = ".lock"
+
+
+def aux_digest(directory: Path, jobname: str = "cv") -> str:
+    """Hash the auxiliary files of `jobname` in `directory`; "" if there are none."""
+    h = hashlib.sha256()
+    found = False
+    for suffix in AUX_SUFFIXES:
+        path = directory / f"{jobname}{suffix}"
+        if path.exists():
+            found = True
+            h.update(suffix.encode())
+            h.update(hashlib.sha256(path.read_bytes()).digest())
+    return h.hexdigest() if found else ""
+
+
+def clear_aux(directory: Path, jobname: str = "cv") -> None:
+    """Delete the auxiliary files of `jobname`, e.g. after a failed build."""
+    for suffix in AUX_SUFFIXES:
+        (directory / f"{jobname}{suffix}").unlink(missing_ok=True)
+
+
+def _try_lock(lock_path: Path) -> int | None:
+    """Open and exclusively lock `lock_path`; return the fd or None if busy."""
+    try:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return None
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            import msvcrt
+
+            msvcrt.locking(fd, msvcrt.LK_NLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _size(directory: Path) -> int:
+    total = 0
+    for path in directory.rglob("*"):
+        try:
+            total += path.stat().st_size
+        except FileNotFoundError:
+            pass
+    return total
+
+
+class WorkspacePool:
+    """
+    One build directory per (session, template), kept between builds so the
+    engine starts from the previous run's .aux/.out files.
+
+    A workspace is locked while a build uses it; a concurrent build of the
+    same session and template gets a throw-away directory instead of waiting,
+    so builds never see each other's files. Workspaces unused for `max_age`
+    seconds are removed, then the least recently used ones until the pool
+    fits into `max_bytes`.
+
+    A build only measures its own workspace and updates a running total; the
+    pool is scanned when that total exceeds `max_bytes` or `prune_interval`
+    seconds have passed since the last scan (which also picks up workspaces
+    of other processes).
+
+    Args:
+        root: Directory holding the workspaces.
+        max_bytes: Size budget of all workspaces together.
+        max_age: Seconds after their last build that workspaces are removed.
+        prune_interval: Seconds between scans while the pool is within budget.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: float = 24 * 3600,
+        prune_interval: float = 60.0,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._sizes: dict[Path, int] | None = None  # unknown until the first scan
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def path(self, session: str, template_text: str) -> Path:
+        """Workspace directory of `session` building documents of `template_text`."""
+        h = hashlib.sha256()
+        h.update(session.encode("utf-8"))
+        h.update(b"\0")
+        h.update(template_text.encode("utf-8"))
+        return self.root / h.hexdigest()[:32]
+
+    @contextmanager
+    def lease(self, session: str, template_text: str) -> Iterator[Path]:
+        """
+        Yield the workspace, locked for the duration of the build.
+
+        Falls back to a fresh temporary directory if the workspace is busy
+        or cannot be created.
+        """
+        workspace = self.path(session, template_text)
+        fd = None
+        try:
+            workspace.mkdir(parents=True, exist_ok=True)
+            fd = _try_lock(workspace / LOCK_NAME)
+            # Removed by `prune` between mkdir and lock: the lock guards nothing
+            if fd is not None and not os.path.samestat(
+                os.fstat(fd), os.stat(workspace / LOCK_NAME)
+            ):
+                os.close(fd)
+                fd = None
+        except OSError:
+            fd = None
+
+        if fd is None:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                yield Path(tmpdir)
+            return
+
+        try:
+            os.utime(workspace)  # mtime is "last used" for pruning
+            yield workspace
+        finally:
+            os.close(fd)
+            self._record(workspace)
+
+    def _record(self, workspace: Path) -> None:
+        """Update the running total after a build in `workspace`; prune if due."""
+        size = _size(workspace)
+        with self._lock:
+            if self._sizes is not None:
+                self._sizes[workspace] = size
+            due = (
+                self._sizes is None
+                or sum(self._sizes.values()) > self.max_bytes
+                or time.monotonic() - self._last_prune > self.prune_interval
+            )
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Remove expired workspaces, then the least recently used above `max_bytes`."""
+        if not self.root.exists():
+            with self._lock:
+                self._sizes, self._last_prune = {}, time.monotonic()
+            return 0
+        now = time.time()
+        entries = []
+        for workspace in self.root.iterdir():
+            try:
+                st = workspace.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, _size(workspace), workspace))
+
+        removed = 0
+        sizes = {workspace: size for _, size, workspace in entries}
+        total = sum(sizes.values())
+        for mtime, size, workspace in sorted(entries):
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            fd = _try_lock(workspace / LOCK_NAME)
+            if fd is None:
+                continue  # in use
+            try:
+                shutil.rmtree(workspace, ignore_errors=True)
+            finally:
+                os.close(fd)
+            total -= size
+            removed += 1
+            del sizes[workspace]
+
+        with self._lock:
+            self._sizes = sizes
+            self._last_prune = time.monotonic()
+        return removed